@@ -1,17 +1,25 @@
 from fastapi import FastAPI
-from hub.policy_hash import policy_hash
+from hub import policy_model
 import subprocess
+from functools import lru_cache
 
 app = FastAPI(title="ACM Hub")
 
+POLICY_PATH = "policies/base.yaml"
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
 @app.get("/policy/hash")
 def get_policy_hash():
-    return {"hash": policy_hash("policies/base.yaml")}
+    return {"hash": policy_model.load(POLICY_PATH).canonical_hash}
+
+@app.get("/policy/hashes")
+def get_policy_hashes():
+    return policy_model.load(POLICY_PATH).hashes()
 
+@lru_cache(maxsize=1)
 def git_sha() -> str:
     try:
         return subprocess.check_output(
@@ -22,4 +30,4 @@ def git_sha() -> str:
 
 @app.get("/version")
 def version():
-    return {"commit": git_sha(), "policy_hash": policy_hash("policies/base.yaml")}
+    return {"commit": git_sha(), "policy_hash": policy_model.load(POLICY_PATH).canonical_hash}
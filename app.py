@@ -14,8 +14,10 @@ REPO_ROOT = Path(__file__).resolve().parent
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
-# Reuse your canonical policy hash
-from hub.policy_hash import policy_hash as acm_policy_hash
+# Pipeline stages run in-process (no python3 subprocess per stage)
+# Policy hashes come from the stat-memoized hub.policy_model (no YAML per rerun)
+from hub import pipeline, plan_search, plan_select, policy_model, run_manifest, scenario_gen, verdict_cache
+from scripts import verify_policies
 
 # -----------------------
 # Utility + Repo Helpers
@@ -27,10 +29,6 @@ def sh(cmd: List[str], timeout: int = 120, env: Optional[dict] = None) -> Tuple[
     except Exception as e:
         return 99, "", str(e)
 
-def latest_file(glob_pat: str) -> Optional[Path]:
-    files = sorted(Path(".").glob(glob_pat), key=lambda p: p.stat().st_mtime if p.exists() else 0)
-    return files[-1] if files else None
-
 def load_json(path: Optional[Path]) -> Optional[dict]:
     if not path or not path.exists():
         return None
@@ -39,12 +37,6 @@ def load_json(path: Optional[Path]) -> Optional[dict]:
     except Exception:
         return None
 
-def dump_json_atomic(path: Path, obj: dict):
-    path.parent.mkdir(parents=True, exist_ok=True)
-    tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.write_text(json.dumps(obj, indent=2), encoding="utf-8")
-    tmp.replace(path)
-
 def quick_notice(msg: str, ok: bool):
     (st.success if ok else st.warning)(msg)
 
@@ -61,16 +53,19 @@ with st.sidebar:
     lock_path = "policies/policy.lock"
     st.caption("Canonical Policy Hash")
     if Path(policy_path).exists():
-        st.code(acm_policy_hash(policy_path), language="text")
+        st.code(policy_model.load(policy_path).canonical_hash, language="text")
     else:
         st.error("Missing policies/base.yaml")
 
     if Path(lock_path).exists():
         st.caption("Lock file")
-        st.code(Path(lock_path).read_text(encoding="utf-8").strip(), language="text")
+        st.code("\n".join(f"{k}: {v}" for k, v in policy_model.load_lock(lock_path).items()), language="text")
     else:
         st.warning("Missing policies/policy.lock")
 
+    st.caption("Verdict cache (this process)")
+    st.code(json.dumps(verdict_cache.default_cache().stats()), language="json")
+
     st.divider()
     if st.button("Validate Policy (schema)", use_container_width=True):
         rc, out, err = sh(["python3", "scripts/validate_policy.py"])
@@ -129,6 +124,18 @@ PRESETS = {
         "default_warehouse": "W1",
     },
 }
+# Generated scale fixtures (hub.scenario_gen): seeded, cached per process
+PRESETS["Synthetic (50 warehouses)"] = scenario_gen.app_preset(scenario_gen.fixture("small"))
+PRESETS["Synthetic (2,000 warehouses)"] = scenario_gen.app_preset(scenario_gen.fixture("scale"))
+DRAW_LIMIT = 12  # larger snapshots are drawn as the focus warehouse's neighbourhood
+
+# Best-plan objectives: lexicographic order, or weights for one combined objective
+OBJECTIVE_PRESETS = {
+    "Cheapest, then highest SLA": {"order": ("cost", "sla")},
+    "Lowest stockout risk, then cheapest": {"order": ("risk", "cost")},
+    "Fastest, then highest SLA": {"order": ("delay", "sla", "cost")},
+    "Weighted (cost + risk + delay)": {"weights": {"cost": 1.0, "risk": 20000.0, "delay": 50.0}},
+}
 
 # -----------------------
 # Selection Form
@@ -150,14 +157,14 @@ with st.form("selector"):
     # Advanced options (visual only)
     st.markdown("Advanced options")
     allow_write_proof = st.checkbox("Append proof entry after simulation", value=False)
+    objective = st.selectbox("Best-plan objective", list(OBJECTIVE_PRESETS.keys()), index=0,
+                             help="Solved as one z3 Optimize problem over the bundle (hub.plan_select).")
     submitted = st.form_submit_button("Run Demo")
 
 # -----------------------
 # Orchestration helpers
 # -----------------------
-def seed_event(disruption_type: str, route_id: str, wh_id: str) -> Path:
-    sh(["python3", "scripts/seed_disruption.py"])
-    evt_p = latest_file("data/events/*.json") or Path("data/events/custom_event.json")
+def seed_event(disruption_type: str, route_id: str, wh_id: str, run_id: str) -> Tuple[Dict[str, Any], Path]:
     nowz = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
     event = {
         "type": disruption_type,
@@ -167,54 +174,65 @@ def seed_event(disruption_type: str, route_id: str, wh_id: str) -> Path:
         "severity": "high",
         "ts": nowz,
     }
-    dump_json_atomic(evt_p, event)
-    return evt_p
+    event, evt_p = pipeline.seed_event(event, run_id)
+    return event, Path(evt_p)
 
-def gen_plans():
-    rc, out, err = sh(["python3", "scripts/generate_plans.py"])
-    bundle_p = latest_file("data/plans/*.json")
-    return bundle_p, rc, out, err
+def gen_plans(event: Dict[str, Any], evt_p: Path, run_id: str):
+    try:
+        bundle, bundle_p = pipeline.gen_plans(event, str(evt_p), run_id)
+    except plan_search.NoFeasiblePlan as e:
+        return None, {}, "", f"No feasible plan: {e}"
+    except Exception as e:
+        return None, {}, "", str(e)
+    return Path(bundle_p), bundle, f"Wrote plan bundle: {bundle_p}", ""
 
-def verify_all_with_z3_return_table() -> List[Dict[str, Any]]:
-    rc, out, err = sh(["python3", "scripts/verify_policies.py"])
+def verify_all_with_z3_return_table(bundle: Dict[str, Any], bundle_p: Path) -> List[Dict[str, Any]]:
     table: List[Dict[str, Any]] = []
-    if rc == 0 and out:
-        try:
-            res = json.loads(out)
-            for r in res.get("results", []):
-                table.append({
-                    "plan_id": r.get("plan_id"),
-                    "strategy": r.get("strategy"),
-                    "sat": r.get("sat"),
-                    "counterexample": r.get("counterexample"),
-                    "via": "z3"
-                })
-        except Exception:
-            pass
+    try:
+        res = pipeline.verify(bundle, str(bundle_p))
+    except Exception:
+        return table
+    for r in res.get("results", []):
+        table.append({
+            "plan_id": r.get("plan_id"),
+            "strategy": r.get("strategy"),
+            "sat": r.get("sat"),
+            "counterexample": r.get("counterexample"),
+            "via": "z3"
+        })
     return table
 
-def simulate_from_bundle():
-    rc, out, err = sh(["python3", "scripts/simulate_twin.py"])
-    sim_p = latest_file("data/sim/*_sim.json")
-    return sim_p, rc, out, err
+def simulate_from_bundle(bundle: Dict[str, Any], bundle_p: Path, run_id: str):
+    try:
+        sim, sim_p = pipeline.simulate(bundle, str(bundle_p), run_id)
+    except Exception as e:
+        return None, {}, "", str(e)
+    return Path(sim_p), sim, f"Wrote simulation results: {sim_p}", ""
 
-def write_proof_entry():
-    rc, out, err = sh(["python3", "scripts/write_proof.py"])
-    return rc, out, err
+def write_proof_entry(bundle: Dict[str, Any], bundle_p: Path, sim: Dict[str, Any], sim_p: Path, run_id: str):
+    try:
+        entry = pipeline.write_proof(bundle, str(bundle_p), sim, str(sim_p), run_id)
+    except Exception as e:
+        return 1, "", str(e)
+    out = f"Wrote proof entry with digest={entry['entry_digest']}\nNew chain head={entry['chain_head']}"
+    return 0, out, ""
+
+# Verdict cache scope for check() below; bump the version whenever its logic or result shape changes
+SOFT_VERIFY_SCOPE = "soft_verify/v2"
 
 def soft_verify_plans_from_config(bundle_path: Path, config_path: str = "configs/day13.yaml") -> List[Dict[str, Any]]:
     """
     Fallback: if Z3 results are empty, apply the same logical checks
     used by scripts/verify_policies.py: budget, SLA, region boundary, PII=false.
     """
-    import yaml
-    cfg = yaml.safe_load(Path(config_path).read_text(encoding="utf-8"))
+    model = policy_model.load(config_path)
+    cfg = model.doc
     boundary = cfg.get("region_data_boundary")
     budget_cap = float(cfg.get("budget_cap_usd", 1e12))
     sla_min = float(cfg.get("sla_min_percent", 0.0))
     bundle = load_json(bundle_path) or {}
-    rows: List[Dict[str, Any]] = []
-    for p in bundle.get("plans", []):
+
+    def check(p: Dict[str, Any]) -> Tuple[bool, List[str]]:
         ok = True
         reasons = []
         if float(p.get("cost_usd", 1e12)) > budget_cap:
@@ -225,6 +243,16 @@ def soft_verify_plans_from_config(bundle_path: Path, config_path: str = "configs
             ok = False; reasons.append("region_mismatch")
         if bool(p.get("pii_access", False)):
             ok = False; reasons.append("pii_access")
+        return ok, reasons
+
+    cache = verdict_cache.default_cache()
+    policy_h = model.canonical_hash
+    rows: List[Dict[str, Any]] = []
+    for p in bundle.get("plans", []):
+        ok, reasons = cache.get_or_compute(
+            SOFT_VERIFY_SCOPE, policy_h, verdict_cache.plan_digest(p, verify_policies.PLAN_FIELDS),
+            lambda: check(p),
+        )
         rows.append({
             "plan_id": p.get("id"),
             "strategy": p.get("strategy"),
@@ -234,21 +262,27 @@ def soft_verify_plans_from_config(bundle_path: Path, config_path: str = "configs
         })
     return rows
 
-def choose_best_plan(bundle_path: Path, verdict_rows: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+def choose_best_plan(bundle_path: Path, objective: Optional[Dict[str, Any]] = None,
+                     config_path: str = "configs/day13.yaml") -> Optional[Dict[str, Any]]:
+    """
+    Best compliant plan, picked by a single z3 Optimize over the whole bundle
+    (hub.plan_select) rather than verifying every plan and sorting. Defaults
+    to cheapest, then highest SLA.
+    """
     bundle = load_json(bundle_path) or {}
-    plans = bundle.get("plans", [])
-    sat_ids = {r["plan_id"] for r in verdict_rows if r.get("sat")}
-    candidates = [p for p in plans if p.get("id") in sat_ids]
-    if not candidates:
-        return None
-    candidates.sort(key=lambda p: (float(p.get("cost_usd", 1e12)), -float(p.get("sla_expected_percent", 0.0))))
-    return candidates[0]
+    cfg = policy_model.load(config_path).doc
+    return plan_select.select(bundle.get("plans", []), cfg, **(objective or {})).plan
 
 # -----------------------
 # Visualization helpers
 # -----------------------
-def draw_chain(snapshot: dict, highlight_route: Optional[str], highlight_wh: Optional[str]):
+def draw_chain(snapshot: dict, highlight_route: Optional[str], highlight_wh: Optional[str],
+               focus_wh: Optional[str] = None):
     import matplotlib.pyplot as plt
+    if len(snapshot.get("warehouses", {})) > DRAW_LIMIT:
+        focus = highlight_wh or focus_wh or next(iter(snapshot["warehouses"]))
+        snapshot = scenario_gen.neighbourhood(snapshot, focus, highlight_route)
+        st.caption(f"Showing {focus} and its routes")
     warehouses: dict = snapshot.get("warehouses", {})
     routes: dict = snapshot.get("routes", {})
     def _layout_positions(ws: dict) -> dict[str, tuple[float, float]]:
@@ -272,7 +306,7 @@ def draw_chain(snapshot: dict, highlight_route: Optional[str], highlight_wh: Opt
     route_names = list(routes.keys()); wnames = list(positions.keys())
     if len(wnames) >= 2 and route_names:
         for i, rname in enumerate(route_names):
-            a = wnames[i % len(wnames)]; b = wnames[(i + 1) % len(wnames)]
+            a, b = routes[rname].get("warehouses") or (wnames[i % len(wnames)], wnames[(i + 1) % len(wnames)])
             x1, y1 = positions[a]; x2, y2 = positions[b]
             color = "#90a4ae"; width = 2.5
             if rname == highlight_route: color = "#e53935"; width = 3.2
@@ -288,18 +322,23 @@ def draw_chain(snapshot: dict, highlight_route: Optional[str], highlight_wh: Opt
 # -----------------------
 if submitted:
     with st.status("Analyzing chain...", expanded=True) as status:
-        # 1) Snapshot
+        # 1) Snapshot (scoped to this run so concurrent sessions don't collide)
+        run_id = run_manifest.new_run_id()
         snapshot = PRESETS[chain]["snapshot"]
-        dump_json_atomic(Path("twin_snapshot.json"), snapshot)
-        st.write("Snapshot prepared for:", chain); st.json(snapshot)
-        st.write("Initial Supply Chain:"); draw_chain(snapshot, None, None)
+        pipeline.write_snapshot(snapshot, run_id)
+        st.caption(f"Run id: {run_id}")
+        st.write("Snapshot prepared for:", chain)
+        if len(snapshot["warehouses"]) > DRAW_LIMIT:
+            st.write(f"{len(snapshot['warehouses']):,} warehouses, {len(snapshot['routes']):,} routes")
+        else:
+            st.json(snapshot)
+        st.write("Initial Supply Chain:"); draw_chain(snapshot, None, None, wh_sel)
 
         status.update(label="Problem detected...")
         time.sleep(0.2)
 
         # 2) Event
-        evt_p = seed_event(disruption, route_sel, wh_sel)
-        event = load_json(evt_p) or {}
+        event, evt_p = seed_event(disruption, route_sel, wh_sel, run_id)
         st.write("Seeded Event:"); st.json(event)
         st.write("Affected elements highlighted:")
         draw_chain(snapshot, event.get("route_id"), event.get("warehouse_id"))
@@ -308,12 +347,13 @@ if submitted:
         time.sleep(0.2)
 
         # 3) Plans
-        bundle_p, rc_gp, out_gp, err_gp = gen_plans()
-        st.write("Plan generation stdout:"); st.code(out_gp or "—")
-        if err_gp: st.write("stderr:"); st.code(err_gp)
-        if rc_gp != 0 or not bundle_p:
-            status.update(label="Plan generation failed", state="error"); st.stop()
-        bundle = load_json(bundle_p) or {}
+        bundle_p, bundle, out_gp, err_gp = gen_plans(event, evt_p, run_id)
+        st.write("Plan generation output:"); st.code(out_gp or "—")
+        if err_gp: st.write("error:"); st.code(err_gp)
+        if not bundle_p:
+            infeasible = err_gp.startswith("No feasible plan")
+            status.update(label="No plan fits the budget / delay limits; please check policy thresholds."
+                          if infeasible else "Plan generation failed", state="error"); st.stop()
         plans = bundle.get("plans", [])
         st.success(f"Generated {len(plans)} plan(s):")
         st.dataframe(
@@ -330,7 +370,7 @@ if submitted:
         time.sleep(0.2)
 
         # 4) Verify
-        z3_rows = verify_all_with_z3_return_table()
+        z3_rows = verify_all_with_z3_return_table(bundle, bundle_p)
         verdict_rows = z3_rows[:]
         used_fallback = False
         if not verdict_rows or all(not r.get("sat") for r in verdict_rows):
@@ -342,13 +382,13 @@ if submitted:
         st.write("Verification results:")
         st.dataframe(verdict_rows, use_container_width=True)
 
-        # 5) Choose best from whichever path yielded SAT
-        best = choose_best_plan(bundle_p, verdict_rows)
+        # 5) Choose best: one z3 Optimize over the bundle and the config policies
+        best = choose_best_plan(bundle_p, OBJECTIVE_PRESETS[objective])
         if not best:
-            status.update(label="No SAT plan found after fallback; please check policy thresholds.", state="error")
+            status.update(label="No compliant plan found; please check policy thresholds.", state="error")
             st.stop()
 
-        via = "Z3" if (not used_fallback) else "policy-fallback"
+        via = f"Z3 Optimize: {objective.lower()}"
         st.success(
             f"Best plan selected ({via}): {best['id']} ({best['strategy']}) — "
             f"cost={best['cost_usd']}, SLA={best['sla_expected_percent']}%"
@@ -358,13 +398,12 @@ if submitted:
         time.sleep(0.2)
 
         # 6) Simulate
-        sim_p, rc_sim, out_sim, err_sim = simulate_from_bundle()
-        st.write("Simulation stdout:"); st.code(out_sim or "—")
-        if err_sim: st.write("stderr:"); st.code(err_sim)
-        if not (rc_sim == 0 and sim_p):
+        sim_p, sim, out_sim, err_sim = simulate_from_bundle(bundle, bundle_p, run_id)
+        st.write("Simulation output:"); st.code(out_sim or "—")
+        if err_sim: st.write("error:"); st.code(err_sim)
+        if not sim_p:
             status.update(label="Simulation failed", state="error"); st.stop()
 
-        sim = load_json(sim_p) or {}
         st.write("Simulation results (all candidates):")
         st.dataframe(sim.get("results", []), use_container_width=True)
 
@@ -385,15 +424,15 @@ if submitted:
             st.info("No per-plan simulation found; check bundle/sim alignment.")
 
         st.write("Post-plan narrative: reduced delay and stockout risk on affected route/warehouse.")
-        draw_chain(snapshot, None, None)
+        draw_chain(snapshot, None, None, wh_sel)
 
         # 7) Optional proof
         proof_note = False
         if allow_write_proof:
             status.update(label="Writing proof entry...")
-            rc_pf, out_pf, err_pf = write_proof_entry()
-            st.write("write_proof stdout:"); st.code(out_pf or "—")
-            if err_pf: st.write("stderr:"); st.code(err_pf)
+            rc_pf, out_pf, err_pf = write_proof_entry(bundle, bundle_p, sim, sim_p, run_id)
+            st.write("write_proof output:"); st.code(out_pf or "—")
+            if err_pf: st.write("error:"); st.code(err_pf)
             if rc_pf == 0:
                 st.success("Proof entry appended to audits/day13_proof.jsonl"); proof_note = True
             else:
@@ -0,0 +1,273 @@
+# hub/adt_meter.py
+"""
+Buffered ADT usage meter.
+
+record() only bumps in-memory counters and queues the JSONL record; a
+background thread writes queued records to audits/adt_usage.jsonl in one
+append every `flush_interval` seconds (and at exit).
+
+Running totals are kept in memory and persisted next to the log as
+<log>.totals.json ({"offset", "totals"}), so a new process resumes from the
+snapshot and only scans bytes appended after its offset. Flushes run under
+a file lock and first fold in records other processes appended, so the
+snapshot stays exact with several writers. The meter remembers how far
+into the log its window has read, so those records enter the window once.
+If a flush fails before its records reach the log, they are queued again.
+
+With a RollupStore attached, every record also bumps the in-memory
+minute/hour/day buckets, and each flush persists them under the same lock.
+
+summarize() (totals of the last `window` records) and totals() are O(1).
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from hub.adt_rollup import RollupStore, default_store
+from hub.chain_append import chain_lock
+from hub.record_tail import parse_records, tail_lines
+
+KINDS = ("operation", "message", "query_unit")
+USAGE_FILE = "audits/adt_usage.jsonl"
+
+
+def _now(epoch: Optional[float] = None):
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(epoch))
+
+
+def _zero() -> Dict[str, int]:
+    return {k: 0 for k in KINDS}
+
+
+def _fold(recs, totals: Dict[str, int]) -> List[Tuple[str, int]]:
+    items = []
+    for obj in recs:
+        try:
+            k, c = obj.get("kind"), int(obj.get("count", 0))
+        except Exception:
+            continue
+        if k in totals:
+            totals[k] += c
+            items.append((k, c))
+    return items
+
+
+class UsageMeter:
+    def __init__(self, path: str = USAGE_FILE, flush_interval: float = 1.0, window: int = 200,
+                 rollup: Optional[RollupStore] = None):
+        self.path = path
+        self.rollup = rollup
+        self.snapshot_path = path + ".totals.json"
+        self.lock_path = path + ".lock"
+        self.flush_interval = flush_interval
+        self.window = window
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: List[dict] = []
+        self._flushed = _zero()          # totals of everything in the log
+        self._unflushed = _zero()        # totals of self._pending
+        self._recent: Deque[Tuple[str, int]] = deque()
+        self._recent_totals = _zero()
+        self._seen = 0                   # log offset the window has read up to
+        self._loaded = False
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # --- loading -------------------------------------------------------------
+
+    def _read_snapshot(self) -> Tuple[int, Dict[str, int]]:
+        try:
+            with open(self.snapshot_path) as f:
+                snap = json.load(f)
+            return int(snap["offset"]), dict(_zero(), **snap["totals"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0, _zero()
+
+    def _catch_up(self, offset: int, totals: Dict[str, int], seen: int = 0) -> Tuple[int, List[Tuple[str, int]]]:
+        """
+        Fold complete lines appended after `offset` into `totals`. Returns
+        the new offset and the items of the lines past `seen`.
+        """
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return 0, []
+        if size < offset:  # log truncated/rotated: start over
+            offset = seen = 0
+            for k in totals:
+                totals[k] = 0
+        if size == offset:
+            return offset, []
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            data = f.read(size - offset)
+        cut = data.rfind(b"\n") + 1
+        split = min(max(0, seen - offset), cut)
+        _fold(parse_records([ln for ln in data[:split].split(b"\n") if ln.strip()]), totals)
+        items = _fold(parse_records([ln for ln in data[split:cut].split(b"\n") if ln.strip()]), totals)
+        return offset + cut, items
+
+    def _push_recent(self, items):
+        for k, c in items:
+            self._recent.append((k, c))
+            self._recent_totals[k] += c
+            if len(self._recent) > self.window:
+                ok, oc = self._recent.popleft()
+                self._recent_totals[ok] -= oc
+
+    def _ensure_loaded(self):
+        # Called without self._lock held (may take the log's file lock)
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            offset, totals = self._read_snapshot()
+            seen, _ = self._catch_up(offset, totals)
+            recent = _fold(parse_records(tail_lines(self.path, self.window, end=seen)), _zero()) \
+                if seen else []
+            if self.rollup is not None:
+                with chain_lock(self.lock_path):
+                    self.rollup.sync_log(self.path)
+            with self._lock:
+                self._flushed = totals
+                self._seen = seen
+                self._push_recent(recent)
+                self._loaded = True
+
+    # --- recording -----------------------------------------------------------
+
+    def record(self, kind: str, count: int = 1, note: str = "") -> None:
+        assert kind in KINDS, "invalid kind"
+        count = int(count)
+        epoch = int(time.time())
+        rec = {"ts": _now(epoch), "kind": kind, "count": count, "note": note[:80] if note else ""}
+        self._ensure_loaded()
+        if self.rollup is not None:
+            self.rollup.add(epoch, kind, count)
+        with self._lock:
+            self._pending.append(rec)
+            self._unflushed[kind] += count
+            self._push_recent([(kind, count)])
+            if self._thread is None:
+                self._start()
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name="adt-meter-flush", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Append queued records in one write and advance the totals snapshot.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                unflushed, self._unflushed = self._unflushed, _zero()
+                rollup_pending = self.rollup.take_pending() if self.rollup is not None else None
+            if not batch and not rollup_pending:
+                return
+            with chain_lock(self.lock_path):
+                try:
+                    offset, totals = self._read_snapshot()
+                    offset, others = self._catch_up(offset, totals, self._seen)
+                    if self.rollup is not None:
+                        self.rollup.sync_log(self.path, upto=offset)
+                    data = "".join(json.dumps(r) + "\n" for r in batch).encode("utf-8")
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    with open(self.path, "ab") as f:
+                        start = f.tell()
+                        try:
+                            f.write(data)
+                            f.flush()
+                        except BaseException:
+                            f.truncate(start)  # no partial line for the next append to run into
+                            raise
+                except BaseException:
+                    self._requeue(batch, unflushed, rollup_pending)
+                    raise
+                for k, c in unflushed.items():
+                    totals[k] += c
+                offset += len(data)
+                # The records are in the log: a failure below leaves a stale snapshot
+                # (and rollup offset), which the next flush catches up from the log
+                with self._lock:
+                    self._flushed = totals
+                    self._seen = offset
+                    self._push_recent(others)
+                if self.rollup is not None:
+                    self.rollup.commit(rollup_pending, offset)
+                tmp = self.snapshot_path + ".tmp"
+                with open(tmp, "w") as f:
+                    json.dump({"offset": offset, "totals": totals, "updated_at": _now()}, f)
+                os.replace(tmp, self.snapshot_path)
+
+    def _requeue(self, batch: List[dict], unflushed: Dict[str, int], rollup_pending) -> None:
+        # Nothing reached the log: put the records back in front of any queued since
+        with self._lock:
+            self._pending[:0] = batch
+            for k, c in unflushed.items():
+                self._unflushed[k] += c
+        if rollup_pending:
+            self.rollup.restore_pending(rollup_pending)
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+
+    # --- queries -------------------------------------------------------------
+
+    def totals(self) -> Dict[str, int]:
+        """All-time totals, including records not yet flushed."""
+        self._ensure_loaded()
+        with self._lock:
+            return {k: self._flushed[k] + self._unflushed[k] for k in KINDS}
+
+    def summarize(self, last_n: Optional[int] = None) -> Dict[str, int]:
+        """
+        Totals over the last `last_n` records (default: the meter's window).
+        O(1) for the window size; smaller n sums the tail of the window,
+        larger n flushes and reads the log's tail.
+        """
+        if last_n is not None and last_n > self.window:
+            self.flush()
+            totals = _zero()
+            if os.path.exists(self.path):
+                _fold(parse_records(tail_lines(self.path, last_n)), totals)
+            return totals
+        self._ensure_loaded()
+        with self._lock:
+            if last_n is None or last_n == self.window:
+                return dict(self._recent_totals)
+            out = _zero()
+            for k, c in list(self._recent)[-last_n:] if last_n > 0 else []:
+                out[k] += c
+            return out
+
+
+_meters: Dict[str, UsageMeter] = {}
+_meters_guard = threading.Lock()
+
+
+def default_meter() -> UsageMeter:
+    """
+    Process-wide meter at USAGE_FILE (resolved against the working directory).
+    """
+    key = os.path.abspath(USAGE_FILE)
+    with _meters_guard:
+        m = _meters.get(key)
+        if m is None:
+            m = _meters[key] = UsageMeter(key, rollup=default_store())
+    return m
@@ -0,0 +1,246 @@
+# hub/adt_query.py
+"""
+ADT query layer: a TTL result cache plus a query-unit budget.
+
+QueryCache persists results across runs in artifacts/adt_query_cache.json,
+keyed by sha256 of the normalized query text (whitespace collapsed outside
+string literals, keywords upper-cased, trailing ';' dropped).
+
+BudgetScheduler is a two-resource token bucket (operations, query units)
+whose capacities are adt.max_ops / adt.max_qu from configs/day13.yaml; both
+refill linearly over `period` seconds (default one day, the window
+runbook_resilient checks). Its state lives in artifacts/adt_budget.json under
+a file lock, so separate script runs share one budget. A request over budget
+waits up to `max_wait` seconds for tokens, otherwise raises BudgetExceeded.
+
+QueryLayer runs queries through both: a cache hit costs nothing, a miss
+reserves one operation plus the query's last known charge (1 QU if never
+seen) and settles the difference once the real query-charge is known.
+Cache hits and rejections are metered as zero-count records next to the
+client's operation/query_unit records.
+"""
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Any, Dict, Optional
+
+from hub import policy_model
+from hub.chain_append import chain_lock
+
+CACHE_FILE = "artifacts/adt_query_cache.json"
+BUDGET_FILE = "artifacts/adt_budget.json"
+CONFIG_PATH = "configs/day13.yaml"
+DEFAULT_TTL = 3600.0
+DEFAULT_PERIOD = 86400.0
+
+_LITERAL = re.compile(r"('(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\")")
+_KEYWORDS = {"SELECT", "FROM", "WHERE", "AND", "OR", "NOT", "IN", "NIN", "AS", "TOP", "COUNT", "JOIN",
+             "RELATED", "MATCH", "RETURN", "LIMIT", "IS_OF_MODEL", "IS_DEFINED", "IS_NULL", "STARTSWITH",
+             "ENDSWITH", "CONTAINS", "DIGITALTWINS", "RELATIONSHIPS"}
+
+
+class BudgetExceeded(RuntimeError):
+    pass
+
+
+def normalize_query(query: str) -> str:
+    parts = _LITERAL.split(query.strip().rstrip(";").strip())
+    out = []
+    for i, part in enumerate(parts):
+        if i % 2:  # string literal: verbatim
+            out.append(part)
+            continue
+        words = re.sub(r"\s+", " ", part).split(" ")
+        out.append(" ".join(w.upper() if w.upper() in _KEYWORDS else w for w in words))
+    return "".join(out)
+
+
+def query_key(query: str) -> str:
+    return hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()
+
+
+def _write_json_atomic(path: str, obj: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(obj, f)
+    os.replace(tmp, path)
+
+
+class QueryCache:
+    def __init__(self, path: str = CACHE_FILE, ttl: float = DEFAULT_TTL, max_entries: int = 256):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path) as f:
+                doc = json.load(f)
+            return doc if isinstance(doc, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def entry(self, query: str) -> Optional[Dict[str, Any]]:
+        """Stored entry for `query`, fresh or not."""
+        return self._load().get(query_key(query))
+
+    def get(self, query: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Fresh entry ({query, fetched_at, items, query_charge}) or None."""
+        e = self.entry(query)
+        now = time.time() if now is None else now
+        if e is None or now - e.get("fetched_at", 0) >= self.ttl:
+            return None
+        return e
+
+    def put(self, query: str, items, query_charge: float, now: Optional[float] = None) -> Dict[str, Any]:
+        e = {"query": normalize_query(query), "fetched_at": time.time() if now is None else now,
+             "items": items, "query_charge": query_charge}
+        with chain_lock(self.path + ".lock"):
+            doc = self._load()
+            doc[query_key(query)] = e
+            if len(doc) > self.max_entries:
+                for k in sorted(doc, key=lambda k: doc[k].get("fetched_at", 0))[:len(doc) - self.max_entries]:
+                    del doc[k]
+            _write_json_atomic(self.path, doc)
+        return e
+
+    def invalidate(self, query: Optional[str] = None) -> None:
+        with chain_lock(self.path + ".lock"):
+            doc = {}
+            if query is not None:
+                doc = self._load()
+                doc.pop(query_key(query), None)
+            _write_json_atomic(self.path, doc)
+
+
+class BudgetScheduler:
+    """
+        budget = BudgetScheduler(max_ops=5, max_qu=2)
+        budget.acquire(ops=1, qu=1)      # raises BudgetExceeded when over
+        budget.settle(qu=0.4)            # actual charge was 1.4
+    """
+
+    def __init__(self, max_ops: Optional[float], max_qu: Optional[float], period: float = DEFAULT_PERIOD,
+                 path: str = BUDGET_FILE):
+        self.limits = {"ops": max_ops, "qu": max_qu}
+        self.period = float(period)
+        self.path = path
+        self.lock_path = path + ".lock"
+
+    @classmethod
+    def from_config(cls, adt_cfg: Dict[str, Any], path: str = BUDGET_FILE) -> "BudgetScheduler":
+        return cls(adt_cfg.get("max_ops"), adt_cfg.get("max_qu"),
+                   float(adt_cfg.get("budget_period_s", DEFAULT_PERIOD)), path)
+
+    def _state(self, now: float) -> Dict[str, float]:
+        """Token counts refilled to `now` (caller holds the lock)."""
+        try:
+            with open(self.path) as f:
+                st = json.load(f)
+            last = float(st["ts"])
+        except (OSError, ValueError, KeyError, TypeError):
+            st, last = {}, now
+        tokens = {}
+        for r, cap in self.limits.items():
+            if cap is None:
+                continue
+            cur = float(st.get(r, cap))
+            tokens[r] = min(float(cap), cur + max(0.0, now - last) * cap / self.period)
+        return tokens
+
+    def _save(self, tokens: Dict[str, float], now: float) -> None:
+        _write_json_atomic(self.path, dict(tokens, ts=now, period=self.period,
+                                           **{f"max_{r}": c for r, c in self.limits.items()}))
+
+    def available(self, now: Optional[float] = None) -> Dict[str, float]:
+        now = time.time() if now is None else now
+        with chain_lock(self.lock_path):
+            return self._state(now)
+
+    def _take(self, want: Dict[str, float], now: float, force: bool = False) -> float:
+        """Deduct `want` if affordable (or `force`); else return the wait in seconds."""
+        with chain_lock(self.lock_path):
+            tokens = self._state(now)
+            wait = 0.0
+            for r, n in want.items():
+                if r in tokens and n > 0 and tokens[r] < n:
+                    cap = self.limits[r]
+                    wait = max(wait, float("inf") if n > cap else (n - tokens[r]) * self.period / cap)
+            if wait and not force:
+                return wait
+            for r, n in want.items():
+                if r in tokens:
+                    tokens[r] -= n
+            self._save(tokens, now)
+            return 0.0
+
+    def acquire(self, ops: float = 1, qu: float = 0, max_wait: float = 0.0) -> None:
+        """
+        Reserve `ops` operations and `qu` query units, sleeping up to
+        `max_wait` seconds for refill; raises BudgetExceeded otherwise.
+        """
+        deadline = time.monotonic() + max_wait
+        while True:
+            wait = self._take({"ops": ops, "qu": qu}, time.time())
+            if not wait:
+                return
+            if time.monotonic() + wait > deadline:
+                raise BudgetExceeded(f"ADT budget exhausted (ops={ops}, qu={qu}; "
+                                     f"next slot in {wait:.1f}s, limits {self.limits})")
+            time.sleep(wait)
+
+    def settle(self, ops: float = 0, qu: float = 0) -> None:
+        """Adjust for the actual charge (positive = extra spend; may go into debt)."""
+        if ops or qu:
+            self._take({"ops": ops, "qu": qu}, time.time(), force=True)
+
+
+class QueryLayer:
+    def __init__(self, client, cache: Optional[QueryCache] = None, budget: Optional[BudgetScheduler] = None,
+                 max_wait: float = 0.0):
+        self.client = client
+        self.cache = cache if cache is not None else QueryCache()
+        self.budget = budget
+        self.max_wait = max_wait
+
+    def query(self, query: str, refresh: bool = False) -> Dict[str, Any]:
+        """
+        {"items", "query_charge", "cached"}; query_charge is 0 for a cache hit.
+        """
+        key = query_key(query)[:12]
+        if not refresh:
+            hit = self.cache.get(query)
+            if hit is not None:
+                self.client.record_usage("query_unit", 0, f"cache hit {key}")
+                return {"items": hit["items"], "query_charge": 0.0, "cached": True}
+        if self.budget is not None:
+            prev = self.cache.entry(query)
+            estimate = float(prev["query_charge"]) if prev and prev.get("query_charge") else 1.0
+            try:
+                self.budget.acquire(ops=1, qu=estimate, max_wait=self.max_wait)
+            except BudgetExceeded:
+                self.client.record_usage("operation", 0, f"over budget {key}")
+                raise
+        try:
+            result = self.client.query(query)
+        except Exception:
+            if self.budget is not None:
+                self.budget.settle(ops=-1, qu=-estimate)  # nothing was spent: refund the reservation
+            raise
+        if self.budget is not None:
+            self.budget.settle(qu=result["query_charge"] - estimate)
+        self.cache.put(query, result["items"], result["query_charge"])
+        return dict(result, cached=False)
+
+
+def from_config(client, config_path: str = CONFIG_PATH, max_wait: float = 0.0) -> QueryLayer:
+    """
+    QueryLayer with adt.max_ops / adt.max_qu (and optional adt.budget_period_s,
+    adt.query_cache_ttl_s) from the config.
+    """
+    adt_cfg = policy_model.load(config_path).doc.get("adt") or {}
+    cache = QueryCache(ttl=float(adt_cfg.get("query_cache_ttl_s", DEFAULT_TTL)))
+    return QueryLayer(client, cache, BudgetScheduler.from_config(adt_cfg), max_wait)
@@ -0,0 +1,285 @@
+# hub/adt_rollup.py
+"""
+Materialized minute/hour/day rollups of ADT usage.
+
+Each resolution is a dense file of fixed-width buckets (three little-endian
+int64 counters: operation, message, query_unit) behind a 24-byte header
+(magic, bucket width, first bucket index). Bucket i sits at a computable
+offset, so an update is one pread/pwrite and a time range is one pread per
+contiguous run of buckets.
+
+usage(start, end) covers a range with the coarsest aligned buckets: minutes
+up to the first hour boundary, hours up to the first day boundary, whole
+days, then hours and minutes on the way out. That is O(windows) reads, not
+O(records).
+
+The store follows audits/adt_usage.jsonl by byte offset (meta.json), so
+lines written by other tools are folded in by sync_log(). The meter feeds
+its own records through add()/commit() under the log's file lock.
+"""
+import calendar
+import json
+import os
+import struct
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from hub.record_tail import parse_records
+
+KINDS = ("operation", "message", "query_unit")
+ROLLUP_DIR = "audits/adt_rollups"
+RESOLUTIONS = {"minute": 60, "hour": 3600, "day": 86400}
+
+_HEADER = struct.Struct("<4sIqq")     # magic, width, origin bucket index, reserved
+_MAGIC = b"ACMR"
+_BUCKET = 24                           # 3 x int64
+
+
+def _ts_epoch(ts: str) -> Optional[int]:
+    try:
+        return calendar.timegm(time.strptime(ts, "%Y-%m-%dT%H:%M:%SZ"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _zero() -> Dict[str, int]:
+    return {k: 0 for k in KINDS}
+
+
+class _BucketFile:
+    def __init__(self, path: str, width: int):
+        self.path = path
+        self.width = width
+
+    def _origin(self, fd) -> Optional[int]:
+        head = os.pread(fd, _HEADER.size, 0)
+        if len(head) < _HEADER.size:
+            return None
+        magic, width, origin, _ = _HEADER.unpack(head)
+        if magic != _MAGIC or width != self.width:
+            raise ValueError(f"{self.path}: not a {self.width}s rollup file")
+        return origin
+
+    def add(self, deltas: Dict[int, List[int]]) -> None:
+        """Add counters to buckets {bucket_index: [op, msg, qu]}."""
+        if not deltas:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            origin = self._origin(fd)
+            lowest = min(deltas)
+            if origin is None:
+                origin = lowest
+                os.pwrite(fd, _HEADER.pack(_MAGIC, self.width, origin, 0), 0)
+            elif lowest < origin:
+                # Backfill before the first bucket: shift the body right
+                body = os.pread(fd, os.fstat(fd).st_size - _HEADER.size, _HEADER.size)
+                os.pwrite(fd, _HEADER.pack(_MAGIC, self.width, lowest, 0)
+                          + bytes((origin - lowest) * _BUCKET) + body, 0)
+                origin = lowest
+            for idx, vals in deltas.items():
+                pos = _HEADER.size + (idx - origin) * _BUCKET
+                raw = os.pread(fd, _BUCKET, pos)
+                cur = struct.unpack("<3q", raw) if len(raw) == _BUCKET else (0, 0, 0)
+                os.pwrite(fd, struct.pack("<3q", *(c + v for c, v in zip(cur, vals))), pos)
+        finally:
+            os.close(fd)
+
+    def sum(self, lo: int, hi: int) -> np.ndarray:
+        """Counters summed over bucket indexes [lo, hi)."""
+        if hi <= lo or not os.path.exists(self.path):
+            return np.zeros(3, dtype=np.int64)
+        with open(self.path, "rb") as f:
+            origin = self._origin(f.fileno())
+            if origin is None:
+                return np.zeros(3, dtype=np.int64)
+            lo = max(lo, origin)
+            if hi <= lo:
+                return np.zeros(3, dtype=np.int64)
+            raw = os.pread(f.fileno(), (hi - lo) * _BUCKET, _HEADER.size + (lo - origin) * _BUCKET)
+        n = len(raw) // _BUCKET
+        return np.frombuffer(raw[:n * _BUCKET], dtype="<i8").reshape(n, 3).sum(axis=0)
+
+    def series(self, lo: int, hi: int) -> np.ndarray:
+        out = np.zeros((max(0, hi - lo), 3), dtype=np.int64)
+        if hi <= lo or not os.path.exists(self.path):
+            return out
+        with open(self.path, "rb") as f:
+            origin = self._origin(f.fileno())
+            if origin is None:
+                return out
+            a = max(lo, origin)
+            if hi > a:
+                raw = os.pread(f.fileno(), (hi - a) * _BUCKET, _HEADER.size + (a - origin) * _BUCKET)
+                n = len(raw) // _BUCKET
+                out[a - lo:a - lo + n] = np.frombuffer(raw[:n * _BUCKET], dtype="<i8").reshape(n, 3)
+        return out
+
+
+def _segments(start: int, end: int) -> List[Tuple[int, int, int]]:
+    """
+    Split [start, end) (minute-aligned) into (width, lo, hi) runs of the
+    coarsest aligned buckets.
+    """
+    segs, tail = [], []
+    lo, hi = start, end
+    for fine, coarse in ((60, 3600), (3600, 86400)):
+        b = min(-(-lo // coarse) * coarse, hi)
+        if b > lo:
+            segs.append((fine, lo, b))
+            lo = b
+    for fine, coarse in ((60, 3600), (3600, 86400)):
+        a = max(hi // coarse * coarse, lo)
+        if a < hi:
+            tail.append((fine, a, hi))
+            hi = a
+    if hi > lo:
+        segs.append((86400, lo, hi))
+    return segs + tail[::-1]
+
+
+class RollupStore:
+    def __init__(self, path: str = ROLLUP_DIR):
+        self.path = path
+        self.meta_path = os.path.join(path, "meta.json")
+        self._files = {w: _BucketFile(os.path.join(path, f"{name}.bin"), w) for name, w in RESOLUTIONS.items()}
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[int, int], List[int]] = {}
+
+    # --- writes --------------------------------------------------------------
+
+    def add(self, epoch: int, kind: str, count: int) -> None:
+        """In-memory update for one record (visible to queries immediately)."""
+        k = KINDS.index(kind)
+        with self._lock:
+            for w in RESOLUTIONS.values():
+                vals = self._pending.setdefault((w, epoch // w), [0, 0, 0])
+                vals[k] += count
+
+    def take_pending(self) -> Dict[Tuple[int, int], List[int]]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def restore_pending(self, pending: Dict[Tuple[int, int], List[int]]) -> None:
+        """Put back counters from take_pending() that were never committed."""
+        with self._lock:
+            for key, vals in pending.items():
+                cur = self._pending.setdefault(key, [0, 0, 0])
+                for i, v in enumerate(vals):
+                    cur[i] += v
+
+    def _write(self, pending: Dict[Tuple[int, int], List[int]]) -> None:
+        by_width: Dict[int, Dict[int, List[int]]] = {}
+        for (w, idx), vals in pending.items():
+            by_width.setdefault(w, {})[idx] = vals
+        for w, deltas in by_width.items():
+            self._files[w].add(deltas)
+
+    def log_offset(self) -> int:
+        try:
+            with open(self.meta_path) as f:
+                return int(json.load(f)["log_offset"])
+        except (OSError, ValueError, KeyError):
+            return 0
+
+    def _set_log_offset(self, offset: int) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        tmp = self.meta_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"log_offset": offset}, f)
+        os.replace(tmp, self.meta_path)
+
+    def sync_log(self, log_path: str, upto: Optional[int] = None) -> int:
+        """
+        Fold complete log lines between the stored offset and `upto`
+        (default: EOF) into the buckets. Caller holds the log's file lock.
+        """
+        offset = self.log_offset()
+        try:
+            size = os.path.getsize(log_path) if upto is None else upto
+        except OSError:
+            return offset
+        if size <= offset:
+            return offset
+        with open(log_path, "rb") as f:
+            f.seek(offset)
+            data = f.read(size - offset)
+        cut = data.rfind(b"\n") + 1
+        pending: Dict[Tuple[int, int], List[int]] = {}
+        for rec in parse_records([ln for ln in data[:cut].split(b"\n") if ln.strip()]):
+            epoch = _ts_epoch(rec.get("ts")) if isinstance(rec, dict) else None
+            if epoch is None or rec.get("kind") not in KINDS:
+                continue
+            k = KINDS.index(rec["kind"])
+            for w in RESOLUTIONS.values():
+                pending.setdefault((w, epoch // w), [0, 0, 0])[k] += int(rec.get("count", 0))
+        self._write(pending)
+        self._set_log_offset(offset + cut)
+        return offset + cut
+
+    def commit(self, pending: Dict[Tuple[int, int], List[int]], log_offset: int) -> None:
+        """
+        Persist counters taken with take_pending() whose records end at
+        `log_offset` in the log. Caller holds the log's file lock.
+        """
+        self._write(pending)
+        self._set_log_offset(log_offset)
+
+    # --- queries -------------------------------------------------------------
+
+    def usage(self, start: int, end: int) -> Dict[str, int]:
+        """
+        Totals over [start, end) epoch seconds, widened to whole minutes.
+        """
+        start, end = start // 60 * 60, -(-end // 60) * 60
+        total = np.zeros(3, dtype=np.int64)
+        for w, lo, hi in _segments(start, end):
+            total += self._files[w].sum(lo // w, hi // w)
+        with self._lock:
+            for (w, idx), vals in self._pending.items():
+                if w == 60 and start <= idx * 60 < end:
+                    total += vals
+        return dict(zip(KINDS, (int(x) for x in total)))
+
+    def window(self, resolution: str = "minute", now: Optional[float] = None) -> Dict[str, int]:
+        """Totals of the current minute/hour/day bucket."""
+        w = RESOLUTIONS[resolution]
+        start = int(time.time() if now is None else now) // w * w
+        return self.usage(start, start + w)
+
+    def series(self, resolution: str, start: int, end: int) -> List[Dict[str, int]]:
+        """Per-bucket totals for [start, end) at one resolution."""
+        w = RESOLUTIONS[resolution]
+        lo, hi = start // w, -(-end // w)
+        rows = self._files[w].series(lo, hi)
+        with self._lock:
+            for (pw, idx), vals in self._pending.items():
+                if pw == w and lo <= idx < hi:
+                    rows[idx - lo] += vals
+        return [dict(zip(KINDS, (int(x) for x in r)), start=(lo + i) * w) for i, r in enumerate(rows)]
+
+
+def within_limits(usage: Dict[str, int], adt_cfg: Dict[str, int]) -> bool:
+    """adt.max_ops / adt.max_qu from configs/day13.yaml against a usage window."""
+    max_ops, max_qu = adt_cfg.get("max_ops"), adt_cfg.get("max_qu")
+    return ((max_ops is None or usage["operation"] <= max_ops)
+            and (max_qu is None or usage["query_unit"] <= max_qu))
+
+
+_stores: Dict[str, RollupStore] = {}
+
+
+def default_store() -> RollupStore:
+    """
+    Process-wide store at ROLLUP_DIR (resolved against the working directory).
+    """
+    key = os.path.abspath(ROLLUP_DIR)
+    s = _stores.get(key)
+    if s is None:
+        s = _stores.setdefault(key, RollupStore(key))
+    return s
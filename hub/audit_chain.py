@@ -0,0 +1,216 @@
+# hub/audit_chain.py
+"""
+Checkpointed, incremental and parallel verification of audit_chain.jsonl.
+
+Each line is an entry whose entry_hash is sha256_json(entry minus
+entry_hash) and whose prev_hash is the previous entry's entry_hash.
+
+A successful run stores a checkpoint (verified byte offset, line count,
+head hash). Later runs only check bytes past that offset, after confirming
+the checkpointed tail line still hashes to the recorded head; if it doesn't
+(truncation, rewrite, rotation) they fall back to a full pass.
+
+A full pass splits the file into newline-aligned chunks hashed in parallel
+worker processes; each chunk reports its first prev_hash and last
+entry_hash, and the links between chunks are stitched afterwards.
+"""
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+CHAIN_FILE = "audit_chain.jsonl"
+CHECKPOINT_FILE = "artifacts/chain_verify_checkpoint.json"
+CHUNK_BYTES = 4 * 1024 * 1024
+
+
+def sha256_json(obj) -> str:
+    data = json.dumps(obj, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def now_iso():
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+class ChainError(NamedTuple):
+    line: int
+    code: str           # "entry_hash" | "prev_hash" | "json"
+    message: str
+
+
+class Chunk(NamedTuple):
+    start: int
+    end: int
+    count: int
+    first_prev: Optional[str]
+    last_hash: Optional[str]
+    last_start: int     # byte offset of the chunk's last line
+    error: Optional[ChainError]   # line is 1-based within the chunk
+
+
+class VerifyResult(NamedTuple):
+    ok: bool
+    head: Optional[str]
+    lines: int
+    offset: int
+    checked_lines: int
+    incremental: bool
+    error: Optional[ChainError] = None
+
+
+def entry_hash_of(entry: Dict[str, Any]) -> str:
+    return sha256_json({k: v for k, v in entry.items() if k != "entry_hash"})
+
+
+def _verify_range(path: str, start: int, end: int) -> Chunk:
+    """
+    Check entry hashes and the prev_hash links inside [start, end).
+    The chunk's first prev_hash is returned for stitching, not checked.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    first_prev = last = None
+    count = 0
+    pos = last_start = start
+    for raw in data.split(b"\n")[:-1]:
+        count += 1
+        last_start, pos = pos, pos + len(raw) + 1
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            return Chunk(start, end, count, first_prev, last, last_start, ChainError(count, "json", "invalid JSON"))
+        eh, ph = entry.get("entry_hash"), entry.get("prev_hash")
+        if eh != entry_hash_of(entry):
+            return Chunk(start, end, count, first_prev, last, last_start,
+                         ChainError(count, "entry_hash", "entry_hash mismatch"))
+        if count == 1:
+            first_prev = ph
+        elif ph != last:
+            return Chunk(start, end, count, first_prev, last, last_start,
+                         ChainError(count, "prev_hash", f"prev_hash mismatch (expected {last}, got {ph})"))
+        last = eh
+    return Chunk(start, end, count, first_prev, last, last_start, None)
+
+
+def _split(path: str, start: int, end: int, chunk_bytes: int) -> List[Tuple[int, int]]:
+    ranges = []
+    with open(path, "rb") as f:
+        pos = start
+        while pos < end:
+            cut = min(pos + chunk_bytes, end)
+            if cut < end:
+                f.seek(cut)
+                tail = f.readline()
+                cut = min(cut + len(tail), end)
+            ranges.append((pos, cut))
+            pos = cut
+    return ranges
+
+
+def _complete_end(path: str, size: int) -> int:
+    """
+    Offset just past the last newline; a partially written tail line is left
+    for the next run.
+    """
+    with open(path, "rb") as f:
+        pos = size
+        while pos > 0:
+            step = min(65536, pos)
+            f.seek(pos - step)
+            block = f.read(step)
+            i = block.rfind(b"\n")
+            if i >= 0:
+                return pos - step + i + 1
+            pos -= step
+    return 0
+
+
+def load_checkpoint(path: str = CHECKPOINT_FILE) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except ValueError:
+        return None
+
+
+def write_checkpoint(result: VerifyResult, chain_path: str, tail_start: int,
+                     path: str = CHECKPOINT_FILE) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({
+            "chain_file": os.path.abspath(chain_path),
+            "offset": result.offset,
+            "lines": result.lines,
+            "head": result.head,
+            "tail_start": tail_start,
+            "updated_at": now_iso(),
+        }, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _resume_point(cp: Optional[Dict[str, Any]], chain_path: str, end: int) -> Optional[Dict[str, Any]]:
+    """
+    The checkpoint, if it still describes a prefix of this file: same path,
+    offset within the file, and the line ending at the offset still hashes
+    to the recorded head.
+    """
+    if not cp or cp.get("chain_file") != os.path.abspath(chain_path):
+        return None
+    offset, tail_start = cp.get("offset", 0), cp.get("tail_start", 0)
+    if offset == 0:
+        return cp if cp.get("head") is None else None
+    if offset > end or not 0 <= tail_start < offset:
+        return None
+    tail = _verify_range(chain_path, tail_start, offset)
+    if tail.error or tail.count != 1 or tail.last_hash != cp.get("head"):
+        return None
+    return cp
+
+
+def verify(chain_path: str = CHAIN_FILE, checkpoint_path: Optional[str] = CHECKPOINT_FILE,
+           full: bool = False, workers: Optional[int] = None, chunk_bytes: int = CHUNK_BYTES) -> VerifyResult:
+    """
+    Verify the chain, resuming from the checkpoint unless `full`. On success
+    the checkpoint is advanced (pass checkpoint_path=None to skip it).
+    """
+    if not os.path.exists(chain_path):
+        return VerifyResult(True, None, 0, 0, 0, False)
+
+    end = _complete_end(chain_path, os.path.getsize(chain_path))
+    cp = None if full or not checkpoint_path else _resume_point(load_checkpoint(checkpoint_path), chain_path, end)
+    start, prev, base_lines = (cp["offset"], cp["head"], cp["lines"]) if cp else (0, None, 0)
+    tail_start = cp["tail_start"] if cp else 0
+
+    ranges = _split(chain_path, start, end, chunk_bytes)
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(ranges) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+            chunks = list(pool.map(_verify_range, [chain_path] * len(ranges), *zip(*ranges)))
+    else:
+        chunks = [_verify_range(chain_path, s, e) for s, e in ranges]
+
+    # Stitch: each chunk's first prev_hash must be the previous chunk's last hash
+    lines = base_lines
+    for c in chunks:
+        err = c.error
+        if c.count and not (err and err.line == 1 and err.code != "prev_hash") and c.first_prev != prev:
+            err = ChainError(1, "prev_hash", f"prev_hash mismatch (expected {prev}, got {c.first_prev})")
+        if err:
+            return VerifyResult(False, prev, lines, c.start, lines - base_lines, cp is not None,
+                                err._replace(line=lines + err.line))
+        if c.count:
+            lines += c.count
+            prev = c.last_hash
+            tail_start = c.last_start
+
+    result = VerifyResult(True, prev, lines, end, lines - base_lines, cp is not None)
+    if checkpoint_path:
+        write_checkpoint(result, chain_path, tail_start, checkpoint_path)
+    return result
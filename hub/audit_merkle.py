@@ -0,0 +1,284 @@
+# hub/audit_merkle.py
+"""
+Merkle tree over audit_chain.jsonl (RFC 6962 / RFC 9162 hashing).
+
+Leaf i is the chain's i-th entry: leaf hash = SHA256(0x00 || entry_hash),
+interior node = SHA256(0x01 || left || right). Only complete subtrees are
+stored (table `nodes`, keyed by level and index), so an append writes the
+leaf plus at most log2(n) parents, and any root, inclusion path or
+consistency path is assembled from O(log n) stored nodes.
+
+The tree follows the chain by byte offset: sync() reads only entries
+appended since the last call, so a crash between the chain write and the
+tree update is repaired on the next sync. A tree indexes one chain file.
+The first sync records that file's path, and syncing any other file is
+refused.
+
+Auditors check proofs with verify_inclusion() / verify_consistency(),
+which need nothing but hashlib.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+MERKLE_PATH = "artifacts/audit_merkle.sqlite"
+CHAIN_FILE = "audit_chain.jsonl"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leaves (
+    idx        INTEGER PRIMARY KEY,
+    entry_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS leaves_entry ON leaves(entry_hash);
+CREATE TABLE IF NOT EXISTS nodes (
+    level INTEGER NOT NULL,
+    idx   INTEGER NOT NULL,
+    hash  BLOB NOT NULL,
+    PRIMARY KEY (level, idx)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def leaf_hash(entry_hash: str) -> bytes:
+    return hashlib.sha256(b"\x00" + entry_hash.encode("utf-8")).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def _split_point(n: int) -> int:
+    # Largest power of two strictly smaller than n (n >= 2)
+    return 1 << ((n - 1).bit_length() - 1)
+
+
+class AuditMerkle:
+    def __init__(self, path: str = MERKLE_PATH):
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    # --- writes --------------------------------------------------------------
+
+    def _append(self, conn: sqlite3.Connection, idx: int, entry_hash: str) -> None:
+        h = leaf_hash(entry_hash)
+        conn.execute("INSERT INTO leaves(idx, entry_hash) VALUES (?, ?)", (idx, entry_hash))
+        conn.execute("INSERT INTO nodes(level, idx, hash) VALUES (0, ?, ?)", (idx, h))
+        level = 0
+        while idx & 1:
+            left = conn.execute("SELECT hash FROM nodes WHERE level = ? AND idx = ?", (level, idx - 1)).fetchone()[0]
+            h = node_hash(left, h)
+            level, idx = level + 1, idx >> 1
+            conn.execute("INSERT INTO nodes(level, idx, hash) VALUES (?, ?, ?)", (level, idx, h))
+
+    def append(self, entry_hash: str) -> int:
+        """
+        Add one leaf; returns its index. O(log n) node writes.
+        """
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            idx = self._size(conn)
+            self._append(conn, idx, entry_hash)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return idx
+
+    def sync(self, chain_path: str = CHAIN_FILE) -> int:
+        """
+        Append every chain entry written since the last sync; returns the
+        tree size. Raises ValueError if the chain shrank (rewritten history)
+        or is not the file this tree indexes.
+        """
+        if not os.path.exists(chain_path):
+            return self.size()
+        # Stored relative to the tree file, so moving the checkout keeps the binding
+        bound_path = os.path.relpath(os.path.abspath(chain_path), os.path.dirname(os.path.abspath(self.path)))
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+            if meta.get("chain_path", bound_path) != bound_path:
+                raise ValueError(f"{self.path} indexes {meta['chain_path']}, not {chain_path}")
+            conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES ('chain_path', ?)", (bound_path,))
+            offset = int(meta.get("chain_offset", 0))
+            size = os.path.getsize(chain_path)
+            if size < offset:
+                raise ValueError(f"{chain_path} is shorter than the indexed prefix ({size} < {offset} bytes)")
+            idx = self._size(conn)
+            if size > offset:
+                with open(chain_path, "rb") as f:
+                    f.seek(offset)
+                    data = f.read(size - offset)
+                cut = data.rfind(b"\n") + 1
+                for raw in data[:cut].split(b"\n"):
+                    if raw.strip():
+                        self._append(conn, idx, json.loads(raw)["entry_hash"])
+                        idx += 1
+                conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES ('chain_offset', ?)", (str(offset + cut),))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return idx
+
+    # --- reads ---------------------------------------------------------------
+
+    def _size(self, conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT COALESCE(MAX(idx) + 1, 0) FROM leaves").fetchone()[0]
+
+    def size(self) -> int:
+        return self._size(self._conn())
+
+    def index_of(self, entry_hash: str) -> Optional[int]:
+        row = self._conn().execute("SELECT MIN(idx) FROM leaves WHERE entry_hash = ?", (entry_hash,)).fetchone()
+        return row[0] if row else None
+
+    def _node(self, level: int, idx: int) -> bytes:
+        return self._conn().execute("SELECT hash FROM nodes WHERE level = ? AND idx = ?", (level, idx)).fetchone()[0]
+
+    def _mth(self, a: int, b: int) -> bytes:
+        """
+        Merkle tree hash of leaves [a, b); [a, b) is always aligned the way
+        RFC 6962 splits it, so perfect subtrees come straight from `nodes`.
+        """
+        n = b - a
+        if n & (n - 1) == 0 and a % n == 0:
+            return self._node(n.bit_length() - 1, a // n)
+        k = _split_point(n)
+        return node_hash(self._mth(a, a + k), self._mth(a + k, b))
+
+    def _check_size(self, size: Optional[int]) -> int:
+        current = self.size()
+        if size is None:
+            return current
+        if not 0 <= size <= current:
+            raise ValueError(f"tree size {size} out of range (0..{current})")
+        return size
+
+    def root(self, size: Optional[int] = None) -> str:
+        size = self._check_size(size)
+        return (self._mth(0, size) if size else hashlib.sha256(b"").digest()).hex()
+
+    def inclusion_proof(self, index: int, size: Optional[int] = None) -> List[str]:
+        """
+        Audit path for leaf `index` in the tree of `size` leaves (RFC 6962 PATH).
+        """
+        size = self._check_size(size)
+        if not 0 <= index < size:
+            raise ValueError(f"leaf {index} not in tree of size {size}")
+        path: List[bytes] = []
+        a, b, m = 0, size, index
+        while b - a > 1:
+            k = _split_point(b - a)
+            if m < k:
+                path.append(self._mth(a + k, b))
+                b = a + k
+            else:
+                path.append(self._mth(a, a + k))
+                a, m = a + k, m - k
+        return [h.hex() for h in reversed(path)]
+
+    def consistency_proof(self, first: int, second: Optional[int] = None) -> List[str]:
+        """
+        Proof that the first `first` leaves are a prefix of the tree of
+        `second` leaves (RFC 6962 SUBPROOF).
+        """
+        second = self._check_size(second)
+        if not 0 < first <= second:
+            raise ValueError(f"need 0 < first <= second (got {first}, {second})")
+        path: List[bytes] = []
+        a, b, m, complete = 0, second, first, True
+        while m != b - a:
+            k = _split_point(b - a)
+            if m <= k:
+                path.append(self._mth(a + k, b))
+                b = a + k
+            else:
+                path.append(self._mth(a, a + k))
+                a, m, complete = a + k, m - k, False
+        if not complete:
+            path.append(self._mth(a, b))
+        return [h.hex() for h in reversed(path)]
+
+
+def verify_inclusion(entry_hash: str, index: int, size: int, proof: List[str], root: str) -> bool:
+    """
+    RFC 9162 section 2.1.3.2.
+    """
+    if not 0 <= index < size:
+        return False
+    fn, sn, r = index, size - 1, leaf_hash(entry_hash)
+    for p in (bytes.fromhex(x) for x in proof):
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            r = node_hash(p, r)
+            while not fn & 1 and fn:
+                fn, sn = fn >> 1, sn >> 1
+        else:
+            r = node_hash(r, p)
+        fn, sn = fn >> 1, sn >> 1
+    return sn == 0 and r.hex() == root
+
+
+def verify_consistency(first: int, second: int, first_root: str, second_root: str, proof: List[str]) -> bool:
+    """
+    RFC 9162 section 2.1.4.2.
+    """
+    if not 0 < first <= second:
+        return False
+    if first == second:
+        return not proof and first_root == second_root
+    path = [bytes.fromhex(x) for x in proof]
+    if first & (first - 1) == 0:
+        path.insert(0, bytes.fromhex(first_root))
+    if not path:
+        return False
+    fn, sn = first - 1, second - 1
+    while fn & 1:
+        fn, sn = fn >> 1, sn >> 1
+    fr = sr = path[0]
+    for c in path[1:]:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            fr, sr = node_hash(c, fr), node_hash(c, sr)
+            while not fn & 1 and fn:
+                fn, sn = fn >> 1, sn >> 1
+        else:
+            sr = node_hash(sr, c)
+        fn, sn = fn >> 1, sn >> 1
+    return sn == 0 and fr.hex() == first_root and sr.hex() == second_root
+
+
+_trees: Dict[str, AuditMerkle] = {}
+
+
+def default_tree() -> AuditMerkle:
+    """
+    Process-wide tree at MERKLE_PATH (resolved against the working directory).
+    """
+    key = os.path.abspath(MERKLE_PATH)
+    t = _trees.get(key)
+    if t is None:
+        t = _trees.setdefault(key, AuditMerkle(key))
+    return t
@@ -0,0 +1,279 @@
+# hub/chain_append.py
+"""
+Group-commit appender for the repo's hash-chained logs.
+
+A batch of entries is chained in memory against the current head, written
+with a single buffered write, and the head file is rewritten once. The
+whole read-head -> write -> write-head step runs under chain_lock(), which
+serializes threads and processes on the same chain.
+
+Formats (one per chain in the repo):
+- AuditChain:   audit_chain.jsonl + artifacts/chain_head.json (append_audit.py)
+- ProofChain:   audits/day13_proof.jsonl + audits/chain.meta (write_proof.py)
+- RunbookChain: audits/chain.log, head = last line's "hash" (runbook.sh)
+
+Durability (`fsync=`):
+- "batch":        fsync after every append_many() call (default)
+- "every:N":      fsync once at least N entries are unsynced
+- "interval:S":   a background thread fsyncs dirty data every S seconds
+- "none":         leave flushing to the OS
+"""
+import fcntl
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from hub.record_tail import parse_records, tail_lines
+
+AUDIT_CHAIN = "audit_chain.jsonl"  # the chain artifacts/audit_merkle.sqlite indexes
+
+_path_locks: Dict[str, threading.Lock] = {}
+_path_locks_guard = threading.Lock()
+
+
+@contextmanager
+def chain_lock(lock_path: str):
+    """
+    Exclusive lock for one chain: a per-path threading.Lock (flock does not
+    exclude threads sharing a process) plus fcntl.flock for other processes.
+    """
+    key = os.path.abspath(lock_path)
+    with _path_locks_guard:
+        mutex = _path_locks.setdefault(key, threading.Lock())
+    os.makedirs(os.path.dirname(key), exist_ok=True)
+    with mutex:
+        with open(key, "w") as lf:
+            fcntl.flock(lf, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lf, fcntl.LOCK_UN)
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_json_atomic(path: str, obj: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(obj, f, indent=2)
+    os.replace(tmp, path)
+
+
+class AuditChain:
+    """
+    audit_chain.jsonl: {"timestamp", "prev_hash", "lineage", "entry_hash"},
+    entry_hash = sha256 of the compact sorted-key JSON without entry_hash.
+    Items are lineage documents. The Merkle index is synced after each
+    commit; by default only for the repo's audit_chain.jsonl, the one
+    chain it covers.
+    """
+
+    def __init__(self, chain_path: str = AUDIT_CHAIN, head_path: str = "artifacts/chain_head.json",
+                 merkle: Optional[bool] = None):
+        self.chain_path = chain_path
+        self.head_path = head_path
+        self.lock_path = head_path + ".lock"
+        self.merkle = os.path.abspath(chain_path) == os.path.abspath(AUDIT_CHAIN) if merkle is None else merkle
+
+    def read_head(self) -> Optional[str]:
+        if os.path.exists(self.head_path):
+            with open(self.head_path) as f:
+                return json.load(f).get("head")
+        # No head file (fresh checkout): continue from the chain's last entry
+        if os.path.exists(self.chain_path):
+            last = parse_records(tail_lines(self.chain_path, 1))
+            return last[0].get("entry_hash") if last and isinstance(last[0], dict) else None
+        return None
+
+    def seal(self, lineage: Any, prev: Optional[str]) -> Tuple[Dict[str, Any], str, str]:
+        entry = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "prev_hash": prev, "lineage": lineage}
+        h = _sha256(json.dumps(entry, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+        entry["entry_hash"] = h
+        return entry, json.dumps(entry, separators=(",", ":")), h
+
+    def write_head(self, head: str) -> None:
+        _write_json_atomic(self.head_path, {"head": head, "updated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())})
+
+    def committed(self) -> None:
+        if self.merkle:
+            from hub import audit_merkle
+            try:
+                audit_merkle.default_tree().sync(self.chain_path)
+            except (ValueError, OSError, sqlite3.Error) as e:
+                # The entries are already committed; the index catches up on its next sync
+                print(f"warning: Merkle index not updated: {e}", file=sys.stderr)
+
+
+class ProofChain:
+    """
+    audits/day13_proof.jsonl: entry_digest = sha256(json.dumps(entry, sort_keys=True)),
+    chain_head = sha256(prev_head || entry_digest). Items are proof entries
+    without prev_head/entry_digest/chain_head.
+    """
+
+    def __init__(self, chain_path: str = "audits/day13_proof.jsonl", head_path: str = "audits/chain.meta"):
+        self.chain_path = chain_path
+        self.head_path = head_path
+        self.lock_path = head_path + ".lock"
+
+    def read_head(self) -> Optional[str]:
+        if not os.path.exists(self.head_path):
+            return None
+        with open(self.head_path) as f:
+            return json.load(f).get("head_digest")
+
+    def seal(self, item: Dict[str, Any], prev: Optional[str]) -> Tuple[Dict[str, Any], str, str]:
+        entry = dict(item, prev_head=prev)
+        digest = _sha256(json.dumps(entry, sort_keys=True).encode())
+        entry["entry_digest"] = digest
+        head = _sha256(((prev or "") + digest).encode())
+        entry["chain_head"] = head
+        return entry, json.dumps(entry), head
+
+    def write_head(self, head: str) -> None:
+        _write_json_atomic(self.head_path, {"head_digest": head, "updated_at": datetime.now(timezone.utc).isoformat()})
+
+    def committed(self) -> None:
+        pass
+
+
+class RunbookChain:
+    """
+    audits/chain.log: hash = sha256 of the compact JSON (insertion order, as
+    `jq -c` prints it) without "hash"; prev_hash is omitted for the first entry.
+    """
+
+    def __init__(self, chain_path: str = "audits/chain.log"):
+        self.chain_path = chain_path
+        self.head_path = None
+        self.lock_path = chain_path + ".lock"
+
+    def read_head(self) -> Optional[str]:
+        if not os.path.exists(self.chain_path):
+            return None
+        last = parse_records(tail_lines(self.chain_path, 1))
+        return (last[0].get("hash") or None) if last and isinstance(last[0], dict) else None
+
+    def seal(self, item: Dict[str, Any], prev: Optional[str]) -> Tuple[Dict[str, Any], str, str]:
+        entry = {k: v for k, v in item.items() if k not in ("prev_hash", "hash")}
+        if prev:
+            entry["prev_hash"] = prev
+        h = _sha256(json.dumps(entry, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+        entry["hash"] = h
+        return entry, json.dumps(entry, separators=(",", ":"), ensure_ascii=False), h
+
+    def write_head(self, head: str) -> None:
+        pass  # the head is the chain's last line
+
+    def committed(self) -> None:
+        pass
+
+
+FORMATS = {"audit": AuditChain, "proof": ProofChain, "runbook": RunbookChain}
+
+
+def parse_fsync(policy: str) -> Tuple[str, float]:
+    mode, _, arg = policy.partition(":")
+    if mode in ("batch", "none") and not arg:
+        return mode, 0
+    if mode == "every" and arg.isdigit() and int(arg) > 0:
+        return mode, int(arg)
+    if mode == "interval":
+        try:
+            if float(arg) > 0:
+                return mode, float(arg)
+        except ValueError:
+            pass
+    raise ValueError(f"invalid fsync policy: {policy!r} (batch | none | every:N | interval:SECONDS)")
+
+
+class ChainAppender:
+    """
+        with ChainAppender(AuditChain(), fsync="every:100") as app:
+            entries = app.append_many(lineages)
+    """
+
+    def __init__(self, fmt, fsync: str = "batch"):
+        self.fmt = fmt
+        self.mode, self.arg = parse_fsync(fsync)
+        self._fd: Optional[int] = None
+        self._unsynced = 0
+        self._sync_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._timer: Optional[threading.Thread] = None
+        if self.mode == "interval":
+            self._timer = threading.Thread(target=self._sync_loop, name="chain-fsync", daemon=True)
+            self._timer.start()
+
+    def _open(self) -> int:
+        if self._fd is None:
+            os.makedirs(os.path.dirname(self.fmt.chain_path) or ".", exist_ok=True)
+            self._fd = os.open(self.fmt.chain_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        return self._fd
+
+    def append_many(self, items: Iterable[Any]) -> List[Dict[str, Any]]:
+        """
+        Chain and write `items` as one batch; returns the sealed entries.
+        """
+        items = list(items)
+        if not items:
+            return []
+        with chain_lock(self.fmt.lock_path):
+            head = self.fmt.read_head()
+            entries, lines = [], []
+            for item in items:
+                entry, line, head = self.fmt.seal(item, head)
+                entries.append(entry)
+                lines.append(line)
+            data = ("\n".join(lines) + "\n").encode("utf-8")
+            fd = self._open()
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            with self._sync_lock:
+                self._unsynced += len(entries)
+            if self.mode == "batch" or (self.mode == "every" and self._unsynced >= self.arg):
+                self.flush()
+            self.fmt.write_head(head)
+        self.fmt.committed()
+        return entries
+
+    def append(self, item: Any) -> Dict[str, Any]:
+        return self.append_many([item])[0]
+
+    def flush(self) -> None:
+        """fsync unsynced entries now."""
+        with self._sync_lock:
+            if self._fd is not None and self._unsynced:
+                os.fsync(self._fd)
+                self._unsynced = 0
+
+    def _sync_loop(self):
+        while not self._stop.wait(self.arg):
+            self.flush()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._timer:
+            self._timer.join()
+        if self.mode != "none":
+            self.flush()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
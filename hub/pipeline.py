@@ -0,0 +1,134 @@
+# hub/pipeline.py
+"""
+In-process Day 13 pipeline: seed -> plans -> verify -> simulate -> proof.
+
+Each stage calls the matching scripts/*.py function and returns Python
+objects, so callers (app.py, benchmarks) run the whole flow in one warm
+interpreter instead of spawning python3 per stage and parsing stdout.
+
+Stages are run-scoped: given a run id, every artifact lands in
+data/runs/<run_id>/ and is recorded in the run manifest, so concurrent
+sessions never read each other's bundles. The proof chain stays shared
+and is serialized by write_proof.chain_lock().
+
+When no candidate fits the limits, gen_plans raises
+plan_search.NoFeasiblePlan and run() stops there: no bundle, simulation
+or proof is written for the run.
+"""
+import json
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from hub import run_manifest
+from scripts import seed_disruption, generate_plans, verify_policies, simulate_twin
+from scripts import write_proof as proof_writer
+
+RUNS_DIR = "data/runs"
+
+
+@dataclass
+class RunResult:
+    run_id: str
+    event: Dict[str, Any]
+    event_path: str
+    bundle: Dict[str, Any]
+    bundle_path: str
+    verification: Dict[str, Any]
+    sim: Dict[str, Any]
+    sim_path: str
+    proof: Optional[Dict[str, Any]] = None
+
+
+def run_dir(run_id: str, sub: str = "") -> str:
+    return os.path.join(RUNS_DIR, run_id, sub) if sub else os.path.join(RUNS_DIR, run_id)
+
+
+def write_snapshot(snapshot: Dict[str, Any], run_id: str) -> str:
+    """
+    Persist the twin snapshot for this run only (never the shared twin_snapshot.json).
+    """
+    path = os.path.join(run_dir(run_id), "twin_snapshot.json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, indent=2)
+    os.replace(tmp, path)
+    run_manifest.record(run_id, "snapshot", path)
+    return path
+
+
+def seed_event(event: Optional[Dict[str, Any]], run_id: str) -> Tuple[Dict[str, Any], str]:
+    return seed_disruption.seed_event(event, run_dir(run_id, "events"), run_id=run_id)
+
+
+def gen_plans(event: Dict[str, Any], event_path: str, run_id: str) -> Tuple[Dict[str, Any], str]:
+    return generate_plans.generate_bundle(event, event_path, run_dir(run_id, "plans"), run_id=run_id)
+
+
+def verify(bundle: Dict[str, Any], bundle_path: str, cfg: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Z3 verdicts for every plan in the bundle (same shape as verify_policies.py stdout).
+    """
+    if cfg is None:
+        cfg = verify_policies.load_config()
+    return verify_policies.verify_bundle(bundle, bundle_path, cfg)
+
+
+def simulate(bundle: Dict[str, Any], bundle_path: str, run_id: str) -> Tuple[Dict[str, Any], str]:
+    return simulate_twin.simulate_bundle(bundle, bundle_path, run_dir(run_id, "sim"), run_id=run_id)
+
+
+def write_proof(bundle: Dict[str, Any], bundle_path: str, sim: Dict[str, Any], sim_path: str,
+                run_id: str) -> Dict[str, Any]:
+    return proof_writer.write_proof(bundle, bundle_path, sim, sim_path, run_id=run_id)
+
+
+def run(event: Optional[Dict[str, Any]] = None, with_proof: bool = True,
+        snapshot: Optional[Dict[str, Any]] = None, run_id: Optional[str] = None) -> RunResult:
+    """
+    Run every stage back to back, handing each stage's output to the next
+    directly rather than re-discovering it on disk. Every artifact is
+    recorded in the run manifest under one run id.
+    """
+    run_id = run_id or run_manifest.new_run_id()
+    if snapshot is not None:
+        write_snapshot(snapshot, run_id)
+    event, event_path = seed_event(event, run_id)
+    bundle, bundle_path = gen_plans(event, event_path, run_id)
+    verification = verify(bundle, bundle_path)
+    sim, sim_path = simulate(bundle, bundle_path, run_id)
+    proof = write_proof(bundle, bundle_path, sim, sim_path, run_id) if with_proof else None
+    return RunResult(run_id, event, event_path, bundle, bundle_path, verification, sim, sim_path, proof)
+
+
+class PipelineEngine:
+    """
+    Bounded worker pool running independent pipelines concurrently.
+
+        with PipelineEngine(max_workers=4) as eng:
+            results = eng.run_many([evt1, evt2, ...])
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="acm-run")
+
+    def submit(self, event: Optional[Dict[str, Any]] = None, with_proof: bool = True,
+               snapshot: Optional[Dict[str, Any]] = None) -> Future:
+        return self._pool.submit(run, event, with_proof, snapshot)
+
+    def run_many(self, events: List[Optional[Dict[str, Any]]], with_proof: bool = True,
+                 snapshot: Optional[Dict[str, Any]] = None) -> List[RunResult]:
+        futures = [self.submit(e, with_proof, snapshot) for e in events]
+        return [f.result() for f in futures]
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
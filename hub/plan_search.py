@@ -0,0 +1,330 @@
+# hub/plan_search.py
+"""
+Combinatorial candidate-plan search over a twin snapshot.
+
+A candidate plan for a disruption event combines:
+  - at most one reroute: a simple path of up to `max_hops` routes from the
+    event warehouse to the far end of the disrupted route, avoiding that
+    route. For twins whose routes carry no endpoints, every other route is
+    a one-hop lane.
+  - any number of inventory reallocations: units moved from a neighbouring
+    warehouse over its fastest lane. A donor keeps enough stock to stay
+    within max_stockout_risk.
+
+Cost adds up over actions. The plan's delay is the slowest action, since
+actions run in parallel. An unrerouted outage or delay spike keeps the
+disrupted route's latency, scaled by the event's severity. Candidates are
+ranked by
+    score = cost_usd + RISK_USD x stockout_risk + DELAY_USD_PER_MIN x delay_minutes
+(lower is better).
+
+The search is a depth-first branch and bound: the reroute choice first,
+then one donor at a time. Cost and delay only grow along a branch, so a
+branch is pruned as soon as its partial cost exceeds budget_cap_usd or its
+partial delay exceeds max_delay_minutes. Once K plans are held, a branch
+is also pruned when its lower bound cannot beat the K-th best. The bound
+assumes every remaining donor gives its full allowance at no cost.
+
+search() streams each plan as it enters the current top K. top_k() returns
+the final ranking. With `deadline_s` set, both stop at the deadline and
+keep the best plans found so far (anytime mode).
+"""
+import hashlib
+import heapq
+import json
+import math
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+REROUTE_USD_PER_MIN = 60.0
+HOP_USD = 800.0
+TRANSFER_USD_PER_UNIT = 25.0
+TRANSFER_USD_PER_MIN = 20.0
+RISK_USD = 20000.0
+DELAY_USD_PER_MIN = 50.0
+SEVERITY_DELAY = {"low": 1.25, "medium": 1.5, "high": 2.0, "critical": 3.0}
+DISRUPTED_ROUTE = ("route_outage", "delay_spike")
+DEFAULT_LATENCY_MS = 420
+CHECK_EVERY = 256  # nodes between deadline checks
+
+
+class Limits(NamedTuple):
+    budget_cap_usd: float = 10000.0
+    max_delay_minutes: float = 45.0
+    max_stockout_risk: float = 0.35
+    sla_min_percent: float = 96.0
+    region: str = "EU"
+
+
+class SearchSpec(NamedTuple):
+    top_k: int = 8
+    max_hops: int = 3
+    max_paths: int = 32
+    max_donors: int = 8
+    levels: Tuple[float, ...] = (1.0, 0.5)  # fractions of a donor's allowance to try
+    deadline_s: Optional[float] = None
+
+
+class NoFeasiblePlan(ValueError):
+    """No candidate plan fits the budget and delay limits."""
+
+
+class SearchResult(NamedTuple):
+    plans: List[Dict[str, Any]]  # best first
+    complete: bool               # False when the deadline cut the search short
+    explored: int
+    pruned: int
+
+
+def limits_from(cfg: Dict[str, Any], policy: Optional[Dict[str, Any]] = None) -> Limits:
+    """Limits from a configs/day13.yaml document plus, if given, policies/base.yaml."""
+    d = Limits()
+    risk = ((policy or {}).get("constraints") or {}).get("risk_thresholds") or {}
+    return Limits(
+        budget_cap_usd=float(cfg.get("budget_cap_usd", d.budget_cap_usd)),
+        max_delay_minutes=float(risk.get("max_delay_minutes", cfg.get("max_delay_minutes", d.max_delay_minutes))),
+        max_stockout_risk=float(risk.get("max_stockout_risk", d.max_stockout_risk)),
+        sla_min_percent=float(cfg.get("sla_min_percent", d.sla_min_percent)),
+        region=str(cfg.get("region_data_boundary", d.region)),
+    )
+
+
+class _Reroute(NamedTuple):
+    route_ids: Tuple[str, ...]
+    delay: float
+    cost: float
+    capacity: Optional[int]
+
+
+class _Donor(NamedTuple):
+    warehouse_id: str
+    route_id: str
+    delay: float
+    units: int  # allowance
+
+
+def _latency(routes: Dict[str, Any], rid: str) -> float:
+    return float(routes[rid].get("latency_minutes", 0))
+
+
+def _reroutes(snap: Dict[str, Any], adj: Dict[str, List[Tuple[str, str]]], loose: List[str],
+              wid: str, rid: str, limits: Limits, spec: SearchSpec) -> List[_Reroute]:
+    routes = snap.get("routes", {})
+    ends = routes.get(rid, {}).get("warehouses") or ()
+    paths: List[Tuple[str, ...]] = []
+    if wid in ends and len(ends) == 2:
+        far = ends[1] if ends[0] == wid else ends[0]
+        stack = [(wid, (), (wid,), 0.0)]
+        while stack:  # simple paths wid -> far, pruned on latency
+            node, path, seen, lat = stack.pop()
+            for r, nxt in adj.get(node, ()):
+                if r == rid or nxt in seen:
+                    continue
+                total = lat + _latency(routes, r)
+                if total > limits.max_delay_minutes:
+                    continue
+                if nxt == far:
+                    paths.append(path + (r,))
+                elif len(path) + 1 < spec.max_hops:
+                    stack.append((nxt, path + (r,), seen + (nxt,), total))
+    else:
+        paths = [(r,) for r, _ in adj.get(wid, ()) if r != rid] + [(r,) for r in loose if r != rid]
+
+    out = []
+    for p in dict.fromkeys(paths):
+        delay = sum(_latency(routes, r) for r in p)
+        cost = REROUTE_USD_PER_MIN * delay + HOP_USD * len(p)
+        if delay > limits.max_delay_minutes or cost > limits.budget_cap_usd:
+            continue
+        caps = [routes[r]["capacity"] for r in p if "capacity" in routes[r]]
+        out.append(_Reroute(p, delay, cost, min(caps) if caps else None))
+    out.sort(key=lambda r: (r.cost, r.route_ids))
+    return out[:spec.max_paths]
+
+
+def _donors(snap: Dict[str, Any], adj: Dict[str, List[Tuple[str, str]]], loose: List[str],
+            wid: str, rid: str, disrupted: bool, limits: Limits, spec: SearchSpec) -> List[_Donor]:
+    warehouses, routes = snap.get("warehouses", {}), snap.get("routes", {})
+    lanes: Dict[str, Tuple[float, str]] = {}
+    for r, other in adj.get(wid, ()):
+        if not (disrupted and r == rid) and other != wid:
+            lanes[other] = min(lanes.get(other, (math.inf, "")), (_latency(routes, r), r))
+    usable = [r for r in loose if not (disrupted and r == rid)]
+    if usable:  # routes without endpoints: any warehouse over the fastest one
+        best = min((_latency(routes, r), r) for r in usable)
+        for other in warehouses:
+            if other != wid:
+                lanes[other] = min(lanes.get(other, (math.inf, "")), best)
+
+    out = []
+    for other, (delay, r) in lanes.items():
+        w = warehouses.get(other, {})
+        units = math.floor(float(w.get("inventory", 0)) - (1 - limits.max_stockout_risk) * float(w.get("demand", 0)))
+        if units > 0 and delay <= limits.max_delay_minutes:
+            out.append(_Donor(other, r, delay, units))
+    out.sort(key=lambda d: (-d.units, d.delay, d.warehouse_id))
+    return out[:spec.max_donors]
+
+
+class _Search:
+    def __init__(self, event: Dict[str, Any], snap: Dict[str, Any], limits: Limits, spec: SearchSpec):
+        self.event, self.limits, self.spec = event, limits, spec
+        warehouses, routes = snap.get("warehouses", {}), snap.get("routes", {})
+        adj: Dict[str, List[Tuple[str, str]]] = {}
+        loose = []
+        for r, route in routes.items():
+            ends = route.get("warehouses") or ()
+            if len(ends) == 2:
+                adj.setdefault(ends[0], []).append((r, ends[1]))
+                adj.setdefault(ends[1], []).append((r, ends[0]))
+            else:
+                loose.append(r)
+
+        wid, rid = event.get("warehouse_id"), event.get("route_id")
+        w = warehouses.get(wid, {})
+        self.demand = float(w.get("demand", 0))
+        self.shortfall = max(0.0, self.demand - float(w.get("inventory", 0))) if self.demand else 0.0
+        lat = _latency(routes, rid) if rid in routes else (
+            sum(_latency(routes, r) for r in routes) / len(routes) if routes else 0.0)
+        self.disrupted = event.get("type") in DISRUPTED_ROUTE
+        self.base_delay = lat * SEVERITY_DELAY.get(event.get("severity"), 2.0) if self.disrupted else lat
+        self.reroutes = _reroutes(snap, adj, loose, wid, rid, limits, spec) if self.disrupted else []
+        self.donors = _donors(snap, adj, loose, wid, rid, self.disrupted, limits, spec)
+        # suffix[i]: units donors i.. could still give (lower bound on the risk left)
+        self.suffix = [0] * (len(self.donors) + 1)
+        for i in range(len(self.donors) - 1, -1, -1):
+            self.suffix[i] = self.suffix[i + 1] + self.donors[i].units
+
+        self.heap: List[Tuple[float, int, Dict[str, Any]]] = []  # (-score, -seq, plan): worst on top
+        self.seq = self.explored = self.pruned = 0
+        self.complete = True
+
+    def _risk(self, moved: float) -> float:
+        return (self.shortfall - moved) / self.demand if self.demand else 0.0
+
+    def _score(self, cost: float, delay: float, risk: float) -> float:
+        return cost + RISK_USD * risk + DELAY_USD_PER_MIN * delay
+
+    def _hopeless(self, i: int, cost: float, delay: float, moved: float) -> bool:
+        if cost > self.limits.budget_cap_usd or delay > self.limits.max_delay_minutes:
+            return True
+        if len(self.heap) < self.spec.top_k:
+            return False
+        best_risk = self._risk(min(self.shortfall, moved + self.suffix[i]))
+        return self._score(cost, delay, best_risk) >= -self.heap[0][0]
+
+    def run(self) -> Iterator[Dict[str, Any]]:
+        if self.spec.top_k <= 0:
+            return
+        deadline = None if self.spec.deadline_s is None else time.perf_counter() + self.spec.deadline_s
+        # node: (donor index, reroute, transfers, cost, delay, moved)
+        stack = []
+        for rr in reversed([*self.reroutes, None]):
+            delay = rr.delay if rr else (self.base_delay if self.disrupted else 0.0)
+            stack.append((0, rr, (), rr.cost if rr else 0.0, delay, 0.0))
+        while stack:
+            self.explored += 1
+            if deadline is not None and self.explored % CHECK_EVERY == 0 and time.perf_counter() > deadline:
+                self.complete = False
+                return
+            i, rr, transfers, cost, delay, moved = stack.pop()
+            if self._hopeless(i, cost, delay, moved):
+                self.pruned += 1
+                continue
+            need = self.shortfall - moved
+            if i == len(self.donors) or need <= 0:
+                if rr or transfers:
+                    plan = self._offer(rr, transfers, cost, delay, moved)
+                    if plan is not None:
+                        yield plan
+                continue
+            d = self.donors[i]
+            children = [(i + 1, rr, transfers, cost, delay, moved)]  # skip this donor
+            for units in sorted({min(math.ceil(f * d.units), math.ceil(need)) for f in self.spec.levels}):
+                if units > 0:
+                    children.append((i + 1, rr, transfers + ((d, units),),
+                                     cost + TRANSFER_USD_PER_UNIT * units + TRANSFER_USD_PER_MIN * d.delay,
+                                     max(delay, d.delay), moved + units))
+            stack.extend(children)  # largest transfer popped first
+
+    def _offer(self, rr: Optional[_Reroute], transfers, cost: float, delay: float,
+               moved: float) -> Optional[Dict[str, Any]]:
+        risk = max(0.0, self._risk(moved))
+        score = self._score(cost, delay, risk)
+        if len(self.heap) >= self.spec.top_k and score >= -self.heap[0][0]:
+            return None
+        plan = self._plan(rr, transfers, cost, delay, risk, score)
+        self.seq += 1
+        entry = (-score, -self.seq, plan)
+        if len(self.heap) < self.spec.top_k:
+            heapq.heappush(self.heap, entry)
+        else:
+            heapq.heapreplace(self.heap, entry)
+        return plan
+
+    def _plan(self, rr: Optional[_Reroute], transfers, cost: float, delay: float, risk: float,
+              score: float) -> Dict[str, Any]:
+        actions, parts, assumptions = [], [], {}
+        if rr:
+            actions.append({"type": "reroute", "route_ids": list(rr.route_ids), "delay_minutes": rr.delay,
+                            "cost_usd": round(rr.cost)})
+            parts.append("reroute_via_" + "-".join(rr.route_ids))
+            if rr.capacity is not None:
+                assumptions["carrier_capacity_buffer_pct"] = int(rr.capacity // 10)
+        if transfers:
+            for d, units in transfers:
+                actions.append({"type": "reallocate", "from_warehouse": d.warehouse_id, "route_id": d.route_id,
+                                "units": int(units), "delay_minutes": d.delay})
+            parts.append("reallocate_inventory_from_" + ",".join(d.warehouse_id for d, _ in transfers))
+            assumptions["transfer_units"] = int(sum(u for _, u in transfers))
+
+        base_risk = self._risk(0.0)
+        sla = min(99.9, max(0.0, 99.5 - 4 * risk - 2 * delay / max(1.0, self.limits.max_delay_minutes)))
+        pid = "P-" + hashlib.sha256(json.dumps(actions, sort_keys=True).encode()).hexdigest()[:8]
+        return {
+            "id": pid,
+            "plan_id": pid,
+            "strategy": "+".join(parts),
+            "actions": actions,
+            "assumptions": assumptions,
+            "cost_usd": int(round(cost)),
+            "sla_expected_percent": round(sla, 1),
+            "sla_pct": int(sla),
+            "region_data_boundary": self.limits.region,
+            "region": self.limits.region,
+            "endpoint": "private",
+            "latency_ms": DEFAULT_LATENCY_MS,
+            "pii_access": False,
+            "stockout_risk": round(risk, 3),
+            "delay_minutes": int(math.ceil(delay)),
+            "score": round(score, 2),
+            "kpi_expectations": {
+                "stockout_risk_reduction_pct": int(round(100 * (base_risk - risk) / base_risk)) if base_risk else 0,
+                "delay_reduction_pct": max(0, int(round(100 * (self.base_delay - delay) / self.base_delay)))
+                if self.base_delay else 0,
+            },
+            "inputs": {"route_id": self.event.get("route_id"), "warehouse_id": self.event.get("warehouse_id")},
+            "ts": datetime.now().isoformat(),
+        }
+
+    def ranked(self) -> List[Dict[str, Any]]:
+        return [p for _, _, p in sorted(self.heap, key=lambda e: (-e[0], -e[1]))]
+
+
+def search(event: Dict[str, Any], snapshot: Dict[str, Any], limits: Limits = Limits(),
+           spec: SearchSpec = SearchSpec()) -> Iterator[Dict[str, Any]]:
+    """
+    Stream plans as they enter the running top K. A later plan may push an
+    earlier one out; top_k() gives the final ranking.
+    """
+    yield from _Search(event, snapshot, limits, spec).run()
+
+
+def top_k(event: Dict[str, Any], snapshot: Dict[str, Any], limits: Limits = Limits(),
+          spec: SearchSpec = SearchSpec()) -> SearchResult:
+    """The best spec.top_k plans within limits, best first."""
+    s = _Search(event, snapshot, limits, spec)
+    for _ in s.run():
+        pass
+    return SearchResult(s.ranked(), s.complete, s.explored, s.pruned)
@@ -0,0 +1,133 @@
+# hub/plan_select.py
+"""
+Optimal plan selection as one z3 Optimize problem.
+
+Each candidate gets a Bool x_i, and exactly one is picked. The chosen plan's
+cost / SLA / risk / delay are linear sums over the x_i. The configs/day13.yaml
+policies (budget cap, SLA floor, data region, no PII) are asserted on those
+sums, so the solver filters and optimizes in a single call instead of
+verifying every plan and sorting the survivors.
+
+Objectives:
+  - lexicographic: `order`, e.g. ("cost", "sla") = cheapest, then the
+    highest SLA (app.py's old sort key)
+  - weighted: `weights`, e.g. {"cost": 1, "risk": 20000}, one combined
+    objective
+cost, risk and delay are minimized and sla is maximized. Ties go to the
+earliest plan in the bundle, as with a stable sort.
+
+Before encoding, candidates are cut to the Pareto front over the objective
+attributes plus cost and SLA, within each (region ok, PII) group. The
+policies are monotone in cost and SLA, so a plan that dominates a
+compliant plan is itself compliant and at least as good. The result is
+exact. On the 10k-plan scale bundles the front holds tens to a few hundred
+plans. An Optimize over all 10k x_i takes about a minute.
+"""
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+from z3 import Bool, Context, If, Not, Optimize, PbEq, RealVal, Sum, is_true, sat
+
+OBJECTIVES = {  # name -> (plan field, default, sense: +1 minimize / -1 maximize)
+    "cost": ("cost_usd", 1e12, 1),
+    "sla": ("sla_expected_percent", 0.0, -1),
+    "risk": ("stockout_risk", 0.0, 1),
+    "delay": ("delay_minutes", 0.0, 1),
+}
+DEFAULT_ORDER = ("cost", "sla")
+
+
+class Selection(NamedTuple):
+    plan: Optional[Dict[str, Any]]  # None when no candidate is compliant
+    index: Optional[int]            # position in the input list
+    candidates: int
+    encoded: int                    # candidates left after the Pareto cut
+
+
+def _column(plans: Sequence[Dict[str, Any]], name: str) -> np.ndarray:
+    field, default, sense = OBJECTIVES[name]
+    return sense * np.fromiter((float(p.get(field, default)) for p in plans), float, len(plans))
+
+
+def pareto_front(values: np.ndarray, strict_cols: Sequence[int]) -> List[int]:
+    """
+    Rows (minimizing every column) not dominated by another row. Row a
+    dominates b when a <= b everywhere and either a < b in some strict_cols
+    column or a comes first. Ties on every objective resolve to the earlier
+    row.
+    """
+    # lexsort is stable, so equal rows stay in input order; no row can be
+    # dominated by one that sorts after it
+    order = np.lexsort(values.T[::-1]) if len(values) else np.empty(0, int)
+    front: List[int] = []
+    fv = np.empty((0, values.shape[1]))
+    strict = list(strict_cols)
+    for i in order.tolist():
+        v = values[i]
+        if len(front):
+            le = (fv <= v).all(1)
+            better = (fv[:, strict] < v[strict]).any(1) | (np.asarray(front) < i)
+            if (le & better).any():
+                continue
+        front.append(i)
+        fv = np.vstack([fv, v])
+    return sorted(front)
+
+
+def select(plans: Sequence[Dict[str, Any]], cfg: Dict[str, Any], order: Sequence[str] = DEFAULT_ORDER,
+           weights: Optional[Dict[str, float]] = None) -> Selection:
+    """
+    Best compliant plan under `cfg`. Objectives are lexicographic by `order`,
+    or weighted by `weights` (non-negative) when given.
+    """
+    names = list(weights) if weights is not None else list(order)
+    unknown = [n for n in names if n not in OBJECTIVES]
+    if unknown:
+        raise ValueError(f"unknown objective(s): {', '.join(unknown)}; expected {', '.join(OBJECTIVES)}")
+    if weights is not None and any(w < 0 for w in weights.values()):
+        raise ValueError("objective weights must be non-negative")
+    if not plans:
+        return Selection(None, None, 0, 0)
+
+    obj = [n for n in names if weights is None or weights[n] > 0]
+    cols = list(dict.fromkeys(obj + ["cost", "sla"]))
+    values = np.column_stack([_column(plans, c) for c in cols])
+    region = cfg["region_data_boundary"]
+    group = [(p.get("region_data_boundary") == region, bool(p.get("pii_access", False))) for p in plans]
+    cand: List[int] = []
+    for g in set(group):
+        rows = [i for i, k in enumerate(group) if k == g]
+        cand.extend(rows[j] for j in pareto_front(values[rows], [cols.index(c) for c in obj]))
+    cand.sort()
+
+    ctx = Context()
+    opt = Optimize(ctx=ctx)
+    xs = [Bool(f"x{i}", ctx) for i in cand]
+    zero = RealVal(0, ctx)
+
+    def picked(col: int):
+        return Sum([If(x, RealVal(str(float(values[i, col])), ctx), zero) for x, i in zip(xs, cand)])
+
+    opt.add(PbEq([(x, 1) for x in xs], 1))
+    # Policies (same as scripts/verify_policies.BatchVerifier), on the picked plan
+    cost, sla = picked(cols.index("cost")), picked(cols.index("sla"))  # sla column holds -sla
+    opt.add(cost <= RealVal(str(float(cfg["budget_cap_usd"])), ctx))
+    opt.add(-sla >= RealVal(str(float(cfg["sla_min_percent"])), ctx))
+    for x, i in zip(xs, cand):
+        region_ok, pii = group[i]
+        if not region_ok or pii:
+            opt.add(Not(x))
+
+    if weights is not None:
+        opt.minimize(Sum([RealVal(str(float(weights[n])), ctx) * picked(cols.index(n)) for n in obj] + [zero]))
+    else:
+        for n in obj:
+            opt.minimize(picked(cols.index(n)))
+    opt.minimize(Sum([If(x, RealVal(i, ctx), zero) for x, i in zip(xs, cand)]))  # earliest on ties
+    opt.set(priority="lex")
+
+    if opt.check() != sat:
+        return Selection(None, None, len(plans), len(cand))
+    m = opt.model()
+    best = next(i for x, i in zip(xs, cand) if is_true(m.eval(x, model_completion=True)))
+    return Selection(plans[best], best, len(plans), len(cand))
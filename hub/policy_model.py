@@ -0,0 +1,129 @@
+# hub/policy_model.py
+"""
+Compiled, stat-memoized policy documents.
+
+load() parses a policy/config file once and precomputes every hash variant
+the repo uses. The result is cached by file identity (mtime_ns, size,
+inode): later calls cost one os.stat() and never touch YAML, and an edited
+file is re-parsed on the next call (hot reload).
+
+Hash variants:
+- canonical_hash: sha256 of the canonical JSON of the whole document (hub.policy_hash)
+- include_hash:   sha256 of "path=value" lines over hash_include (verifiers/verify_plan.py)
+- lock_hash:      sha256 of canonical JSON over hash_include (scripts/hash_policy.py, policy.lock)
+- config_hash:    sha256 of the Day 13 policy fields (scripts/write_proof.py)
+"""
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+CONFIG_HASH_FIELDS = ("policy_version", "budget_cap_usd", "sla_min_percent", "region_data_boundary")
+
+
+@dataclass(frozen=True)
+class PolicyModel:
+    path: str
+    doc: Dict[str, Any]             # shared; treat as read-only
+    canonical_hash: str
+    include_hash: Optional[str]
+    lock_hash: Optional[str]
+    config_hash: Optional[str]
+
+    def hashes(self) -> Dict[str, Optional[str]]:
+        return {
+            "canonical_hash": self.canonical_hash,
+            "include_hash": self.include_hash,
+            "lock_hash": self.lock_hash,
+            "config_hash": self.config_hash,
+        }
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _get_by_path(obj, path):
+    cur = obj
+    for p in path.split("."):
+        cur = cur[p]
+    return cur
+
+
+def include_hash_of(doc: Dict[str, Any]) -> str:
+    include = doc.get("hash_include", [])
+    material = [f"{p}={_get_by_path(doc, p)}" for p in include]
+    return _sha256("\n".join(material))
+
+
+def lock_hash_of(doc: Dict[str, Any]) -> str:
+    material = {p: _get_by_path(doc, p) for p in doc.get("hash_include", [])}
+    return _sha256(json.dumps(material, sort_keys=True, separators=(",", ":")))
+
+
+def config_hash_of(doc: Dict[str, Any]) -> str:
+    return _sha256(json.dumps({k: doc.get(k) for k in CONFIG_HASH_FIELDS}, sort_keys=True))
+
+
+def _parse(text: str) -> Any:
+    # Try YAML first, fall back to JSON (same as hub.policy_hash)
+    try:
+        import yaml  # type: ignore
+        return yaml.safe_load(text)
+    except Exception:
+        return json.loads(text)
+
+
+def _compile(path: str, text: str) -> PolicyModel:
+    doc = _parse(text)
+    canonical = _sha256(json.dumps(doc, sort_keys=True, separators=(",", ":")))
+    include = lock = config = None
+    if isinstance(doc, dict):
+        if doc.get("hash_include"):
+            try:
+                include, lock = include_hash_of(doc), lock_hash_of(doc)
+            except (KeyError, TypeError):
+                pass
+        if "policy_version" in doc:
+            config = config_hash_of(doc)
+    return PolicyModel(path, doc, canonical, include, lock, config)
+
+
+def _parse_lock(path: str, text: str) -> Dict[str, str]:
+    out = {}
+    for line in text.splitlines():
+        if ":" in line:
+            key, val = line.split(":", 1)
+            out[key.strip()] = val.strip()
+    return out
+
+
+_memo: Dict[Tuple[str, str], Tuple[Tuple[int, int, int], Any]] = {}
+_memo_lock = threading.Lock()
+
+
+def _memoized(kind: str, path: str, build: Callable[[str, str], Any]) -> Any:
+    key = (kind, os.path.abspath(path))
+    st = os.stat(key[1])  # FileNotFoundError propagates, like the old loaders
+    ident = (st.st_mtime_ns, st.st_size, st.st_ino)
+    hit = _memo.get(key)
+    if hit and hit[0] == ident:
+        return hit[1]
+    with open(key[1], "r", encoding="utf-8") as f:
+        value = build(path, f.read())
+    with _memo_lock:
+        _memo[key] = (ident, value)
+    return value
+
+
+def load(path: str = "policies/base.yaml") -> PolicyModel:
+    return _memoized("policy", path, _compile)
+
+
+def load_lock(path: str = "policies/policy.lock") -> Dict[str, str]:
+    """
+    Parsed policy.lock ({"policy_sha256": ...}); returns a shared dict.
+    """
+    return _memoized("lock", path, _parse_lock)
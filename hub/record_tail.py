@@ -0,0 +1,129 @@
+# hub/record_tail.py
+"""
+Tail readers for append-only JSONL logs.
+
+tail_lines() seeks backwards from EOF in fixed-size blocks until it has the
+last n lines, so its cost depends on n, not on the file size.
+
+TailBuffer keeps the newest `capacity` parsed records in a ring buffer and
+refreshes it by reading only the bytes appended since the last offset. A
+changed inode (rotation), a file shorter than the offset (truncation) or
+changed bytes just before the offset (copy-truncate followed by regrowth)
+all reset the buffer from a fresh tail read.
+"""
+import json
+import os
+import threading
+from collections import deque
+from typing import Any, Deque, List, Optional
+
+BLOCK = 64 * 1024
+FINGERPRINT = 64
+
+
+def tail_lines(path: str, n: int, end: Optional[int] = None, block: int = BLOCK) -> List[bytes]:
+    """
+    Last n non-empty lines of `path` (up to byte `end`), oldest first.
+    """
+    if n <= 0:
+        return []
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END) if end is None else end
+        buf = b""
+        while pos > 0 and buf.count(b"\n") <= n:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+    lines = [ln for ln in buf.split(b"\n") if ln.strip()]
+    if pos > 0:
+        lines = lines[1:]  # first piece may be a partial line
+    return lines[-n:]
+
+
+def parse_records(lines: List[bytes]) -> List[Any]:
+    recs = []
+    for ln in lines:
+        try:
+            recs.append(json.loads(ln))
+        except ValueError:
+            # Tolerate non-JSON lines (e.g. audits/chain.log)
+            continue
+    return recs
+
+
+def complete_end(f, size: int, block: int = BLOCK) -> int:
+    """
+    Offset just past the last newline at or before `size`.
+    """
+    pos = size
+    while pos > 0:
+        step = min(block, pos)
+        f.seek(pos - step)
+        i = f.read(step).rfind(b"\n")
+        if i >= 0:
+            return pos - step + i + 1
+        pos -= step
+    return 0
+
+
+class TailBuffer:
+    def __init__(self, path: str, capacity: int = 1000):
+        self.path = path
+        self.capacity = capacity
+        self._records: Deque[Any] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._inode = None
+        self._offset = 0
+        self._fingerprint = b""
+
+    def _read_fingerprint(self, f, offset: int) -> bytes:
+        start = max(0, offset - FINGERPRINT)
+        f.seek(start)
+        return f.read(offset - start)
+
+    def _reset(self, f, st):
+        # Only complete lines: a partially written tail is picked up next refresh
+        end = complete_end(f, st.st_size)
+        self._records.clear()
+        self._records.extend(parse_records(tail_lines(self.path, self.capacity, end)))
+        self._inode, self._offset = st.st_ino, end
+        self._fingerprint = self._read_fingerprint(f, end)
+
+    def refresh(self) -> None:
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                self._records.clear()
+                self._inode, self._offset, self._fingerprint = None, 0, b""
+                return
+            with open(self.path, "rb") as f:
+                if (st.st_ino != self._inode or st.st_size < self._offset
+                        or self._read_fingerprint(f, self._offset) != self._fingerprint):
+                    self._reset(f, st)
+                    return
+                if st.st_size == self._offset:
+                    return
+                f.seek(self._offset)
+                data = f.read(st.st_size - self._offset)
+                cut = data.rfind(b"\n") + 1
+                if cut == 0:
+                    return
+                lines = [ln for ln in data[:cut].split(b"\n") if ln.strip()]
+                self._records.extend(parse_records(lines[-self.capacity:]))
+                self._offset += cut
+                self._fingerprint = self._read_fingerprint(f, self._offset)
+
+    def last(self, n: int) -> List[Any]:
+        """
+        Newest n records, oldest first. Beyond capacity, falls back to a
+        direct tail read.
+        """
+        self.refresh()
+        with self._lock:
+            if n <= self.capacity:
+                recs = list(self._records)
+                return recs[-n:] if n > 0 else []
+            end = self._offset
+        return parse_records(tail_lines(self.path, n, end))
@@ -0,0 +1,130 @@
+# hub/run_manifest.py
+"""
+Append-only run manifest (SQLite) for pipeline artifacts.
+
+Every stage records what it wrote (snapshot, event, bundle, sim, proof) under a run id,
+so "latest bundle" or "sim for run X" is an indexed lookup instead of a
+glob + stat over data/*. Rows are never updated or deleted.
+"""
+import glob
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, NamedTuple, Optional
+
+MANIFEST_PATH = "data/manifest.sqlite"
+KINDS = ("snapshot", "event", "bundle", "sim", "proof")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    seq    INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    kind   TEXT NOT NULL,
+    path   TEXT NOT NULL,
+    digest TEXT,
+    ts     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS artifacts_kind_seq ON artifacts(kind, seq);
+CREATE INDEX IF NOT EXISTS artifacts_run ON artifacts(run_id, kind);
+"""
+
+
+class Record(NamedTuple):
+    run_id: Optional[str]
+    kind: str
+    path: str
+    digest: Optional[str]
+
+
+def new_run_id() -> str:
+    return time.strftime("%Y%m%dT%H%M%SZ", time.gmtime()) + "-" + uuid.uuid4().hex[:8]
+
+
+class RunManifest:
+    def __init__(self, path: str = MANIFEST_PATH):
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; WAL lets readers run alongside the writer
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def record(self, run_id: str, kind: str, path: str, digest: Optional[str] = None) -> None:
+        if kind not in KINDS:
+            raise ValueError(f"invalid kind: {kind}")
+        ts = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        self._conn().execute(
+            "INSERT INTO artifacts(run_id, kind, path, digest, ts) VALUES (?, ?, ?, ?, ?)",
+            (run_id, kind, path, digest, ts),
+        )
+
+    def latest(self, kind: str) -> Optional[Record]:
+        row = self._conn().execute(
+            "SELECT run_id, kind, path, digest FROM artifacts WHERE kind = ? ORDER BY seq DESC LIMIT 1",
+            (kind,),
+        ).fetchone()
+        return Record(*row) if row else None
+
+    def get(self, run_id: str, kind: str) -> Optional[Record]:
+        row = self._conn().execute(
+            "SELECT run_id, kind, path, digest FROM artifacts WHERE run_id = ? AND kind = ? ORDER BY seq DESC LIMIT 1",
+            (run_id, kind),
+        ).fetchone()
+        return Record(*row) if row else None
+
+    def run(self, run_id: str) -> Dict[str, Record]:
+        rows = self._conn().execute(
+            "SELECT run_id, kind, path, digest FROM artifacts WHERE run_id = ? ORDER BY seq",
+            (run_id,),
+        ).fetchall()
+        return {r[1]: Record(*r) for r in rows}
+
+    def runs(self, limit: int = 20) -> List[str]:
+        rows = self._conn().execute(
+            "SELECT run_id FROM artifacts WHERE kind = 'event' ORDER BY seq DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+        return [r[0] for r in rows]
+
+
+_manifests: Dict[str, RunManifest] = {}
+
+
+def default_manifest() -> RunManifest:
+    """
+    Process-wide manifest at MANIFEST_PATH (resolved against the working directory).
+    """
+    key = os.path.abspath(MANIFEST_PATH)
+    m = _manifests.get(key)
+    if m is None:
+        m = _manifests.setdefault(key, RunManifest(key))
+    return m
+
+
+def latest(kind: str, legacy_glob: Optional[str] = None) -> Optional[Record]:
+    """
+    Newest artifact of `kind` from the manifest. Falls back to the old
+    mtime-sorted glob only when the manifest has nothing usable (artifacts
+    produced before the manifest existed); such records carry run_id=None.
+    """
+    rec = default_manifest().latest(kind)
+    if rec and os.path.exists(rec.path):
+        return rec
+    if legacy_glob:
+        files = sorted(glob.glob(legacy_glob), key=os.path.getmtime)
+        if files:
+            return Record(None, kind, files[-1], None)
+    return None
+
+
+def record(run_id: str, kind: str, path: str, digest: Optional[str] = None) -> None:
+    default_manifest().record(run_id, kind, path, digest)
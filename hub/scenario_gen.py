@@ -0,0 +1,349 @@
+# hub/scenario_gen.py
+"""
+Seeded, parametric supply-chain scenarios at scale: twin snapshots,
+disruption events and plan bundles.
+
+Topology. Warehouses are placed around regional centres (EU, US and APAC,
+weighted 5:3:2). Roughly 2% of them are hubs. Routes run:
+  - from each warehouse to its `routes_per_warehouse` nearest neighbours
+  - from each non-hub to the nearest hub in its region
+  - from each hub to its HUB_LINKS nearest hubs
+A route's latency grows with distance. Each route carries its endpoints in
+"warehouses", the shape twin_snapshot.json, TwinGraph.from_snapshot and the
+simulator already read.
+
+Events use the seed_disruption.py shape. Each bundle holds the candidate
+plans for one event, in the generate_plans.py shape. Every plan carries two
+field sets:
+  - the configs/day13.yaml fields (cost_usd, sla_expected_percent,
+    region_data_boundary, pii_access)
+  - the policies/base.yaml fields (sla_pct, latency_ms, region, endpoint,
+    stockout_risk, delay_minutes)
+So one bundle feeds verify_policies, verifiers.verify_plan and
+verifiers.simulator alike.
+
+Everything is a function of the ScaleSpec. Each part draws from its own
+SeedSequence(seed, spawn_key=...), so the same spec always yields the same
+JSON, and adding events does not change earlier ones.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+REGIONS = ("EU", "US", "APAC")
+REGION_WEIGHTS = (0.5, 0.3, 0.2)
+REGION_CENTRES = ((0.0, 0.0), (-60.0, 5.0), (70.0, -10.0))
+DISRUPTIONS = ("route_outage", "delay_spike", "inventory_shortage")
+DEFAULT_START = "2025-01-01T00:00:00Z"
+HUB_LINKS = 4
+
+_TAG_SNAPSHOT, _TAG_EVENTS, _TAG_PLANS = 0, 1, 2
+
+
+class ScaleSpec(NamedTuple):
+    warehouses: int = 2000
+    routes_per_warehouse: int = 3
+    hub_fraction: float = 0.02
+    events: int = 16
+    plans_per_event: int = 32
+    seed: int = 0
+    start: str = DEFAULT_START
+
+
+class Fixture(NamedTuple):
+    spec: ScaleSpec
+    snapshot: Dict[str, Any]
+    events: List[Dict[str, Any]]
+    bundles: List[Dict[str, Any]]
+
+    @property
+    def plans(self) -> List[Dict[str, Any]]:
+        return [p for b in self.bundles for p in b["plans"]]
+
+
+SIZES = {
+    "small": ScaleSpec(warehouses=50, events=4, plans_per_event=8),
+    "scale": ScaleSpec(),
+    "xl": ScaleSpec(warehouses=20000, events=64, plans_per_event=64),
+}
+
+
+def _rng(spec: ScaleSpec, *key: int) -> np.random.Generator:
+    return np.random.default_rng(np.random.SeedSequence(spec.seed, spawn_key=key))
+
+
+def _knn(xy: np.ndarray, k: int, per_cell: int = 8) -> np.ndarray:
+    """
+    (n, k) indices of each point's k nearest other points (exact). Points are
+    bucketed on a grid of ~per_cell points per cell and each cell searches
+    outward ring by ring until the k-th neighbour is provably inside.
+    """
+    n = len(xy)
+    k = min(k, n - 1)
+    out = np.empty((n, max(k, 0)), dtype=np.int64)
+    if k <= 0:
+        return out
+    lo = xy.min(0)
+    span = np.maximum(xy.max(0) - lo, 1e-9)
+    cell = float(np.sqrt(span.prod() * per_cell / n)) or 1.0
+    g = np.floor((xy - lo) / cell).astype(np.int64)
+    buckets: Dict[Tuple[int, int], List[int]] = {}
+    for i, (cx, cy) in enumerate(g.tolist()):
+        buckets.setdefault((cx, cy), []).append(i)
+    for (cx, cy), members in buckets.items():
+        ring = 1
+        while True:
+            cand = np.array([j for dx in range(-ring, ring + 1) for dy in range(-ring, ring + 1)
+                             for j in buckets.get((cx + dx, cy + dy), ())], dtype=np.int64)
+            if len(cand) > k:
+                m = np.asarray(members)
+                d = ((xy[m, None, :] - xy[None, cand, :]) ** 2).sum(-1)
+                d[cand[None, :] == m[:, None]] = np.inf
+                part = np.argpartition(d, k - 1, axis=1)[:, :k]
+                pd = np.take_along_axis(d, part, 1)
+                # every point within ring * cell of the cell is a candidate
+                if np.sqrt(pd.max()) <= ring * cell:
+                    order = np.argsort(pd, axis=1, kind="stable")
+                    out[m] = cand[np.take_along_axis(part, order, 1)]
+                    break
+            ring += 1
+    return out
+
+
+def snapshot(spec: ScaleSpec) -> Dict[str, Any]:
+    """twin_snapshot.json-shaped dict with `spec.warehouses` warehouses."""
+    n = spec.warehouses
+    rng = _rng(spec, _TAG_SNAPSHOT)
+    region = rng.choice(len(REGIONS), size=n, p=REGION_WEIGHTS)
+    xy = np.asarray(REGION_CENTRES)[region] + rng.normal(0, 12, (n, 2))
+    demand = np.maximum(1, rng.lognormal(4.8, 0.5, n)).astype(np.int64)
+    inventory = (demand * rng.uniform(0.4, 1.4, n)).astype(np.int64)
+    is_hub = rng.random(n) < spec.hub_fraction
+    for r in range(len(REGIONS)):  # at least one hub per populated region
+        members = np.nonzero(region == r)[0]
+        if len(members) and not is_hub[members].any():
+            is_hub[members[0]] = True
+
+    pairs = set()
+    for i, nbrs in enumerate(_knn(xy, spec.routes_per_warehouse).tolist()):
+        pairs.update((min(i, j), max(i, j)) for j in nbrs)
+    hubs = np.nonzero(is_hub)[0]
+    for r in range(len(REGIONS)):
+        rh = hubs[region[hubs] == r]
+        if not len(rh):
+            continue
+        members = np.nonzero((region == r) & ~is_hub)[0]
+        if len(members):
+            d = ((xy[members, None, :] - xy[None, rh, :]) ** 2).sum(-1)
+            pairs.update((min(int(a), int(b)), max(int(a), int(b))) for a, b in zip(members, rh[d.argmin(1)]))
+    for i, nbrs in enumerate(_knn(xy[hubs], HUB_LINKS).tolist()):
+        a = int(hubs[i])
+        pairs.update((min(a, int(hubs[j])), max(a, int(hubs[j]))) for j in nbrs)
+    edges = np.array(sorted(pairs), dtype=np.int64).reshape(-1, 2)
+
+    dist = np.sqrt(((xy[edges[:, 0]] - xy[edges[:, 1]]) ** 2).sum(1))
+    latency = (8 + 1.5 * dist * rng.uniform(0.8, 1.3, len(edges))).astype(np.int64)
+    capacity = rng.integers(50, 500, len(edges))
+
+    wids = [f"W{i}" for i in range(n)]
+    warehouses = {wids[i]: {"inventory": int(inventory[i]), "demand": int(demand[i]),
+                            "region": REGIONS[region[i]], "hub": bool(is_hub[i])} for i in range(n)}
+    routes = {f"R{j}": {"latency_minutes": int(latency[j]), "capacity": int(capacity[j]),
+                        "warehouses": [wids[a], wids[b]]}
+              for j, (a, b) in enumerate(edges.tolist())}
+    return {"warehouses": warehouses, "routes": routes}
+
+
+def _iso(spec: ScaleSpec, seconds: float) -> str:
+    t = datetime.fromisoformat(spec.start.replace("Z", "+00:00")) + timedelta(seconds=seconds)
+    return t.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def events(spec: ScaleSpec, snap: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    spec.events disruptions (seed_disruption.py shape), one minute apart.
+    Route outages and delay spikes favour slow routes, and inventory
+    shortages favour warehouses with the largest shortfall.
+    """
+    routes = list(snap["routes"].items())
+    if not routes:
+        return []
+    latency = np.array([r["latency_minutes"] for _, r in routes], dtype=float)
+    out = []
+    for i in range(spec.events):
+        rng = _rng(spec, _TAG_EVENTS, i)
+        kind = DISRUPTIONS[int(rng.integers(len(DISRUPTIONS)))]
+        if kind == "inventory_shortage":
+            cand = rng.integers(len(routes), size=8)
+            ratios = [_shortfall(snap["warehouses"][routes[c][1]["warehouses"][0]]) for c in cand.tolist()]
+            j = int(cand[int(np.argmax(ratios))])
+        else:
+            j = int(rng.choice(len(routes), p=latency / latency.sum()))
+        rid, r = routes[j]
+        wid = r["warehouses"][int(rng.integers(2))]
+        out.append({"type": kind, "route_id": rid, "warehouse_id": wid, "source": "scale-fixture",
+                    "severity": ("medium", "high", "critical")[int(rng.integers(3))], "ts": _iso(spec, 60 * i)})
+    return out
+
+
+def _shortfall(w: Dict[str, Any]) -> float:
+    dem = float(w.get("demand", 1)) or 1.0
+    return max(0.0, dem - float(w.get("inventory", 0))) / dem
+
+
+def event_id(event: Dict[str, Any]) -> str:
+    """Same id seed_disruption.py gives the event file."""
+    return hashlib.sha256(json.dumps(event, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _adjacency(snap: Dict[str, Any]) -> Dict[str, List[Tuple[str, str]]]:
+    adj: Dict[str, List[Tuple[str, str]]] = {}
+    for rid, r in snap["routes"].items():
+        a, b = r["warehouses"]
+        adj.setdefault(a, []).append((rid, b))
+        adj.setdefault(b, []).append((rid, a))
+    return adj
+
+
+def plans(spec: ScaleSpec, snap: Dict[str, Any], event: Dict[str, Any], index: int,
+          adjacency: Optional[Dict[str, List[Tuple[str, str]]]] = None) -> List[Dict[str, Any]]:
+    """spec.plans_per_event candidate plans for the index-th event."""
+    k = spec.plans_per_event
+    rng = _rng(spec, _TAG_PLANS, index)
+    adj = adjacency if adjacency is not None else _adjacency(snap)
+    wid, rid = event["warehouse_id"], event["route_id"]
+    wh = snap["warehouses"][wid]
+    alts = [a for a in adj.get(wid, []) if a[0] != rid] or [(rid, wid)]
+    base_latency = float(snap["routes"][rid]["latency_minutes"])
+
+    kind = rng.integers(4, size=k)  # 0 reroute, 1 reallocate, 2 surge carrier, 3 expedite
+    alt = rng.integers(len(alts), size=k)
+    alt_latency = np.array([snap["routes"][alts[a][0]]["latency_minutes"] for a in alt.tolist()], dtype=float)
+    scale = np.sqrt(float(wh.get("demand", 100)))
+    cost = np.round(scale * np.array([280, 420, 520, 800])[kind] * rng.uniform(0.7, 1.5, k), -1)
+    sla = np.round(rng.uniform(95.0, 99.6, k) + 0.4 * (kind == 3), 1).clip(0, 100)
+    delay = np.where(kind == 0, alt_latency, base_latency * rng.uniform(0.4, 1.1, k)).round()
+    risk = np.round(_shortfall(wh) * rng.uniform(0.3, 1.0, k) * np.where(kind == 1, 0.5, 1.0) + rng.uniform(0.02, 0.2, k), 2)
+    # Data-processing region: EU unless a plan routes data elsewhere
+    region = np.where(rng.random(k) < 0.1, rng.integers(1, len(REGIONS), size=k), 0)
+    public = rng.random(k) < 0.05
+    pii = rng.random(k) < 0.05
+    latency_ms = rng.integers(180, 560, k)
+    risk_red = np.round(rng.uniform(5, 50, k)).astype(int)
+    delay_red = np.round(rng.uniform(5, 40, k)).astype(int)
+
+    eid = event_id(event)
+    out = []
+    for i in range(k):
+        rt, nbr = alts[int(alt[i])]
+        strategy = (f"reroute_via_{rt}", f"reallocate_inventory_from_{nbr}", "surge_carrier",
+                    "expedite_air_freight")[int(kind[i])]
+        reg = REGIONS[int(region[i])]
+        pid = f"{eid[:8]}-P{i}"
+        out.append({
+            "id": pid,
+            "plan_id": pid,
+            "strategy": strategy,
+            "assumptions": {"carrier_capacity_buffer_pct": int(snap["routes"][rt].get("capacity", 100) // 10)},
+            "cost_usd": int(cost[i]),
+            "sla_expected_percent": float(sla[i]),
+            "sla_pct": int(sla[i]),
+            "region_data_boundary": reg,
+            "region": reg,
+            "endpoint": "public" if public[i] else "private",
+            "latency_ms": int(latency_ms[i]),
+            "pii_access": bool(pii[i]),
+            "stockout_risk": float(risk[i]),
+            "delay_minutes": int(delay[i]),
+            "kpi_expectations": {"stockout_risk_reduction_pct": int(risk_red[i]),
+                                 "delay_reduction_pct": int(delay_red[i])},
+            "inputs": {"route_id": rid, "warehouse_id": wid},
+            "ts": event["ts"],
+        })
+    return out
+
+
+def bundle(spec: ScaleSpec, snap: Dict[str, Any], event: Dict[str, Any], index: int,
+           adjacency: Optional[Dict[str, List[Tuple[str, str]]]] = None) -> Dict[str, Any]:
+    """generate_plans.py-shaped bundle for one event."""
+    return {"event": event, "plans": plans(spec, snap, event, index, adjacency),
+            "origin_event_file": f"{event_id(event)}.json", "generated_at": event["ts"]}
+
+
+def build(spec: ScaleSpec) -> Fixture:
+    snap = snapshot(spec)
+    evts = events(spec, snap)
+    adj = _adjacency(snap)
+    return Fixture(spec, snap, evts, [bundle(spec, snap, e, i, adj) for i, e in enumerate(evts)])
+
+
+@lru_cache(maxsize=4)
+def fixture(size: str = "scale") -> Fixture:
+    """Standard scale fixture by name (see SIZES); cached per process."""
+    return build(SIZES[size])
+
+
+def plan_pool(n: int, spec: ScaleSpec = SIZES["scale"]) -> List[Dict[str, Any]]:
+    """First n plans across as many events of `spec` as needed."""
+    per = max(1, spec.plans_per_event)
+    f = build(spec._replace(events=-(-n // per)))
+    return f.plans[:n]
+
+
+def app_preset(f: Fixture) -> Dict[str, Any]:
+    """app.py PRESETS entry: the snapshot, defaulting to the first event's route/warehouse."""
+    first = f.events[0] if f.events else {}
+    return {"snapshot": f.snapshot,
+            "default_route": first.get("route_id", next(iter(f.snapshot["routes"]), None)),
+            "default_warehouse": first.get("warehouse_id", next(iter(f.snapshot["warehouses"]), None))}
+
+
+def neighbourhood(snap: Dict[str, Any], warehouse_id: str, route_id: Optional[str] = None,
+                  max_routes: int = 6) -> Dict[str, Any]:
+    """
+    Sub-snapshot small enough to draw: the warehouse, up to `max_routes`
+    of its routes (route_id first) and the warehouses at their far ends.
+    """
+    touching = [rid for rid, r in snap["routes"].items() if warehouse_id in r.get("warehouses", ())]
+    if route_id in touching:
+        touching.remove(route_id)
+        touching.insert(0, route_id)
+    routes = {rid: snap["routes"][rid] for rid in touching[:max_routes]}
+    wids = [warehouse_id] + [w for r in routes.values() for w in r["warehouses"] if w != warehouse_id]
+    return {"warehouses": {w: snap["warehouses"][w] for w in dict.fromkeys(wids) if w in snap["warehouses"]},
+            "routes": routes}
+
+
+def write(f: Fixture, out_dir: str) -> Dict[str, Any]:
+    """
+    Write twin_snapshot.json, events/<id>.json, plans/<bundle_id>.json and
+    plans.json (every plan, for the verifier/simulator CLIs), plus a
+    manifest.json with the spec and file digests.
+    """
+    def dump(path: str, obj: Any) -> str:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps(obj, indent=2).encode()
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+        return hashlib.sha256(data).hexdigest()
+
+    files = {"twin_snapshot.json": dump(os.path.join(out_dir, "twin_snapshot.json"), f.snapshot)}
+    for e, b in zip(f.events, f.bundles):
+        name = f"events/{event_id(e)}.json"
+        files[name] = dump(os.path.join(out_dir, name), e)
+        bid = hashlib.sha256(json.dumps(b, sort_keys=True).encode()).hexdigest()[:16]
+        name = f"plans/{bid}.json"
+        files[name] = dump(os.path.join(out_dir, name), b)
+    files["plans.json"] = dump(os.path.join(out_dir, "plans.json"), f.plans)
+    manifest = {"spec": f.spec._asdict(), "warehouses": len(f.snapshot["warehouses"]),
+                "routes": len(f.snapshot["routes"]), "events": len(f.events), "plans": len(f.plans),
+                "files": files}
+    dump(os.path.join(out_dir, "manifest.json"), manifest)
+    return manifest
@@ -0,0 +1,190 @@
+# hub/signal_gen.py
+"""
+Vectorized, deterministic signal generator for load tests and benchmarks.
+
+Each route is one stream, owned by warehouse W{r % n_warehouses}. A stream
+ticks every `interval_s` seconds from `start`, offset by a fixed per-stream
+phase. Its values are:
+  risk           base + daily sine + noise + decaying disruption bursts
+  delay_minutes  base delay + noise + burst spikes
+  cost_delta     cost scale x (1 + bursts) + noise
+
+Randomness comes from per-stream generators seeded with
+SeedSequence(seed, spawn_key=(stream, slab)). Static stream parameters use
+slab -1. Time is cut into fixed slabs of `slab_ticks` ticks. A burst that
+starts near the end of a slab decays into the next one: that slab
+regenerates the previous slab's impulses from their own seed.
+
+Work units are (stream chunk, slab) pairs. A unit's output depends only on
+its own seeds, and units are merged in a fixed order. The rows are
+therefore identical for any number of worker processes. Rows come out in
+timestamp order (ties by stream), so a SignalStore built from them stays
+sorted.
+"""
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, NamedTuple, Tuple
+
+import numpy as np
+
+from hub.signal_store import FIELDS, SignalStore, ms_to_iso, to_ms
+
+DEFAULT_START = "2025-01-01T00:00:00+00:00"
+DAY_MS = 86_400_000
+BURST_KERNEL = 12  # ticks for a burst to decay to ~5%
+
+
+class GenSpec(NamedTuple):
+    rows: int
+    warehouses: int = 100
+    routes: int = 1000
+    interval_s: float = 300.0
+    start: str = DEFAULT_START
+    seed: int = 0
+    slab_ticks: int = 256
+    chunk_streams: int = 512
+    burst_rate: float = 0.002  # bursts per stream tick
+
+    @property
+    def ticks(self) -> int:
+        return -(-self.rows // self.routes)
+
+    @property
+    def slabs(self) -> int:
+        return -(-self.ticks // self.slab_ticks)
+
+
+def _rng(seed: int, stream: int, slab: int, tag: int = 0) -> np.random.Generator:
+    # spawn_key entries must be non-negative: slab -1 (static parameters) maps to 0
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(stream, slab + 1, tag)))
+
+
+def _stream_params(spec: GenSpec, streams: np.ndarray) -> Dict[str, np.ndarray]:
+    draws = np.array([_rng(spec.seed, s, -1).random(6) for s in streams.tolist()]).reshape(-1, 6)
+    return {
+        "phase_ms": np.floor(draws[:, 0] * spec.interval_s).astype(np.int64) * 1000,  # whole seconds
+        "base_risk": 0.15 + 0.45 * draws[:, 1],
+        "season_amp": 0.02 + 0.08 * draws[:, 2],
+        "season_phase": 2 * np.pi * draws[:, 3],
+        "base_delay": 5 + 35 * draws[:, 4],
+        "cost_scale": 1000 + 9000 * draws[:, 5],
+    }
+
+
+def _impulses(spec: GenSpec, stream: int, slab: int) -> np.ndarray:
+    if slab < 0:
+        return np.zeros(spec.slab_ticks)
+    rng = _rng(spec.seed, stream, slab, tag=1)
+    hits = rng.random(spec.slab_ticks) < spec.burst_rate
+    return np.where(hits, rng.uniform(0.2, 0.5, spec.slab_ticks), 0.0)
+
+
+def _kernel() -> np.ndarray:
+    return np.exp(-3.0 * np.arange(BURST_KERNEL) / BURST_KERNEL)
+
+
+def generate_unit(spec: GenSpec, stream_lo: int, stream_hi: int, slab: int) -> Dict[str, np.ndarray]:
+    """
+    Columns for streams [stream_lo, stream_hi) over one slab, shaped
+    (streams, ticks), with warehouse / route as integer ids.
+    """
+    streams = np.arange(stream_lo, stream_hi)
+    p = _stream_params(spec, streams)
+    tick0 = slab * spec.slab_ticks
+    ticks = np.arange(tick0, min(tick0 + spec.slab_ticks, spec.ticks))
+    n_s, n_t = len(streams), len(ticks)
+    interval_ms = int(spec.interval_s * 1000)
+    ts = to_ms(spec.start) + ticks[None, :] * interval_ms + p["phase_ms"][:, None]
+
+    noise = np.empty((n_s, n_t, 3))
+    burst = np.empty((n_s, n_t))
+    kernel = _kernel()
+    for i, s in enumerate(streams.tolist()):
+        noise[i] = _rng(spec.seed, s, slab).standard_normal((n_t, 3))
+        imp = np.concatenate([_impulses(spec, s, slab - 1), _impulses(spec, s, slab)])
+        burst[i] = np.convolve(imp, kernel)[spec.slab_ticks:spec.slab_ticks + n_t]
+
+    season = p["season_amp"][:, None] * np.sin(2 * np.pi * (ts % DAY_MS) / DAY_MS + p["season_phase"][:, None])
+    risk = np.clip(p["base_risk"][:, None] + season + 0.03 * noise[..., 0] + burst, 0.0, 1.0)
+    delay = np.maximum(0.0, p["base_delay"][:, None] * (1 + 0.2 * noise[..., 1]) + 120 * burst)
+    cost = p["cost_scale"][:, None] * (1 + 3 * burst + 0.1 * noise[..., 2])
+    return {
+        "ts": ts,
+        "warehouse": np.broadcast_to((streams % spec.warehouses)[:, None], (n_s, n_t)),
+        "route": np.broadcast_to(streams[:, None], (n_s, n_t)),
+        "risk": np.round(risk, 2),
+        "delay_minutes": delay.astype(np.int32),
+        "cost_delta": np.round(cost).astype(np.int64),
+    }
+
+
+def _unit(args: Tuple[GenSpec, int, int, int]) -> Dict[str, np.ndarray]:
+    return generate_unit(*args)
+
+
+def generate(spec: GenSpec, workers: int = 1) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Yield one block of flat columns per slab, in timestamp order, with
+    warehouse / route as "W<n>" / "R<n>" strings. The last slab is trimmed
+    so exactly spec.rows rows are produced.
+    """
+    if spec.slab_ticks < BURST_KERNEL:
+        raise ValueError(f"slab_ticks must be >= {BURST_KERNEL}")
+    if spec.rows <= 0 or spec.routes <= 0 or spec.warehouses <= 0:
+        return
+    chunks = [(lo, min(lo + spec.chunk_streams, spec.routes)) for lo in range(0, spec.routes, spec.chunk_streams)]
+    units = [(spec, lo, hi, slab) for slab in range(spec.slabs) for lo, hi in chunks]
+    pool = ProcessPoolExecutor(workers) if workers > 1 else None
+    try:
+        results = pool.map(_unit, units, chunksize=1) if pool else map(_unit, units)
+        remaining = spec.rows
+        for _ in range(spec.slabs):
+            parts = [next(results) for _ in chunks]
+            cols = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+            # (streams, ticks) -> tick-major, and by phase within a tick: timestamp order
+            order = np.lexsort((cols["route"][:, 0], cols["ts"][:, 0]))
+            flat = {k: v[order].T.reshape(-1)[:remaining] for k, v in cols.items()}
+            remaining -= len(flat["ts"])
+            flat["warehouse"] = np.char.add("W", flat["warehouse"].astype(str))
+            flat["route"] = np.char.add("R", flat["route"].astype(str))
+            yield flat
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+
+
+def write_store(spec: GenSpec, path: str, workers: int = 1) -> int:
+    """Append the generated rows to a SignalStore; returns its new row count."""
+    store = SignalStore(path)
+    total = len(store)
+    for cols in generate(spec, workers):
+        total = store.append_columns(**cols)
+    return total
+
+
+def write_csv(spec: GenSpec, path: str, workers: int = 1) -> int:
+    """Append the generated rows to a signals CSV (header if new); returns rows written."""
+    new = not os.path.exists(path) or os.path.getsize(path) == 0
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    n = 0
+    with open(path, "a", newline="") as f:
+        if new:
+            f.write(",".join(FIELDS) + "\n")
+        for cols in generate(spec, workers):
+            f.write("".join(f"{ms_to_iso(t)},{w},{r},{risk},{d},{c}\n" for t, w, r, risk, d, c in zip(
+                cols["ts"].tolist(), cols["warehouse"].tolist(), cols["route"].tolist(), cols["risk"].tolist(),
+                cols["delay_minutes"].tolist(), cols["cost_delta"].tolist())))
+            n += len(cols["ts"])
+    return n
+
+
+def digest(spec: GenSpec, workers: int = 1) -> str:
+    """sha256 over the generated columns; equal digests mean identical output."""
+    h = hashlib.sha256()
+    for cols in generate(spec, workers):
+        for k in ("ts", "risk", "delay_minutes", "cost_delta"):
+            h.update(np.ascontiguousarray(cols[k]).tobytes())
+        for k in ("warehouse", "route"):
+            h.update("\n".join(cols[k].tolist()).encode())
+    return h.hexdigest()
@@ -0,0 +1,320 @@
+# hub/signal_store.py
+"""
+Columnar, memory-mapped store for the signal fields of data/signals.csv.
+
+Layout (data/signal_store/):
+  ts.bin             int64   epoch milliseconds
+  warehouse.bin      uint32  code into warehouses.json
+  route.bin          uint32  code into routes.json
+  risk.bin           float64
+  delay_minutes.bin  int32
+  cost_delta.bin     int64
+  ts_index.bin       int64 (min, max) timestamp per block of BLOCK rows
+  meta.json          {"rows", "sorted", ...}: the commit point
+
+Writers append under a file lock: column bytes first, then dictionaries,
+then the index, and meta.json last. Readers map exactly meta["rows"] rows,
+so a crashed append is invisible and is truncated by the next writer.
+
+The sparse index holds one (min, max) pair per block. While timestamps are
+non-decreasing ("sorted"), a time range is two binary searches over block
+minimums plus two inside one block each: O(log n) plus the result size.
+Otherwise only blocks whose [min, max] overlaps the range are scanned.
+last(n) is a slice of the newest n rows.
+"""
+import csv
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from hub.chain_append import chain_lock
+
+STORE_DIR = os.path.join("data", "signal_store")
+CSV_PATH = os.path.join("data", "signals.csv")
+BLOCK = 4096
+FIELDS = ("timestamp", "warehouse", "route", "risk", "delay_minutes", "cost_delta")
+COLUMNS = {
+    "ts": np.dtype("<i8"),
+    "warehouse": np.dtype("<u4"),
+    "route": np.dtype("<u4"),
+    "risk": np.dtype("<f8"),
+    "delay_minutes": np.dtype("<i4"),
+    "cost_delta": np.dtype("<i8"),
+}
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+TimeLike = Union[int, float, str, datetime]
+
+
+def to_ms(t: TimeLike) -> int:
+    """Epoch milliseconds from epoch seconds, an ISO-8601 string or a datetime."""
+    if isinstance(t, str):
+        t = datetime.fromisoformat(t.replace("Z", "+00:00"))
+    if isinstance(t, datetime):
+        if t.tzinfo is None:
+            t = t.replace(tzinfo=timezone.utc)
+        return (t - _EPOCH) // timedelta(milliseconds=1)
+    return int(round(float(t) * 1000))
+
+
+def ms_to_iso(ms: int) -> str:
+    return (_EPOCH + timedelta(milliseconds=int(ms))).isoformat()
+
+
+class Columns:
+    """A slice of the store: raw column arrays plus the id dictionaries."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], warehouses: List[str], routes: List[str]):
+        self.arrays = arrays
+        self.warehouses = warehouses
+        self.routes = routes
+
+    def __len__(self) -> int:
+        return len(self.arrays["ts"])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.arrays[name]
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """CSV-shaped dicts (timestamp as ISO-8601, ids decoded)."""
+        a = self.arrays
+        wh, rt = self.warehouses, self.routes
+        return [{"timestamp": ms_to_iso(ts), "warehouse": wh[w], "route": rt[r], "risk": risk,
+                 "delay_minutes": d, "cost_delta": c}
+                for ts, w, r, risk, d, c in zip(a["ts"].tolist(), a["warehouse"].tolist(), a["route"].tolist(),
+                                                a["risk"].tolist(), a["delay_minutes"].tolist(),
+                                                a["cost_delta"].tolist())]
+
+
+class SignalStore:
+    def __init__(self, path: str = STORE_DIR, block: int = BLOCK):
+        self.path = path
+        self.meta_path = os.path.join(path, "meta.json")
+        self.lock_path = os.path.join(path, "store.lock")
+        self.block = block
+        self._maps: Dict[str, np.ndarray] = {}
+        self._mapped: Optional[Tuple[int, int]] = None
+        self._dicts: Dict[str, Tuple[int, List[str]]] = {}
+
+    # --- metadata ------------------------------------------------------------
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.bin")
+
+    def meta(self) -> Dict[str, Any]:
+        try:
+            with open(self.meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"rows": 0, "sorted": True, "block": self.block}
+
+    def __len__(self) -> int:
+        return int(self.meta()["rows"])
+
+    def _dictionary(self, name: str) -> List[str]:
+        path = os.path.join(self.path, f"{name}.json")
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return []
+        cached = self._dicts.get(name)
+        if cached is None or cached[0] != mtime:
+            with open(path) as f:
+                cached = self._dicts[name] = (mtime, json.load(f))
+        return cached[1]
+
+    def _write_json(self, name: str, obj: Any) -> None:
+        path = os.path.join(self.path, name)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(obj, f)
+        os.replace(tmp, path)
+
+    # --- writes --------------------------------------------------------------
+
+    def append(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Append CSV-shaped rows (any TimeLike timestamp); returns the new row count."""
+        rows = list(rows)
+        if not rows:
+            return len(self)
+        return self.append_columns(
+            ts=np.fromiter((to_ms(r["timestamp"]) for r in rows), dtype=np.int64, count=len(rows)),
+            warehouse=[str(r["warehouse"]) for r in rows],
+            route=[str(r["route"]) for r in rows],
+            risk=np.asarray([float(r["risk"]) for r in rows]),
+            delay_minutes=np.asarray([int(float(r["delay_minutes"])) for r in rows]),
+            cost_delta=np.asarray([int(float(r["cost_delta"])) for r in rows]),
+        )
+
+    def append_columns(self, ts: np.ndarray, warehouse: Sequence[str], route: Sequence[str], risk: np.ndarray,
+                       delay_minutes: np.ndarray, cost_delta: np.ndarray) -> int:
+        """
+        Append column arrays (ts in epoch ms; warehouse / route as strings or
+        numpy string arrays). Returns the new row count.
+        """
+        n_new = len(ts)
+        os.makedirs(self.path, exist_ok=True)
+        with chain_lock(self.lock_path):
+            meta = self.meta()
+            n = int(meta["rows"])
+            codes = {}
+            for name, values in (("warehouses", warehouse), ("routes", route)):
+                known = list(self._dictionary(name))
+                lookup = {v: i for i, v in enumerate(known)}
+                uniq, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+                mapping = np.empty(len(uniq), dtype=np.uint32)
+                for i, v in enumerate(uniq.tolist()):
+                    if v not in lookup:
+                        lookup[v] = len(known)
+                        known.append(v)
+                    mapping[i] = lookup[v]
+                codes[name] = mapping[inverse]
+                if len(known) != len(self._dictionary(name)):
+                    self._write_json(f"{name}.json", known)
+            cols = {
+                "ts": np.asarray(ts, dtype=COLUMNS["ts"]),
+                "warehouse": codes["warehouses"],
+                "route": codes["routes"],
+                "risk": np.asarray(risk, dtype=COLUMNS["risk"]),
+                "delay_minutes": np.asarray(delay_minutes, dtype=COLUMNS["delay_minutes"]),
+                "cost_delta": np.asarray(cost_delta, dtype=COLUMNS["cost_delta"]),
+            }
+            for name, dtype in COLUMNS.items():
+                arr = cols[name]
+                if len(arr) != n_new:
+                    raise ValueError(f"column {name} has {len(arr)} values, expected {n_new}")
+                with open(self._file(name), "ab") as f:
+                    f.truncate(n * dtype.itemsize)  # drop bytes of an uncommitted append
+                    f.write(arr.astype(dtype, copy=False).tobytes())
+            last_ts = self._last_ts(n)
+            new_ts = cols["ts"]
+            still_sorted = bool(meta.get("sorted", True)) and bool(np.all(new_ts[1:] >= new_ts[:-1])) and \
+                (last_ts is None or n_new == 0 or bool(new_ts[0] >= last_ts))
+            self._update_index(n, n + n_new)
+            meta.update(rows=n + n_new, sorted=still_sorted, block=self.block,
+                        columns={k: v.str for k, v in COLUMNS.items()})
+            self._write_json("meta.json", meta)
+        return n + n_new
+
+    def _last_ts(self, n: int) -> Optional[int]:
+        if n == 0:
+            return None
+        with open(self._file("ts"), "rb") as f:
+            f.seek((n - 1) * 8)
+            return int(np.frombuffer(f.read(8), dtype="<i8")[0])
+
+    def _update_index(self, old_rows: int, new_rows: int) -> None:
+        """Recompute (min, max) for the blocks touched by rows [old_rows, new_rows)."""
+        first = old_rows // self.block
+        last = (new_rows - 1) // self.block
+        ts = np.memmap(self._file("ts"), dtype=COLUMNS["ts"], mode="r", shape=(new_rows,))
+        pairs = np.empty((last - first + 1, 2), dtype="<i8")
+        for b in range(first, last + 1):
+            chunk = ts[b * self.block:min((b + 1) * self.block, new_rows)]
+            pairs[b - first] = (chunk.min(), chunk.max())
+        del ts
+        path = self._file("ts_index")
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(fd, first * 16)
+            os.pwrite(fd, pairs.tobytes(), first * 16)
+        finally:
+            os.close(fd)
+
+    def import_csv(self, csv_path: str = CSV_PATH, batch: int = 100_000) -> int:
+        """Append every row of a signals CSV; returns the number imported."""
+        total, buf = 0, []
+        with open(csv_path, newline="") as f:
+            for row in csv.DictReader(f):
+                buf.append(row)
+                if len(buf) >= batch:
+                    self.append(buf)
+                    total += len(buf)
+                    buf = []
+        if buf:
+            self.append(buf)
+            total += len(buf)
+        return total
+
+    def export_csv(self, csv_path: str, start: int = 0, stop: Optional[int] = None) -> int:
+        cols = self.slice(start, stop)
+        with open(csv_path, "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(FIELDS)
+            for r in cols.rows():
+                w.writerow([r[k] for k in FIELDS])
+        return len(cols)
+
+    # --- reads ---------------------------------------------------------------
+
+    def _arrays(self) -> Dict[str, np.ndarray]:
+        meta = self.meta()
+        rows = int(meta["rows"])
+        key = (rows, os.stat(self.meta_path).st_mtime_ns if rows else 0)
+        if self._mapped != key:
+            maps = {}
+            for name, dtype in COLUMNS.items():
+                maps[name] = np.memmap(self._file(name), dtype=dtype, mode="r", shape=(rows,)) \
+                    if rows else np.zeros(0, dtype=dtype)
+            n_blocks = -(-rows // self.block)
+            maps["ts_index"] = np.memmap(self._file("ts_index"), dtype="<i8", mode="r", shape=(n_blocks, 2)) \
+                if rows else np.zeros((0, 2), dtype="<i8")
+            self._maps, self._mapped = maps, key
+            self._sorted = bool(meta.get("sorted", True))
+        return self._maps
+
+    def _columns(self, maps: Dict[str, np.ndarray], sel) -> Columns:
+        return Columns({k: maps[k][sel] for k in COLUMNS}, self._dictionary("warehouses"), self._dictionary("routes"))
+
+    def slice(self, start: int = 0, stop: Optional[int] = None) -> Columns:
+        maps = self._arrays()
+        return self._columns(maps, slice(start, stop))
+
+    def last(self, n: int) -> Columns:
+        maps = self._arrays()
+        rows = len(maps["ts"])
+        return self._columns(maps, slice(max(0, rows - n), rows))
+
+    def range(self, start: TimeLike, end: TimeLike) -> Columns:
+        """Rows with start <= timestamp < end."""
+        lo_ms, hi_ms = to_ms(start), to_ms(end)
+        maps = self._arrays()
+        ts, index = maps["ts"], maps["ts_index"]
+        if not len(ts) or hi_ms <= lo_ms:
+            return self._columns(maps, slice(0, 0))
+        if self._sorted:
+            return self._columns(maps, slice(self._bound(ts, index[:, 0], lo_ms), self._bound(ts, index[:, 0], hi_ms)))
+        hits = np.nonzero((index[:, 1] >= lo_ms) & (index[:, 0] < hi_ms))[0]
+        parts = []
+        for b in hits.tolist():
+            off = b * self.block
+            chunk = ts[off:off + self.block]
+            parts.append(off + np.nonzero((chunk >= lo_ms) & (chunk < hi_ms))[0])
+        sel = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+        return self._columns(maps, sel)
+
+    def _bound(self, ts: np.ndarray, block_min: np.ndarray, t: int) -> int:
+        """First row with ts >= t (sorted store): sparse index, then one block."""
+        b = int(np.searchsorted(block_min, t, side="left"))
+        # Rows >= t start in block b-1 (which may straddle t) or at block b
+        if b == 0:
+            return 0
+        off = (b - 1) * self.block
+        chunk = ts[off:off + self.block]
+        return off + int(np.searchsorted(chunk, t, side="left"))
+
+
+def open_store(path: str = STORE_DIR, csv_path: Optional[str] = CSV_PATH) -> SignalStore:
+    """
+    The signal store at `path`; an empty store is seeded once from the
+    legacy signals CSV when it exists.
+    """
+    store = SignalStore(path)
+    if csv_path and len(store) == 0 and os.path.exists(csv_path):
+        with chain_lock(os.path.join(path, "import.lock")):
+            if len(store) == 0:
+                store.import_csv(csv_path)
+    return store
@@ -0,0 +1,421 @@
+# hub/signal_stream.py
+"""
+Streaming ingestion of signal rows (data/signal_store/, or a signals CSV)
+into disruption events.
+
+SignalTail follows the CSV by byte offset: each poll() parses only complete
+lines appended since the last call. StoreTail does the same over the
+columnar hub.signal_store by row index. The offset, inode and header are kept
+in a state file so a restarted ingestor resumes where it stopped (and warms
+its windows from the rows just before the offset). A changed inode or a
+file shorter than the offset restarts from the top.
+
+RollingAggregates keeps per-route and per-warehouse sliding windows
+(`window_s` seconds of signal time) with running sums, so each row is O(1)
+amortized.
+
+Thresholds come from policies/base.yaml constraints.risk_thresholds: a key
+whose rolling mean risk rises above max_stockout_risk, or whose mean delay
+rises above max_delay_minutes, emits one disruption event. It re-arms once
+the mean falls back below `rearm` x the threshold.
+
+Events go to the pipeline through a bounded EventQueue, which gives
+backpressure:
+- "block":    the tail stops reading until verification catches up
+- "coalesce": a queued event for the same (warehouse, route) is replaced by
+  the newer one; the tail blocks only when the queue is full of distinct keys
+The tail offset is committed only after a batch's events are queued.
+"""
+import csv
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from hub import policy_model, signal_store
+from hub.record_tail import tail_lines
+
+SIGNALS_FILE = os.path.join("data", "signals.csv")
+STATE_FILE = "artifacts/signal_stream_state.json"
+POLICY_PATH = "policies/base.yaml"
+NUMERIC = {"risk": float, "delay_minutes": float, "cost_delta": float}
+
+
+def parse_row(row: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """Typed signal row, or None if it is malformed."""
+    try:
+        out: Dict[str, Any] = dict(row)
+        for k, conv in NUMERIC.items():
+            out[k] = conv(row[k])
+        out["epoch"] = datetime.fromisoformat(row["timestamp"].replace("Z", "+00:00")).timestamp()
+        return out
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return None
+
+
+def last_rows(path: str = SIGNALS_FILE, n: int = 3) -> List[Dict[str, str]]:
+    """Last n data rows of a signals CSV, reading only the file's tail."""
+    with open(path, "rb") as f:
+        header = f.readline()
+    lines = [ln for ln in tail_lines(path, n + 1) if ln.strip() != header.strip()][-n:]
+    return list(csv.DictReader(io.StringIO((header + b"\n".join(lines) + b"\n").decode("utf-8"))))
+
+
+def load_thresholds(path: str = POLICY_PATH) -> Dict[str, float]:
+    th = (policy_model.load(path).doc.get("constraints") or {}).get("risk_thresholds") or {}
+    return {"max_stockout_risk": float(th.get("max_stockout_risk", 1.0)),
+            "max_delay_minutes": float(th.get("max_delay_minutes", float("inf")))}
+
+
+class SignalTail:
+    def __init__(self, path: str = SIGNALS_FILE, state_path: Optional[str] = STATE_FILE):
+        self.path = path
+        self.state_path = state_path
+        self.offset = 0
+        self.inode: Optional[int] = None
+        self.header: Optional[List[str]] = None
+        self._load_state()
+
+    def _load_state(self) -> None:
+        if not self.state_path:
+            return
+        try:
+            with open(self.state_path) as f:
+                st = json.load(f).get(os.path.abspath(self.path)) or {}
+            self.offset, self.inode, self.header = int(st["offset"]), st.get("inode"), st.get("header")
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def commit(self) -> None:
+        """Persist the current offset (after the rows' events are queued)."""
+        if not self.state_path:
+            return
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        try:
+            with open(self.state_path) as f:
+                doc = json.load(f)
+        except (OSError, ValueError):
+            doc = {}
+        doc[os.path.abspath(self.path)] = {"offset": self.offset, "inode": self.inode, "header": self.header}
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(doc, f)
+        os.replace(tmp, self.state_path)
+
+    def poll(self, max_bytes: int = 1 << 20) -> List[Dict[str, Any]]:
+        """
+        Parsed rows from complete lines appended since the last poll (at
+        most about `max_bytes` per call). Advances the in-memory offset;
+        call commit() to persist it.
+        """
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+        if st.st_ino != self.inode or st.st_size < self.offset:
+            self.offset, self.inode, self.header = 0, st.st_ino, None
+        if st.st_size == self.offset:
+            return []
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(min(max_bytes, st.st_size - self.offset))
+            cut = data.rfind(b"\n") + 1
+            while cut == 0 and self.offset + len(data) < st.st_size:  # one line longer than max_bytes
+                more = f.read(max_bytes)
+                data += more
+                cut = data.rfind(b"\n") + 1
+        if cut == 0:
+            return []
+        lines = data[:cut].decode("utf-8", errors="replace").splitlines()
+        self.offset += cut
+        if self.header is None and lines:
+            self.header = next(csv.reader([lines.pop(0)]))
+        rows = []
+        for values in csv.reader(ln for ln in lines if ln.strip()):
+            row = parse_row(dict(zip(self.header, values)))
+            if row is not None:
+                rows.append(row)
+        return rows
+
+    def history(self, max_rows: int) -> List[Dict[str, Any]]:
+        """Parsed rows among the last `max_rows` lines before the offset."""
+        if not self.header or not os.path.exists(self.path):
+            return []
+        lines = tail_lines(self.path, max_rows, end=self.offset)
+        text = "\n".join(ln.decode("utf-8", errors="replace") for ln in lines)
+        rows = []
+        for values in csv.reader(text.splitlines()):
+            if values == self.header:
+                continue
+            row = parse_row(dict(zip(self.header, values)))
+            if row is not None:
+                rows.append(row)
+        return rows
+
+
+class StoreTail(SignalTail):
+    """
+    SignalTail over a columnar SignalStore: the offset is a row index and
+    each poll() maps only the rows committed since the last call.
+    """
+
+    ROW_BYTES = 48  # roughly one CSV line, so max_bytes bounds a poll alike
+
+    def __init__(self, path: str = signal_store.STORE_DIR, state_path: Optional[str] = STATE_FILE):
+        self.store = signal_store.SignalStore(path)
+        super().__init__(path, state_path)
+
+    def _rows(self, start: int, stop: int) -> List[Dict[str, Any]]:
+        cols = self.store.slice(start, stop)
+        rows = cols.rows()
+        for row, ts in zip(rows, cols["ts"].tolist()):
+            row["epoch"] = ts / 1000.0
+        return rows
+
+    def poll(self, max_bytes: int = 1 << 20) -> List[Dict[str, Any]]:
+        n = len(self.store)
+        if n < self.offset:  # store was rebuilt
+            self.offset = 0
+        stop = min(n, self.offset + max(1, max_bytes // self.ROW_BYTES))
+        rows = self._rows(self.offset, stop)
+        self.offset = stop
+        return rows
+
+    def history(self, max_rows: int) -> List[Dict[str, Any]]:
+        return self._rows(max(0, self.offset - max_rows), self.offset)
+
+
+class _Window:
+    __slots__ = ("rows", "risk", "delay", "cost")
+
+    def __init__(self):
+        self.rows: Deque[Tuple[float, float, float, float]] = deque()
+        self.risk = self.delay = self.cost = 0.0
+
+    def push(self, epoch: float, risk: float, delay: float, cost: float, window_s: float) -> None:
+        self.rows.append((epoch, risk, delay, cost))
+        self.risk += risk
+        self.delay += delay
+        self.cost += cost
+        horizon = epoch - window_s
+        while self.rows and self.rows[0][0] <= horizon:
+            _, r, d, c = self.rows.popleft()
+            self.risk -= r
+            self.delay -= d
+            self.cost -= c
+
+    def stats(self) -> Dict[str, float]:
+        n = len(self.rows) or 1
+        return {"count": len(self.rows), "mean_risk": round(self.risk / n, 4),
+                "mean_delay_minutes": round(self.delay / n, 2), "sum_cost_delta": round(self.cost, 2)}
+
+
+class RollingAggregates:
+    def __init__(self, window_s: float = 900.0):
+        self.window_s = window_s
+        self.routes: Dict[str, _Window] = {}
+        self.warehouses: Dict[str, _Window] = {}
+        self.pairs: Dict[Tuple[str, str], _Window] = {}
+
+    def add(self, row: Dict[str, Any]) -> Tuple[str, str]:
+        key = (row.get("warehouse") or "", row.get("route") or "")
+        vals = (row["epoch"], row["risk"], row["delay_minutes"], row["cost_delta"], self.window_s)
+        self.warehouses.setdefault(key[0], _Window()).push(*vals)
+        self.routes.setdefault(key[1], _Window()).push(*vals)
+        self.pairs.setdefault(key, _Window()).push(*vals)
+        return key
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        return {"routes": {k: w.stats() for k, w in self.routes.items()},
+                "warehouses": {k: w.stats() for k, w in self.warehouses.items()}}
+
+
+class EventQueue:
+    """Bounded queue of disruption events with "block" or "coalesce" backpressure."""
+
+    def __init__(self, maxsize: int = 16, policy: str = "coalesce"):
+        if policy not in ("block", "coalesce"):
+            raise ValueError(f"invalid backpressure policy: {policy!r} (block | coalesce)")
+        self.maxsize = maxsize
+        self.policy = policy
+        self._items: "OrderedDict[Any, Dict[str, Any]]" = OrderedDict()
+        self._seq = 0
+        self._cond = threading.Condition()
+        self.stats = {"queued": 0, "coalesced": 0, "blocked_s": 0.0}
+        self._closed = False
+
+    def put(self, key: Any, event: Dict[str, Any]) -> None:
+        with self._cond:
+            if self.policy == "coalesce" and key in self._items:
+                self._items[key] = event  # keep queue position, newest payload
+                self.stats["coalesced"] += 1
+                return
+            t0 = time.monotonic()
+            while len(self._items) >= self.maxsize and not self._closed:
+                self._cond.wait()
+            self.stats["blocked_s"] += time.monotonic() - t0
+            if self.policy == "block":
+                self._seq += 1
+                key = (key, self._seq)
+            self._items[key] = event
+            self.stats["queued"] += 1
+            self._cond.notify_all()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Next event, or None once closed and drained (or on timeout)."""
+        with self._cond:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not self._items:
+                if self._closed:
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            _, event = self._items.popitem(last=False)
+            self._cond.notify_all()
+            return event
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._items)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+def run_pipeline(event: Dict[str, Any]) -> Any:
+    """Default sink: one in-process pipeline run (verify + simulate + proof)."""
+    from hub import pipeline
+    return pipeline.run(event)
+
+
+class StreamIngestor:
+    """
+        ing = StreamIngestor(sink=run_pipeline)
+        ing.start()                 # consumer threads
+        ing.follow(poll_interval=1) # until stop()
+    """
+
+    def __init__(self, tail: Optional[SignalTail] = None, thresholds: Optional[Dict[str, float]] = None,
+                 sink: Callable[[Dict[str, Any]], Any] = run_pipeline, window_s: float = 900.0,
+                 rearm: float = 0.9, queue_size: int = 16, backpressure: str = "coalesce", workers: int = 1):
+        self.tail = tail if tail is not None else StoreTail()
+        self.thresholds = thresholds if thresholds is not None else load_thresholds()
+        self.sink = sink
+        self.rearm = rearm
+        self.aggregates = RollingAggregates(window_s)
+        self.queue = EventQueue(queue_size, backpressure)
+        self.workers = workers
+        self._armed: Dict[Tuple[str, str], Dict[str, bool]] = {}
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self.results: List[Any] = []
+        self.errors: List[Tuple[Dict[str, Any], str]] = []
+        self._lock = threading.Lock()
+        if self.tail.offset:
+            self.warm_up()
+
+    def warm_up(self, max_rows: int = 10000) -> None:
+        """
+        Rebuild the windows from up to `max_rows` rows before the resume
+        offset. Keys already over a threshold start disarmed, so a restart
+        does not re-emit their events.
+        """
+        for row in self.tail.history(max_rows):
+            self.aggregates.add(row)
+        for key, win in self.aggregates.pairs.items():
+            st = win.stats()
+            self._armed[key] = {"risk": st["mean_risk"] <= self.thresholds["max_stockout_risk"],
+                                "delay": st["mean_delay_minutes"] <= self.thresholds["max_delay_minutes"]}
+
+    # --- detection -----------------------------------------------------------
+
+    def _check(self, key: Tuple[str, str], row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        stats = self.aggregates.pairs[key].stats()
+        armed = self._armed.setdefault(key, {"risk": True, "delay": True})
+        crossed = []
+        for name, metric, limit in (("risk", stats["mean_risk"], self.thresholds["max_stockout_risk"]),
+                                    ("delay", stats["mean_delay_minutes"], self.thresholds["max_delay_minutes"])):
+            if armed[name] and metric > limit:
+                armed[name] = False
+                crossed.append(name)
+            elif not armed[name] and metric < limit * self.rearm:
+                armed[name] = True
+        if not crossed:
+            return None
+        return {
+            "type": "route_outage" if "delay" in crossed else "stockout_risk",
+            "route_id": key[1],
+            "warehouse_id": key[0],
+            "source": "signal-stream",
+            "severity": "high" if len(crossed) == 2 else "medium",
+            "ts": row["timestamp"],
+            "trigger": {"crossed": crossed, "thresholds": dict(self.thresholds), "window": stats},
+        }
+
+    def ingest(self, rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fold rows into the aggregates; queue (and return) triggered events."""
+        events = []
+        for row in rows:
+            key = self.aggregates.add(row)
+            event = self._check(key, row)
+            if event is not None:
+                self.queue.put(key, event)
+                events.append(event)
+        return events
+
+    def poll_once(self, max_bytes: int = 1 << 20) -> List[Dict[str, Any]]:
+        events = self.ingest(self.tail.poll(max_bytes))
+        self.tail.commit()
+        return events
+
+    def catch_up(self, max_bytes: int = 1 << 20) -> int:
+        """Process every complete row currently in the source; returns the event count."""
+        n, before = 0, None
+        while self.tail.offset != before and not self._stop.is_set():
+            before = self.tail.offset
+            n += len(self.poll_once(max_bytes))
+        return n
+
+    def follow(self, poll_interval: float = 1.0, max_bytes: int = 1 << 20) -> None:
+        """Tail until stop(); backpressure blocks inside queue.put()."""
+        while not self._stop.is_set():
+            self.catch_up(max_bytes)
+            self._stop.wait(poll_interval)
+
+    # --- consumers -----------------------------------------------------------
+
+    def _consume(self) -> None:
+        while True:
+            event = self.queue.get()
+            if event is None:
+                return
+            try:
+                result = self.sink(event)
+                with self._lock:
+                    self.results.append(result)
+            except Exception as e:
+                with self._lock:
+                    self.errors.append((event, f"{type(e).__name__}: {e}"))
+
+    def start(self) -> "StreamIngestor":
+        for i in range(self.workers):
+            t = threading.Thread(target=self._consume, name=f"signal-sink-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self) -> None:
+        """Stop tailing, drain queued events, join the consumers."""
+        self._stop.set()
+        self.queue.close()
+        for t in self._threads:
+            t.join()
+        self._threads = []
@@ -0,0 +1,772 @@
+# hub/twin_graph.py
+"""
+In-process Digital Twins graph with indexed SELECT / MATCH queries.
+
+Twins are stored as ADT-shaped dicts ({"$dtId", "$metadata": {"$model"},
+...properties}) in insertion order. build() freezes them into:
+- CSR adjacency per relationship name, outgoing and incoming
+  (offsets[n + 1] / targets int32 arrays), plus "*" for any relationship
+- hash indexes {value: int32 array of twin positions} for `index_props`
+  (warehouseId, routeId by default), for $dtId and for the model id; other
+  properties get an index on their first equality lookup
+
+Supported query subset (the shapes used in configs/day13.yaml and
+scripts/adt_touch.py, and the common ADT forms around them):
+
+  SELECT [TOP(n)] T | * | COUNT() | T.p [AS x], ... FROM DIGITALTWINS T [WHERE ...]
+  SELECT a, b FROM DIGITALTWINS MATCH (a)-[:REL]->(b) [WHERE ...]
+  MATCH (a)-[:REL]->(b)<-[:OTHER]-(c) [WHERE ...] RETURN a, b [LIMIT n]
+
+WHERE: = != <> < <= > >=, [NOT] IN [...], AND / OR / NOT, parentheses,
+IS_OF_MODEL(T, 'dtmi:...'), IS_DEFINED / IS_NULL / IS_BOOL / IS_NUMBER /
+IS_STRING / IS_PRIMITIVE / IS_OBJECT (T.p), STARTSWITH / ENDSWITH / CONTAINS
+(T.p, 's'). Hops may name several relationships ([:A|B]) or none ([]).
+JOIN ... RELATED is not supported; use MATCH.
+
+The planner splits WHERE into AND-ed conjuncts. Equality, IN and
+IS_OF_MODEL conjuncts on one alias become index lookups. The pattern is
+expanded depth-first from the node with the fewest candidates, with
+single-alias filters applied as soon as the alias is bound. TOP / LIMIT stops
+the search early.
+
+A single projected alias returns the twin itself; several return
+{alias: twin}. Returned twins are the graph's own dicts: treat them as
+read-only.
+"""
+import json
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+WAREHOUSE_MODEL = "dtmi:acm:Warehouse;1"
+ROUTE_MODEL = "dtmi:acm:Route;1"
+ROUTE_REL = "ROUTE"
+DEFAULT_INDEX_PROPS = ("warehouseId", "routeId")
+
+
+class QueryError(ValueError):
+    pass
+
+
+# --- parsing -----------------------------------------------------------------
+
+_TOKEN = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<str>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+  | (?P<num>\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+  | (?P<op><=|>=|!=|<>|->|<-|[=<>(),.\[\]:*|-])
+  | (?P<name>[A-Za-z_$][A-Za-z0-9_$]*)
+""", re.X)
+_ESCAPE = re.compile(r"\\(u[0-9A-Fa-f]{4}|.)", re.S)
+_ESCAPES = {"\\": "\\", "'": "'", '"': '"', "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+def _unescape(body: str) -> str:
+    def one(m):
+        e = m.group(1)
+        if len(e) == 5:
+            return chr(int(e[1:], 16))
+        if e not in _ESCAPES:
+            raise QueryError(f"invalid escape \\{e} in string literal")
+        return _ESCAPES[e]
+    return _ESCAPE.sub(one, body)
+
+
+def _tokenize(text: str) -> List[Tuple[str, Any]]:
+    out, pos = [], 0
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if not m:
+            raise QueryError(f"unexpected character {text[pos]!r} at {pos}")
+        pos = m.end()
+        kind = m.lastgroup
+        if kind == "ws":
+            continue
+        val = m.group()
+        if kind == "str":
+            val = _unescape(val[1:-1])
+        elif kind == "num":
+            val = float(val) if any(c in val for c in ".eE") else int(val)
+        out.append((kind, val))
+    out.append(("end", None))
+    return out
+
+
+class _Parser:
+    def __init__(self, text: str):
+        self.toks = _tokenize(text.strip().rstrip(";"))
+        self.i = 0
+
+    def peek(self, k: int = 0) -> Tuple[str, Any]:
+        return self.toks[min(self.i + k, len(self.toks) - 1)]
+
+    def kw(self, *words: str) -> bool:
+        kind, val = self.peek()
+        return kind == "name" and val.upper() in words
+
+    def op(self, *ops: str) -> bool:
+        kind, val = self.peek()
+        return kind == "op" and val in ops
+
+    def take(self):
+        tok = self.toks[self.i]
+        self.i += 1
+        return tok[1]
+
+    def expect_kw(self, word: str) -> None:
+        if not self.kw(word):
+            raise QueryError(f"expected {word}, got {self.peek()[1]!r}")
+        self.i += 1
+
+    def expect_op(self, op: str) -> None:
+        if not self.op(op):
+            raise QueryError(f"expected {op!r}, got {self.peek()[1]!r}")
+        self.i += 1
+
+    def name(self) -> str:
+        kind, val = self.peek()
+        if kind != "name":
+            raise QueryError(f"expected a name, got {val!r}")
+        self.i += 1
+        return val
+
+    def int_(self) -> int:
+        kind, val = self.peek()
+        if kind != "num" or not isinstance(val, int):
+            raise QueryError(f"expected an integer, got {val!r}")
+        self.i += 1
+        return val
+
+    # query := SELECT ... | MATCH ... RETURN ...
+    def query(self) -> "Query":
+        q = Query()
+        if self.kw("SELECT"):
+            self.i += 1
+            if self.kw("TOP"):
+                self.i += 1
+                paren = self.op("(")
+                if paren:
+                    self.i += 1
+                q.limit = self.int_()
+                if paren:
+                    self.expect_op(")")
+            q.projections = self.projections()
+            self.expect_kw("FROM")
+            self.expect_kw("DIGITALTWINS")
+            if self.kw("MATCH"):
+                self.i += 1
+                q.nodes, q.hops = self.pattern()
+            else:
+                # No alias (SELECT * FROM DIGITALTWINS): WHERE can't reference it
+                q.nodes = ["$"] if self.peek()[0] == "end" or self.kw("WHERE") else [self.name()]
+            if self.kw("JOIN"):
+                raise QueryError("JOIN ... RELATED is not supported; use MATCH")
+            if self.kw("WHERE"):
+                self.i += 1
+                q.where = self.expr()
+        elif self.kw("MATCH"):
+            self.i += 1
+            q.nodes, q.hops = self.pattern()
+            if self.kw("WHERE"):
+                self.i += 1
+                q.where = self.expr()
+            self.expect_kw("RETURN")
+            q.projections = self.projections()
+            if self.kw("LIMIT"):
+                self.i += 1
+                q.limit = self.int_()
+        else:
+            raise QueryError("query must start with SELECT or MATCH")
+        if self.peek()[0] != "end":
+            raise QueryError(f"unexpected {self.peek()[1]!r}")
+        q.validate()
+        return q
+
+    def projections(self) -> List[Tuple[str, Optional[List[str]], str]]:
+        if self.op("*"):
+            self.i += 1
+            return [("*", None, "*")]
+        if self.kw("COUNT") and self.peek(1) == ("op", "("):
+            self.i += 1
+            self.expect_op("(")
+            self.expect_op(")")
+            return [("COUNT", None, "COUNT")]
+        out = []
+        while True:
+            alias = self.name()
+            path = []
+            while self.op("."):
+                self.i += 1
+                path.append(self.name())
+            label = path[-1] if path else alias
+            if self.kw("AS"):
+                self.i += 1
+                label = self.name()
+            out.append((alias, path or None, label))
+            if not self.op(","):
+                return out
+            self.i += 1
+
+    def pattern(self) -> Tuple[List[str], List[Tuple[str, Optional[Tuple[str, ...]]]]]:
+        nodes, hops = [self.node()], []
+        while self.op("-", "<-"):
+            left = self.take()
+            self.expect_op("[")
+            if self.peek()[0] == "name" and self.peek(1) == ("op", ":"):
+                self.i += 1  # relationship variable: not projectable here
+            rels = None
+            if self.op(":"):
+                self.i += 1
+                rels = [self.name()]
+                while self.op("|"):
+                    self.i += 1
+                    rels.append(self.name())
+            self.expect_op("]")
+            right = self.take()
+            if left == "-" and right == "->":
+                direction = "out"
+            elif left == "<-" and right == "-":
+                direction = "in"
+            elif left == "-" and right == "-":
+                direction = "both"
+            else:
+                raise QueryError("malformed relationship hop")
+            hops.append((direction, tuple(rels) if rels else None))
+            nodes.append(self.node())
+        return nodes, hops
+
+    def node(self) -> str:
+        self.expect_op("(")
+        alias = self.name()
+        self.expect_op(")")
+        return alias
+
+    # expressions: tuples ("or", a, b) / ("and", a, b) / ("not", a) /
+    # ("cmp", op, a, b) / ("in", a, [vals]) / ("fn", NAME, args) /
+    # ("ref", alias, path) / ("lit", value)
+    def expr(self):
+        left = self.and_()
+        while self.kw("OR"):
+            self.i += 1
+            left = ("or", left, self.and_())
+        return left
+
+    def and_(self):
+        left = self.not_()
+        while self.kw("AND"):
+            self.i += 1
+            left = ("and", left, self.not_())
+        return left
+
+    def not_(self):
+        if self.kw("NOT"):
+            self.i += 1
+            return ("not", self.not_())
+        return self.cmp()
+
+    def cmp(self):
+        left = self.operand()
+        if self.op("=", "!=", "<>", "<", "<=", ">", ">="):
+            op = self.take()
+            return ("cmp", "!=" if op == "<>" else op, left, self.operand())
+        negate = False
+        if self.kw("NOT") and self.peek(1)[0] == "name" and self.peek(1)[1].upper() == "IN":
+            self.i += 1
+            negate = True
+        if self.kw("IN", "NIN"):
+            negate ^= self.take().upper() == "NIN"
+            vals = self.operand()
+            if vals[0] != "lit" or not isinstance(vals[1], list):
+                raise QueryError("IN expects a literal list")
+            node = ("in", left, vals[1])
+            return ("not", node) if negate else node
+        return left
+
+    def operand(self):
+        kind, val = self.peek()
+        if kind in ("str", "num"):
+            self.i += 1
+            return ("lit", val)
+        if self.op("-") and self.peek(1)[0] == "num":
+            self.i += 1
+            return ("lit", -self.take())
+        if self.op("("):
+            self.i += 1
+            e = self.expr()
+            self.expect_op(")")
+            return e
+        if self.op("["):
+            self.i += 1
+            vals = []
+            while not self.op("]"):
+                v = self.operand()
+                if v[0] != "lit":
+                    raise QueryError("list items must be literals")
+                vals.append(v[1])
+                if self.op(","):
+                    self.i += 1
+            self.i += 1
+            return ("lit", vals)
+        if kind == "name":
+            up = val.upper()
+            if up in ("TRUE", "FALSE", "NULL"):
+                self.i += 1
+                return ("lit", {"TRUE": True, "FALSE": False, "NULL": None}[up])
+            if self.peek(1) == ("op", "("):
+                self.i += 2
+                args = []
+                while not self.op(")"):
+                    args.append(self.expr())
+                    if self.op(","):
+                        self.i += 1
+                self.i += 1
+                if up not in _FUNCS:
+                    raise QueryError(f"unsupported function {val}")
+                lo, hi = _FUNCS[up]
+                if not lo <= len(args) <= hi:
+                    want = str(lo) if lo == hi else f"{lo}-{hi}"
+                    raise QueryError(f"{val}() takes {want} argument(s), got {len(args)}")
+                return ("fn", up, args)
+            self.i += 1
+            path = []
+            while self.op("."):
+                self.i += 1
+                path.append(self.name())
+            return ("ref", val, path)
+        raise QueryError(f"unexpected {val!r}")
+
+
+class Query:
+    def __init__(self):
+        self.projections: List[Tuple[str, Optional[List[str]], str]] = []
+        self.nodes: List[str] = []
+        self.hops: List[Tuple[str, Optional[Tuple[str, ...]]]] = []
+        self.where = None
+        self.limit: Optional[int] = None
+
+    def validate(self) -> None:
+        if len(set(self.nodes)) != len(self.nodes):
+            raise QueryError("each alias may appear once in a pattern")
+        for alias, _, _ in self.projections:
+            if alias not in ("*", "COUNT") and alias not in self.nodes:
+                raise QueryError(f"unknown alias {alias}")
+        labels = [label for _, _, label in self.projections]
+        if len(set(labels)) != len(labels):
+            raise QueryError("duplicate projection name (use AS)")
+        for a in _aliases(self.where):
+            if a not in self.nodes:
+                raise QueryError(f"unknown alias {a}")
+
+
+@lru_cache(maxsize=1024)
+def parse(text: str) -> Query:
+    return _Parser(text).query()
+
+
+# --- expression evaluation -----------------------------------------------------
+
+_TYPE_CHECKS = {
+    "IS_BOOL": lambda v: isinstance(v, bool),
+    "IS_NUMBER": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "IS_STRING": lambda v: isinstance(v, str),
+    "IS_PRIMITIVE": lambda v: isinstance(v, (bool, int, float, str)),
+    "IS_OBJECT": lambda v: isinstance(v, dict),
+    "IS_NULL": lambda v: v is None,
+}
+_FUNCS = {  # name -> (min, max) arguments
+    **dict.fromkeys(_TYPE_CHECKS, (1, 1)),
+    "IS_DEFINED": (1, 1),
+    "IS_OF_MODEL": (2, 3),  # (alias, model[, exact])
+    "STARTSWITH": (2, 2), "ENDSWITH": (2, 2), "CONTAINS": (2, 2),
+}
+_MISSING = object()
+_CMP = {
+    "=": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+
+
+def _aliases(e) -> set:
+    if e is None or e[0] == "lit":
+        return set()
+    if e[0] == "ref":
+        return {e[1]}
+    if e[0] == "fn":
+        out = set()
+        for a in e[2]:
+            out |= _aliases(a)
+        return out
+    if e[0] == "cmp":
+        return _aliases(e[2]) | _aliases(e[3])
+    if e[0] == "in":
+        return _aliases(e[1])
+    return set().union(*(_aliases(x) for x in e[1:]))
+
+
+def _conjuncts(e) -> List[Any]:
+    if e is None:
+        return []
+    if e[0] == "and":
+        return _conjuncts(e[1]) + _conjuncts(e[2])
+    return [e]
+
+
+def _model_of(twin: Dict[str, Any]) -> Optional[str]:
+    meta = twin.get("$metadata")
+    return meta.get("$model") if isinstance(meta, dict) else None
+
+
+def _compile(e) -> Callable[[Dict[str, Dict[str, Any]]], Any]:
+    """Closure over env {alias: twin}; missing properties evaluate to _MISSING."""
+    tag = e[0]
+    if tag == "lit":
+        v = e[1]
+        return lambda env: v
+    if tag == "ref":
+        alias, path = e[1], e[2]
+        if not path:
+            return lambda env: env.get(alias, _MISSING)
+        if len(path) == 1:
+            key = path[0]
+            return lambda env: env[alias].get(key, _MISSING)
+
+        def get(env):
+            cur = env[alias]
+            for p in path:
+                if not isinstance(cur, dict) or p not in cur:
+                    return _MISSING
+                cur = cur[p]
+            return cur
+        return get
+    if tag in ("and", "or"):
+        a, b = _compile(e[1]), _compile(e[2])
+        if tag == "and":
+            return lambda env: a(env) is True and b(env) is True
+        return lambda env: a(env) is True or b(env) is True
+    if tag == "not":
+        a = _compile(e[1])
+        return lambda env: a(env) is not True
+    if tag == "cmp":
+        f, a, b = _CMP[e[1]], _compile(e[2]), _compile(e[3])
+
+        def cmp(env):
+            x, y = a(env), b(env)
+            if x is _MISSING or y is _MISSING:
+                return False
+            try:
+                return f(x, y)
+            except TypeError:
+                return False
+        return cmp
+    if tag == "in":
+        a, vals = _compile(e[1]), e[2]
+        try:
+            hashed = frozenset(vals)
+            return lambda env: a(env) in hashed
+        except TypeError:
+            return lambda env: a(env) in vals
+    if tag == "fn":
+        name, args = e[1], e[2]
+        if name == "IS_OF_MODEL":
+            if len(args) < 2 or args[0][0] != "ref" or args[1][0] != "lit":
+                raise QueryError("IS_OF_MODEL(alias, 'dtmi:...') expected")
+            tw, model = _compile(args[0]), args[1][1]
+            return lambda env: _model_of(tw(env)) == model
+        a = _compile(args[0])
+        if name == "IS_DEFINED":
+            return lambda env: a(env) is not _MISSING
+        if name in _TYPE_CHECKS:
+            check = _TYPE_CHECKS[name]
+            return lambda env: (v := a(env)) is not _MISSING and check(v)
+        s = _compile(args[1])
+        method = {"STARTSWITH": str.startswith, "ENDSWITH": str.endswith, "CONTAINS": str.__contains__}[name]
+        return lambda env: isinstance(v := a(env), str) and isinstance(t := s(env), str) and method(v, t)
+    raise QueryError(f"cannot evaluate {tag}")
+
+
+# --- graph ---------------------------------------------------------------------
+
+def _chunked(arr: np.ndarray, size: int = 1024) -> Iterator[int]:
+    # Convert lazily: TOP / LIMIT usually stops long before the end
+    for k in range(0, len(arr), size):
+        yield from arr[k:k + size].tolist()
+
+
+class _CSR:
+    __slots__ = ("offsets", "targets")
+
+    def __init__(self, n: int, src: np.ndarray, dst: np.ndarray):
+        order = np.argsort(src, kind="stable")
+        self.targets = dst[order].astype(np.int32)
+        self.offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=self.offsets[1:])
+
+    def neighbors(self, i: int) -> np.ndarray:
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+
+class TwinGraph:
+    """
+        g = TwinGraph.from_snapshot(json.load(open("twin_snapshot.json")))
+        g.query("MATCH (w)-[:ROUTE]->(r) WHERE w.warehouseId = 'W3' RETURN w, r LIMIT 5")
+    """
+
+    def __init__(self, index_props: Iterable[str] = DEFAULT_INDEX_PROPS):
+        self.index_props = tuple(index_props)
+        self.twins: List[Dict[str, Any]] = []
+        self._pos: Dict[str, int] = {}
+        self._rels: List[Tuple[str, str, str]] = []
+        self._out: Dict[str, _CSR] = {}
+        self._in: Dict[str, _CSR] = {}
+        self._indexes: Dict[str, Dict[Any, np.ndarray]] = {}
+        self._models: Dict[Optional[str], np.ndarray] = {}
+        self._built = False
+
+    # --- loading -------------------------------------------------------------
+
+    def add_twin(self, twin: Dict[str, Any]) -> None:
+        tid = twin["$dtId"]
+        if tid in self._pos:
+            self.twins[self._pos[tid]] = twin
+        else:
+            self._pos[tid] = len(self.twins)
+            self.twins.append(twin)
+        self._built = False
+
+    def add_relationship(self, source: str, target: str, name: str) -> None:
+        self._rels.append((source, target, name))
+        self._built = False
+
+    @classmethod
+    def from_twins(cls, twins: Iterable[Dict[str, Any]], relationships: Iterable[Dict[str, Any]] = (),
+                   index_props: Iterable[str] = DEFAULT_INDEX_PROPS) -> "TwinGraph":
+        """ADT-shaped twins and relationships ({$sourceId, $targetId, $relationshipName})."""
+        g = cls(index_props)
+        for t in twins:
+            g.add_twin(t)
+        for r in relationships:
+            g.add_relationship(r["$sourceId"], r["$targetId"], r["$relationshipName"])
+        return g.build()
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any], index_props: Iterable[str] = DEFAULT_INDEX_PROPS) -> "TwinGraph":
+        """
+        twin_snapshot.json shape. Warehouses and routes become twins of
+        WAREHOUSE_MODEL / ROUTE_MODEL with warehouseId / routeId set. Edges come
+        from an optional "relationships" list ({source, target, name}) and
+        from a route's "warehouse_id" / "warehouses" (warehouse -ROUTE-> route).
+        """
+        g = cls(index_props)
+        for wid, w in (snapshot.get("warehouses") or {}).items():
+            g.add_twin(dict(w, **{"$dtId": wid, "$metadata": {"$model": WAREHOUSE_MODEL}, "warehouseId": wid}))
+        for rid, r in (snapshot.get("routes") or {}).items():
+            g.add_twin(dict(r, **{"$dtId": rid, "$metadata": {"$model": ROUTE_MODEL}, "routeId": rid}))
+            linked = r.get("warehouses") or ([r["warehouse_id"]] if r.get("warehouse_id") else [])
+            for wid in linked:
+                g.add_relationship(wid, rid, ROUTE_REL)
+        for rel in snapshot.get("relationships") or []:
+            g.add_relationship(rel["source"], rel["target"], rel.get("name", ROUTE_REL))
+        return g.build()
+
+    def build(self) -> "TwinGraph":
+        n = len(self.twins)
+        by_name: Dict[str, Tuple[List[int], List[int]]] = {}
+        for s, t, name in self._rels:
+            if s not in self._pos or t not in self._pos:
+                continue  # dangling edge (ADT would reject it)
+            src, dst = by_name.setdefault(name, ([], []))
+            src.append(self._pos[s])
+            dst.append(self._pos[t])
+        self._out, self._in = {}, {}
+        all_src, all_dst = [], []
+        for name, (src, dst) in by_name.items():
+            s, d = np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64)
+            self._out[name], self._in[name] = _CSR(n, s, d), _CSR(n, d, s)
+            all_src.append(s)
+            all_dst.append(d)
+        s = np.concatenate(all_src) if all_src else np.zeros(0, dtype=np.int64)
+        d = np.concatenate(all_dst) if all_dst else np.zeros(0, dtype=np.int64)
+        self._out["*"], self._in["*"] = _CSR(n, s, d), _CSR(n, d, s)
+        self._indexes = {}
+        self._models = self._group(_model_of(t) for t in self.twins)
+        for p in self.index_props:
+            self.index(p)
+        self._built = True
+        return self
+
+    @staticmethod
+    def _group(values: Iterable[Any]) -> Dict[Any, np.ndarray]:
+        groups: Dict[Any, List[int]] = {}
+        for i, v in enumerate(values):
+            if v is _MISSING:
+                continue
+            try:
+                groups.setdefault(v, []).append(i)
+            except TypeError:  # unhashable (object/list property): not indexable
+                continue
+        return {v: np.asarray(ix, dtype=np.int32) for v, ix in groups.items()}
+
+    def index(self, prop: str) -> Dict[Any, np.ndarray]:
+        """{value: twin positions} for a top-level property (built on first use)."""
+        idx = self._indexes.get(prop)
+        if idx is None:
+            idx = self._indexes[prop] = self._group(t.get(prop, _MISSING) for t in self.twins)
+        return idx
+
+    def __len__(self) -> int:
+        return len(self.twins)
+
+    def relationships(self) -> List[Dict[str, Any]]:
+        """ADT-shaped relationships, ids numbered per source twin."""
+        out, seq = [], {}
+        for src, tgt, name in self._rels:
+            seq[src] = seq.get(src, 0) + 1
+            out.append({"$relationshipId": f"{name}-{seq[src]}", "$sourceId": src, "$targetId": tgt,
+                        "$relationshipName": name})
+        return out
+
+    def get(self, twin_id: str) -> Optional[Dict[str, Any]]:
+        i = self._pos.get(twin_id)
+        return None if i is None else self.twins[i]
+
+    # --- planning ------------------------------------------------------------
+
+    def _lookup(self, c, alias: str) -> Optional[np.ndarray]:
+        """Index-backed candidate positions for one conjunct, or None."""
+        tag = c[0]
+        if tag == "cmp" and c[1] == "=":
+            ref, lit = (c[2], c[3]) if c[2][0] == "ref" else (c[3], c[2])
+            if ref[0] == "ref" and lit[0] == "lit" and ref[1] == alias and len(ref[2]) == 1:
+                return self._values(ref[2][0], [lit[1]])
+        if tag == "in" and c[1][0] == "ref" and c[1][1] == alias and len(c[1][2]) == 1:
+            return self._values(c[1][2][0], c[2])
+        if tag == "fn" and c[1] == "IS_OF_MODEL" and len(c[2]) >= 2 and c[2][0] == ("ref", alias, []):
+            return self._models.get(c[2][1][1], np.zeros(0, dtype=np.int32))
+        return None
+
+    def _values(self, prop: str, values: Sequence[Any]) -> Optional[np.ndarray]:
+        try:
+            keys = set(values)
+        except TypeError:
+            return None  # unhashable literal: leave it to the filter
+        if prop == "$dtId":
+            return np.asarray(sorted(self._pos[v] for v in keys if isinstance(v, str) and v in self._pos),
+                              dtype=np.int32)
+        idx = self.index(prop)
+        hits = [idx[v] for v in keys if v in idx]
+        return np.unique(np.concatenate(hits)) if hits else np.zeros(0, dtype=np.int32)
+
+    def _plan(self, q: Query):
+        """
+        Per-alias index candidates and filters, plus residual multi-alias
+        predicates. Index-resolved conjuncts are exact and are not re-checked.
+        """
+        per_alias: Dict[str, List[Callable]] = {a: [] for a in q.nodes}
+        candidates: Dict[str, Optional[np.ndarray]] = {a: None for a in q.nodes}
+        residual = []
+        for c in _conjuncts(q.where):
+            aliases = _aliases(c)
+            if len(aliases) != 1:
+                residual.append(_compile(c))
+                continue
+            (alias,) = aliases
+            hit = self._lookup(c, alias)
+            if hit is None:
+                per_alias[alias].append(_compile(c))
+            else:
+                cur = candidates[alias]
+                candidates[alias] = hit if cur is None else np.intersect1d(cur, hit)
+        return candidates, per_alias, residual
+
+    # --- execution -----------------------------------------------------------
+
+    def _neighbors(self, i: int, direction: str, rels: Optional[Tuple[str, ...]]) -> Iterator[int]:
+        names = rels or ("*",)
+        for name in names:
+            if direction in ("out", "both") and name in self._out:
+                yield from self._out[name].neighbors(i).tolist()
+            if direction in ("in", "both") and name in self._in:
+                yield from self._in[name].neighbors(i).tolist()
+
+    def match(self, q: Query) -> Iterator[Dict[str, Dict[str, Any]]]:
+        """Yield bindings {alias: twin} satisfying the pattern and WHERE."""
+        if not self._built:
+            self.build()
+        candidates, filters, residual = self._plan(q)
+        nodes, hops, twins = q.nodes, q.hops, self.twins
+        n = len(twins)
+
+        # Start from the alias with the fewest index candidates
+        sizes = [len(candidates[a]) if candidates[a] is not None else n for a in nodes]
+        start = int(np.argmin(sizes))
+        masks = {}
+        for a in nodes:
+            if candidates[a] is not None and nodes[start] != a:
+                m = np.zeros(n, dtype=bool)
+                m[candidates[a]] = True
+                masks[a] = m
+        # Expansion order: start, then right of start, then left
+        order = [(k, k - 1, hops[k - 1][0], hops[k - 1][1]) for k in range(start + 1, len(nodes))]
+        flip = {"out": "in", "in": "out", "both": "both"}
+        order += [(k, k + 1, flip[hops[k][0]], hops[k][1]) for k in range(start - 1, -1, -1)]
+        env: Dict[str, Dict[str, Any]] = {}
+        bound: Dict[int, int] = {}
+
+        def ok(alias: str, twin: Dict[str, Any]) -> bool:
+            env[alias] = twin
+            return all(f(env) is True for f in filters[alias])
+
+        def expand(step: int) -> Iterator[Dict[str, Dict[str, Any]]]:
+            if step == len(order):
+                if all(f(env) is True for f in residual):
+                    yield dict(env)
+                return
+            k, frm, direction, rels = order[step]
+            alias, mask = nodes[k], masks.get(nodes[k])
+            seen = set()
+            for j in self._neighbors(bound[frm], direction, rels):
+                if j in seen or (mask is not None and not mask[j]) or j in bound.values():
+                    continue
+                seen.add(j)
+                if ok(alias, twins[j]):
+                    bound[k] = j
+                    yield from expand(step + 1)
+                    del bound[k]
+            env.pop(alias, None)
+
+        first = candidates[nodes[start]]
+        for i in (_chunked(first) if first is not None else range(n)):
+            if ok(nodes[start], twins[i]):
+                bound[start] = i
+                yield from expand(0)
+                del bound[start]
+
+    def query(self, text: str) -> List[Any]:
+        q = parse(text)
+        projections = q.projections
+        if projections[0][0] == "COUNT":
+            return [{"COUNT": sum(1 for _ in self.match(q))}]
+        out = []
+        for env in self.match(q):
+            if q.limit is not None and len(out) >= q.limit:
+                break
+            if projections[0][0] == "*":
+                out.append(env[q.nodes[0]] if len(q.nodes) == 1 else env)
+            elif len(projections) == 1 and projections[0][1] is None:
+                out.append(env[projections[0][0]])
+            else:
+                row = {}
+                for alias, path, label in projections:
+                    cur: Any = env[alias]
+                    for p in path or []:
+                        cur = cur.get(p, _MISSING) if isinstance(cur, dict) else _MISSING
+                    if cur is not _MISSING:
+                        row[label] = cur
+                out.append(row)
+        return out
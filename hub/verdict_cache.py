@@ -0,0 +1,187 @@
+# hub/verdict_cache.py
+"""
+Two-tier verdict cache: in-memory LRU in front of a persistent SQLite store.
+
+Entries are keyed by (scope, policy hash, canonical plan digest). The policy
+hash is the canonical hash of the policy document, so editing the policy
+changes the key and stale verdicts are simply never looked up again. The
+plan digest covers only the fields a verifier reads, so volatile fields
+(timestamps, ids) don't defeat the cache. Scopes carry a version
+("verify_plan/v2"), bumped by the caller whenever its verdict logic or
+result shape changes, so verdicts from an older verifier are never served.
+
+The disk tier is bounded: rows older than `max_age_s` are never served and,
+with the oldest rows past `max_rows`, are deleted every PRUNE_EVERY puts.
+default_cache() stores at $VERDICT_CACHE_PATH (empty: memory only), else
+CACHE_PATH.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional
+
+CACHE_PATH = "artifacts/verdict_cache.sqlite"
+CACHE_PATH_ENV = "VERDICT_CACHE_PATH"
+MAX_ROWS = 100_000
+MAX_AGE_S = 7 * 86400.0
+PRUNE_EVERY = 256  # puts between disk-tier prunes
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS verdicts (
+    scope       TEXT NOT NULL,
+    policy_hash TEXT NOT NULL,
+    plan_digest TEXT NOT NULL,
+    verdict     TEXT NOT NULL,
+    created_at  REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (scope, policy_hash, plan_digest)
+);
+"""
+
+
+def canonical_digest(obj: Any) -> str:
+    """
+    SHA256 over sorted-key, whitespace-free JSON (same canonical form as hub.policy_hash).
+    """
+    data = json.dumps(obj, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def plan_digest(plan: Dict[str, Any], fields: Iterable[str]) -> str:
+    return canonical_digest({f: plan.get(f) for f in fields})
+
+
+class VerdictCache:
+    def __init__(self, path: Optional[str] = CACHE_PATH, capacity: int = 4096,
+                 max_rows: int = MAX_ROWS, max_age_s: float = MAX_AGE_S):
+        self.path = path
+        self.capacity = capacity
+        self.max_rows = max_rows
+        self.max_age_s = max_age_s
+        self._puts = 0
+        self._lru: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _conn(self) -> Optional[sqlite3.Connection]:
+        if not self.path:
+            return None
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            if "created_at" not in {r[1] for r in conn.execute("PRAGMA table_info(verdicts)")}:
+                # Stores from before the disk bound: their rows count as oldest
+                conn.execute("ALTER TABLE verdicts ADD COLUMN created_at REAL NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS verdicts_created ON verdicts(created_at)")
+            self._local.conn = conn
+        return conn
+
+    def _remember(self, key: tuple, raw: str):
+        with self._lock:
+            self._lru[key] = raw
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.capacity:
+                self._lru.popitem(last=False)
+
+    def get(self, scope: str, policy_hash: str, digest: str) -> Optional[Any]:
+        key = (scope, policy_hash, digest)
+        with self._lock:
+            raw = self._lru.get(key)
+            if raw is not None:
+                self._lru.move_to_end(key)
+                self.memory_hits += 1
+                return json.loads(raw)
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT verdict FROM verdicts WHERE scope = ? AND policy_hash = ? AND plan_digest = ? AND created_at >= ?",
+            key + (time.time() - self.max_age_s,),
+        ).fetchone() if conn else None
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        self._remember(key, row[0])
+        with self._lock:
+            self.disk_hits += 1
+        return json.loads(row[0])
+
+    def put(self, scope: str, policy_hash: str, digest: str, verdict: Any) -> None:
+        key = (scope, policy_hash, digest)
+        raw = json.dumps(verdict, sort_keys=True)
+        self._remember(key, raw)
+        conn = self._conn()
+        if conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO verdicts(scope, policy_hash, plan_digest, verdict, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                key + (raw, time.time()),
+            )
+            with self._lock:
+                self._puts += 1
+                due = self._puts % PRUNE_EVERY == 0
+            if due:
+                self.prune()
+
+    def prune(self) -> int:
+        """
+        Delete disk rows older than max_age_s, then the oldest rows beyond
+        max_rows. Returns the number of rows deleted.
+        """
+        conn = self._conn()
+        if not conn:
+            return 0
+        deleted = conn.execute("DELETE FROM verdicts WHERE created_at < ?", (time.time() - self.max_age_s,)).rowcount
+        over = conn.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0] - self.max_rows
+        if over > 0:
+            deleted += conn.execute(
+                "DELETE FROM verdicts WHERE rowid IN (SELECT rowid FROM verdicts ORDER BY created_at LIMIT ?)", (over,)
+            ).rowcount
+        return deleted
+
+    def get_or_compute(self, scope: str, policy_hash: str, digest: str, compute: Callable[[], Any]) -> Any:
+        """
+        Cached verdict, or compute(), store and return it. Hits come back as
+        fresh JSON copies (tuples become lists), so callers may mutate them.
+        """
+        hit = self.get(scope, policy_hash, digest)
+        if hit is not None:
+            return hit
+        verdict = compute()
+        self.put(scope, policy_hash, digest, verdict)
+        return verdict
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "hits": self.memory_hits + self.disk_hits,
+                "misses": self.misses,
+                "memory_entries": len(self._lru),
+            }
+
+
+_caches: Dict[str, VerdictCache] = {}
+
+
+def default_cache() -> VerdictCache:
+    """
+    Process-wide cache at $VERDICT_CACHE_PATH or CACHE_PATH (resolved against
+    the working directory). An empty $VERDICT_CACHE_PATH keeps it in memory.
+    """
+    path = os.environ.get(CACHE_PATH_ENV, CACHE_PATH)
+    key = os.path.abspath(path) if path else ""
+    c = _caches.get(key)
+    if c is None:
+        c = _caches.setdefault(key, VerdictCache(key or None))
+    return c
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Azure Digital Twins data-plane REST API, for offline
+tests and throughput benchmarks of hub.adt_client.
+
+Implements the subset the repo uses:
+  GET    /digitaltwins/{id}
+  PUT    /digitaltwins/{id}            (create or replace)
+  PATCH  /digitaltwins/{id}            (JSON patch: add / replace / remove)
+  DELETE /digitaltwins/{id}
+  GET    /digitaltwins/{id}/relationships
+  GET / PUT / DELETE /digitaltwins/{id}/relationships/{relId}
+  POST   /query                        ({"query"} or {"continuationToken"})
+
+Queries run on hub.twin_graph (its SELECT / MATCH subset) over the current
+twins and relationships, paged by `page_size`, with a query-charge header of
+1 + 0.1 per returned item. Unlike ADT, "replace" on a missing property adds
+it, and PATCH on an unknown twin creates it when autocreate is on.
+
+  PYTHONPATH=. ops/sim/adt_standin.py --port 8765 [--snapshot twin_snapshot.json]
+                                       [--latency-ms 5] [--max-rps 100]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from hub.adt_client import TokenBucket
+from hub.twin_graph import QueryError, TwinGraph
+
+
+class PatchError(ValueError):
+    pass
+
+
+def apply_patch(doc: Dict[str, Any], ops: List[Dict[str, Any]]) -> None:
+    """Apply JSON-patch ops in place (object paths only)."""
+    for op in ops:
+        kind, path = op.get("op"), op.get("path", "")
+        parts = [p.replace("~1", "/").replace("~0", "~") for p in path.split("/")[1:]]
+        if not parts or kind not in ("add", "replace", "remove"):
+            raise PatchError(f"unsupported patch op: {op!r}")
+        parent = doc
+        for p in parts[:-1]:
+            parent = parent.setdefault(p, {})
+            if not isinstance(parent, dict):
+                raise PatchError(f"path is not an object: {path}")
+        if kind == "remove":
+            if parts[-1] not in parent:
+                raise PatchError(f"no such property: {path}")
+            del parent[parts[-1]]
+        else:
+            parent[parts[-1]] = op.get("value")
+
+
+class ADTStandIn:
+    """
+        with ADTStandIn(latency_ms=2) as adt:
+            client = TwinUpdateClient(adt.url)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0,
+                 autocreate: bool = True, max_rps: Optional[float] = None, page_size: int = 100):
+        self.latency = latency_ms / 1000.0
+        self.autocreate = autocreate
+        self.page_size = page_size
+        self.limiter = TokenBucket(max_rps) if max_rps else None
+        self.twins: Dict[str, Dict[str, Any]] = {}
+        self.relationships: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._graph: Optional[TwinGraph] = None
+        self._graph_key = None
+        self._version = 0
+        self.stats = {"requests": 0, "patches": 0, "queries": 0, "throttled": 0, "connections": 0}
+        self.lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    def graph(self) -> TwinGraph:
+        """
+        Query graph over the current twins, ordered by id (caller holds
+        self.lock). Rebuilt after writes through the API or a change in the
+        twin/relationship count; call invalidate() after editing twin dicts
+        in place.
+        """
+        key = (self._version, len(self.twins), len(self.relationships))
+        if self._graph is None or self._graph_key != key:
+            rels = [dict(r, **{"$sourceId": src}) for (src, _), r in self.relationships.items()]
+            self._graph = TwinGraph.from_twins((self.twins[t] for t in sorted(self.twins)), rels)
+            self._graph_key = key
+        return self._graph
+
+    def load_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        """Seed twins and relationships from a twin_snapshot.json document."""
+        g = TwinGraph.from_snapshot(snapshot)
+        with self.lock:
+            for t in g.twins:
+                self.twins[t["$dtId"]] = t
+            for r in g.relationships():
+                self.relationships[(r["$sourceId"], r["$relationshipId"])] = \
+                    {k: v for k, v in r.items() if k != "$sourceId"}
+            self.invalidate()
+
+    def invalidate(self) -> None:
+        """Mark the twins as changed (caller holds self.lock when serving)."""
+        self._version += 1
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, so client pooling is measurable
+
+            def setup(self):
+                super().setup()
+                with standin.lock:
+                    standin.stats["connections"] += 1
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status: int, body: Any = None, headers: Optional[Dict[str, str]] = None):
+                data = b"" if body is None else json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _body(self) -> Any:
+                n = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(n) or b"null") if n else None
+
+            def _route(self) -> Tuple[Optional[str], Optional[str], bool]:
+                """(twin id, relationship id, is relationships collection)."""
+                parts = urlsplit(self.path).path.split("/")[1:]
+                if len(parts) < 2 or parts[0] != "digitaltwins" or not parts[1]:
+                    return None, None, False
+                tid = unquote(parts[1])
+                if len(parts) == 2:
+                    return tid, None, False
+                if parts[2] != "relationships" or len(parts) > 4:
+                    return None, None, False
+                return tid, (unquote(parts[3]) if len(parts) == 4 else None), len(parts) == 3
+
+            def _twin_id(self) -> Optional[str]:
+                tid, rel, coll = self._route()
+                return tid if rel is None and not coll else None
+
+            def _admit(self) -> bool:
+                try:
+                    body = self._body()
+                except ValueError:
+                    self._reply(400, {"error": {"code": "BadRequest", "message": "invalid JSON"}})
+                    return False
+                self._parsed = body
+                with standin.lock:
+                    standin.stats["requests"] += 1
+                if standin.limiter and not standin.limiter.try_acquire():
+                    with standin.lock:
+                        standin.stats["throttled"] += 1
+                    wait = standin.limiter.wait_time()
+                    self._reply(429, {"error": {"code": "TooManyRequests"}}, {"Retry-After": f"{wait:.3f}"})
+                    return False
+                if standin.latency:
+                    time.sleep(standin.latency)
+                return True
+
+            def do_GET(self):
+                if not self._admit():
+                    return
+                tid, rel, coll = self._route()
+                with standin.lock:
+                    if coll:
+                        body = {"value": [dict(r, **{"$sourceId": src}) for (src, _), r
+                                          in standin.relationships.items() if src == tid], "nextLink": None}
+                    elif rel is not None:
+                        r = standin.relationships.get((tid, rel))
+                        body = None if r is None else dict(r, **{"$sourceId": tid})
+                    else:
+                        twin = standin.twins.get(tid) if tid else None
+                        body = json.loads(json.dumps(twin)) if twin is not None else None
+                if body is None:
+                    code = "RelationshipNotFound" if rel is not None else "DigitalTwinNotFound"
+                    return self._reply(404, {"error": {"code": code}})
+                self._reply(200, body)
+
+            def do_PUT(self):
+                if not self._admit():
+                    return
+                tid, rel, coll = self._route()
+                if tid is None or coll or not isinstance(self._parsed, dict):
+                    return self._reply(400, {"error": {"code": "BadRequest"}})
+                with standin.lock:
+                    if rel is None:
+                        body = standin.twins[tid] = dict(self._parsed, **{"$dtId": tid})
+                    else:
+                        target = self._parsed.get("$targetId")
+                        if tid not in standin.twins or target not in standin.twins:
+                            return self._reply(404, {"error": {"code": "DigitalTwinNotFound"}})
+                        if not self._parsed.get("$relationshipName"):
+                            return self._reply(400, {"error": {"code": "BadRequest"}})
+                        body = dict(self._parsed, **{"$relationshipId": rel})
+                        standin.relationships[(tid, rel)] = body
+                        body = dict(body, **{"$sourceId": tid})
+                    standin.invalidate()
+                self._reply(200, body)
+
+            def do_PATCH(self):
+                if not self._admit():
+                    return
+                tid = self._twin_id()
+                if tid is None or not isinstance(self._parsed, list):
+                    return self._reply(400, {"error": {"code": "BadRequest"}})
+                with standin.lock:
+                    twin = standin.twins.get(tid)
+                    if twin is None:
+                        if not standin.autocreate:
+                            return self._reply(404, {"error": {"code": "DigitalTwinNotFound"}})
+                        twin = {"$dtId": tid}
+                    updated = json.loads(json.dumps(twin))
+                    try:
+                        apply_patch(updated, self._parsed)
+                    except PatchError as e:
+                        return self._reply(400, {"error": {"code": "JsonPatchInvalid", "message": str(e)}})
+                    standin.twins[tid] = updated
+                    standin.stats["patches"] += 1
+                    standin.invalidate()
+                self._reply(204)
+
+            def do_DELETE(self):
+                if not self._admit():
+                    return
+                tid, rel, coll = self._route()
+                with standin.lock:
+                    if coll:
+                        found = False
+                    elif rel is not None:
+                        found = standin.relationships.pop((tid, rel), None) is not None
+                    else:
+                        found = standin.twins.pop(tid, None) is not None
+                        for key in [k for k, r in standin.relationships.items()
+                                    if tid in (k[0], r.get("$targetId"))]:
+                            del standin.relationships[key]
+                    if found:
+                        standin.invalidate()
+                self._reply(204 if found else 404)
+
+            def do_POST(self):
+                if not self._admit():
+                    return
+                if urlsplit(self.path).path != "/query" or not isinstance(self._parsed, dict):
+                    return self._reply(404, {"error": {"code": "NotFound"}})
+                body = self._parsed
+                query, start = body.get("query"), 0
+                if "continuationToken" in body:
+                    try:
+                        state = json.loads(body["continuationToken"])
+                        query, start = state["query"], int(state["offset"])
+                    except (TypeError, ValueError, KeyError):
+                        return self._reply(400, {"error": {"code": "BadRequest", "message": "bad token"}})
+                if not isinstance(query, str):
+                    return self._reply(400, {"error": {"code": "BadRequest", "message": "query required"}})
+                with standin.lock:
+                    try:
+                        rows = standin.graph().query(query)
+                    except QueryError as e:
+                        return self._reply(400, {"error": {"code": "QueryParsingError", "message": str(e)}})
+                    page = json.loads(json.dumps(rows[start:start + standin.page_size]))
+                    standin.stats["queries"] += 1
+                nxt = start + len(page)
+                token = json.dumps({"query": query, "offset": nxt}) if nxt < len(rows) else None
+                self._reply(200, {"value": page, "continuationToken": token},
+                            {"query-charge": f"{1 + 0.1 * len(page):.1f}"})
+
+        return Handler
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self._server.serve_forever, name="adt-standin", daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local ADT REST stand-in")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="per-request service time")
+    ap.add_argument("--max-rps", type=float, default=None, help="answer 429 above this rate")
+    ap.add_argument("--no-autocreate", action="store_true", help="404 on PATCH of unknown twins")
+    ap.add_argument("--snapshot", help="seed twins from a twin_snapshot.json")
+    args = ap.parse_args()
+    adt = ADTStandIn(args.host, args.port, args.latency_ms, not args.no_autocreate, args.max_rps)
+    if args.snapshot:
+        with open(args.snapshot) as f:
+            adt.load_snapshot(json.load(f))
+    print(f"ADT stand-in listening on {adt.url} (export ADT_INSTANCE_URL={adt.url})")
+    try:
+        adt._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
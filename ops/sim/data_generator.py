@@ -1,37 +1,78 @@
-import csv, os, random, hashlib
-from datetime import datetime, timezone, timedelta
-
-# Output file path
-OUT = os.path.join("data", "signals.csv")
-# Fixed seed for deterministic reproducible outputs
-SEED = int(hashlib.sha256(b"ACM-day5-seed").hexdigest(), 16) % (2**32)
-
-def main():
-    random.seed(SEED)
-    rows = []
-    t0 = datetime.now(timezone.utc).replace(second=0, microsecond=0)
-    # 6 ticks, 5‑minute spacing
-    for i in range(6):
-        ts = (t0 + timedelta(minutes=5*i)).isoformat()
-        warehouse = "W3"
-        route = "R7"
-        risk = max(0.0, min(1.0, round(random.uniform(0.55, 0.68), 2)))
-        delay = int(random.uniform(10, 22))
-        cost = int(random.uniform(5800, 6800))
-        rows.append([ts, warehouse, route, risk, delay, cost])
-
-    # CSV header
-    header = ["timestamp", "warehouse", "route", "risk", "delay_minutes", "cost_delta"]
-    write_header = not os.path.exists(OUT)
-
-    os.makedirs(os.path.dirname(OUT), exist_ok=True)
-    with open(OUT, "a", newline="") as f:
-        w = csv.writer(f)
-        if write_header:
-            w.writerow(header)
-        w.writerows(rows)
-
-    print(f"✅ Wrote {len(rows)} rows to {OUT}")
-
-if __name__ == "__main__":
-    main()
+"""
+Signal generator.
+
+Without --rows: appends six W3/R7 ticks (5 minutes apart, starting now) to
+the signal store, as the day-5 demo expects.
+
+With --rows: bulk, reproducible load-test data from hub.signal_gen. The
+output is identical for any --workers.
+
+  python ops/sim/data_generator.py --rows 5000000 --warehouses 2000 --routes 20000 \
+      --format store --out /tmp/signals --workers 4
+"""
+import argparse, json, os, random, hashlib, sys, time
+from datetime import datetime, timezone, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from hub import signal_gen
+from hub.signal_store import STORE_DIR, open_store
+
+# Output: columnar signal store (an empty store is seeded from data/signals.csv)
+OUT = STORE_DIR
+# Fixed seed for deterministic reproducible outputs
+SEED = int(hashlib.sha256(b"ACM-day5-seed").hexdigest(), 16) % (2**32)
+
+def demo_rows():
+    random.seed(SEED)
+    rows = []
+    t0 = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    # 6 ticks, 5‑minute spacing
+    for i in range(6):
+        ts = (t0 + timedelta(minutes=5*i)).isoformat()
+        warehouse = "W3"
+        route = "R7"
+        risk = max(0.0, min(1.0, round(random.uniform(0.55, 0.68), 2)))
+        delay = int(random.uniform(10, 22))
+        cost = int(random.uniform(5800, 6800))
+        rows.append({"timestamp": ts, "warehouse": warehouse, "route": route, "risk": risk,
+                     "delay_minutes": delay, "cost_delta": cost})
+
+    return rows
+
+def bulk(args):
+    spec = signal_gen.GenSpec(rows=args.rows, warehouses=args.warehouses, routes=args.routes,
+                              interval_s=args.interval, start=args.start, seed=args.seed)
+    out = args.out or (STORE_DIR if args.format == "store" else os.path.join("data", "signals_load.csv"))
+    t0 = time.perf_counter()
+    if args.format == "store":
+        signal_gen.write_store(spec, out, args.workers)
+    else:
+        signal_gen.write_csv(spec, out, args.workers)
+    dt = time.perf_counter() - t0
+    print(json.dumps({"out": out, "format": args.format, "rows": spec.rows, "warehouses": spec.warehouses,
+                      "routes": spec.routes, "seed": spec.seed, "workers": args.workers,
+                      "seconds": round(dt, 3), "rows_per_sec": round(spec.rows / dt) if dt else None}))
+
+def main():
+    ap = argparse.ArgumentParser(description="Generate signal rows")
+    ap.add_argument("--rows", type=int, help="bulk mode: number of rows")
+    ap.add_argument("--warehouses", type=int, default=100)
+    ap.add_argument("--routes", type=int, default=1000, help="one signal stream per route")
+    ap.add_argument("--interval", type=float, default=300.0, help="seconds between a stream's ticks")
+    ap.add_argument("--start", default=signal_gen.DEFAULT_START)
+    ap.add_argument("--seed", type=int, default=SEED)
+    ap.add_argument("--workers", type=int, default=1, help="generator processes (output is identical)")
+    ap.add_argument("--format", choices=("store", "csv"), default="store")
+    ap.add_argument("--out", help="store directory or CSV path (default data/signal_store or data/signals_load.csv)")
+    args = ap.parse_args()
+    if args.rows:
+        return bulk(args)
+    rows = demo_rows()
+    total = open_store(OUT).append(rows)
+    print(f"✅ Wrote {len(rows)} rows to {OUT} ({total} total)")
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,60 @@
-import csv, os, subprocess, time
+import json, os, subprocess, sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from hub.adt_client import TwinUpdateClient, azure_token_provider, merge_ops
+from hub.signal_store import STORE_DIR, open_store
 
 ADT_NAME = "acm-day3-adt-9427"
 RG = "acm-day3-rg"
 TWIN_ID = "thermo1"
-CSV_PATH = os.path.join("data", "signals.csv")
+# REST endpoint (real instance or ops/sim/adt_standin.py); unset -> az CLI
+ADT_INSTANCE_URL = os.getenv("ADT_INSTANCE_URL")
+ADT_RATE_PER_SEC = float(os.getenv("ADT_RATE_PER_SEC", "10"))
 
 def az(*args):
     cmd = ["az"] + list(args)
     out = subprocess.check_output(cmd, text=True)
     return out
 
-def update_temperature(value: float):
-    patch = f'[{{"op":"replace","path":"/temperature","value":{value}}}]'
+def update_twin(ops):
     az("dt", "twin", "update",
        "-n", ADT_NAME,
        "-g", RG,
        "--twin-id", TWIN_ID,
-       "--json-patch", patch)
-
-def main():
-    if not os.path.exists(CSV_PATH):
-        raise SystemExit(f"❌ Missing {CSV_PATH} — run data_generator.py first!")
+       "--json-patch", json.dumps(ops, separators=(",", ":")))
 
-    with open(CSV_PATH, newline="") as f:
-        rows = list(csv.DictReader(f))
+def temperature_ops(rows):
+    ops = []
+    for row in rows:
+        temp = round(20 + float(row["risk"]) * 40, 1)
+        ops = merge_ops(ops, [{"op": "replace", "path": "/temperature", "value": temp}])
+    return ops
 
-    window = rows[-3:] if len(rows) >= 3 else rows
-
-    for row in window:
-        risk = float(row["risk"])
-        temp = round(20 + risk * 40, 1)
-        update_temperature(temp)
-        print(f"🌡 Updated {TWIN_ID}.temperature -> {temp}")
-        time.sleep(1)
+def main():
+    store = open_store(STORE_DIR)
+    if not len(store):
+        raise SystemExit(f"❌ No signals in {STORE_DIR} — run data_generator.py first!")
+
+    # Only the last rows matter: a slice of the mapped columns, not a full read
+    window = store.last(3).rows()
+    # Successive replaces of /temperature coalesce into one patch (last value wins)
+    ops = temperature_ops(window)
+    if not ops:
+        return
+
+    if ADT_INSTANCE_URL:
+        token = None if ADT_INSTANCE_URL.startswith("http://") else azure_token_provider()
+        with TwinUpdateClient(ADT_INSTANCE_URL, token_provider=token, rate_per_sec=ADT_RATE_PER_SEC) as client:
+            client.patch(TWIN_ID, ops)
+            result = client.flush()
+        if result.failed:
+            raise SystemExit(f"❌ Twin update failed: {result.failed[TWIN_ID]}")
+    else:
+        update_twin(ops)
+    print(f"🌡 Updated {TWIN_ID}.temperature -> {ops[-1]['value']} ({len(window)} rows, 1 call)")
 
 if __name__ == "__main__":
     main()
-
@@ -1,6 +1,13 @@
 import os, json, sys, time
 from datetime import datetime, timezone
 
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from hub import adt_query, policy_model
+from hub.adt_client import TwinUpdateClient, azure_token_provider
+
 # Guard: skip if env not set (so Codespaces doesn't fail)
 ADT_INSTANCE_URL = os.getenv("ADT_INSTANCE_URL")  # e.g., https://<your-adt>.api.<region>.digitaltwins.azure.net
 RUN_ADT_TOUCH = os.getenv("RUN_ADT_TOUCH", "false").lower() == "true"
@@ -8,6 +15,7 @@ RUN_ADT_TOUCH = os.getenv("RUN_ADT_TOUCH", "false").lower() == "true"
 PLANS_PATH = "data/plans"
 SIM_PATH = "data/sim"
 OUT_PATH = "audits/day13_adt_usage.json"
+CONFIG_PATH = "configs/day13.yaml"
 
 def utc_now():
     return datetime.now(timezone.utc).isoformat()
@@ -42,43 +50,57 @@ def main():
         print(f"ADT touch skipped (no instance). Wrote {OUT_PATH}")
         return
 
-    # Lazy import SDKs only if actually running
-    try:
-        from azure.identity import DefaultAzureCredential
-        from azure.digitaltwins.core import DigitalTwinsClient
-    except Exception as e:
-        usage["notes"].append(f"SDK import failed: {e}")
-        with open(OUT_PATH, "w") as f:
-            json.dump(usage, f, indent=2)
-        print(f"ADT touch skipped (no SDK). Wrote {OUT_PATH}")
-        return
+    # Local stand-in (http://) needs no credential; lazy-import azure.identity otherwise
+    token = None
+    if not ADT_INSTANCE_URL.startswith("http://"):
+        try:
+            token = azure_token_provider()
+        except Exception as e:
+            usage["notes"].append(f"SDK import failed: {e}")
+            with open(OUT_PATH, "w") as f:
+                json.dump(usage, f, indent=2)
+            print(f"ADT touch skipped (no SDK). Wrote {OUT_PATH}")
+            return
 
     try:
-        cred = DefaultAzureCredential()
-        client = DigitalTwinsClient(ADT_INSTANCE_URL, cred)
-
-        # 1) Minimal read query (LIMIT 5)
-        query = "SELECT TOP 5 T FROM digitaltwins T"
-        start = time.time()
-        items = list(client.query_twins(query))
-        elapsed = time.time() - start
-        usage["ops"] += 1
-        usage["query_units"] += 1  # conservative placeholder; exact QUs only visible in metrics
-        usage["notes"].append(f"Query returned {len(items)} in {elapsed:.2f}s")
-
-        # 2) Minimal tag update on zero or one twin if present (safe patch)
-        if items:
-            twin_id = items[0]["$dtId"]
-            patch = [
-                {"op": "add", "path": "/acm_day13_marker", "value": True},
-                {"op": "add", "path": "/acm_day13_ts", "value": utc_now()}
-            ]
-            client.update_digital_twin(twin_id, patch)
-            usage["ops"] += 1
-            usage["messages"] += 1
-            usage["notes"].append(f"Patched twin {twin_id} with Day13 markers.")
-        else:
-            usage["notes"].append("No twins to patch; skipped update op.")
+        with TwinUpdateClient(ADT_INSTANCE_URL, token_provider=token) as client:
+            # Cached (adt.query_cache_ttl_s) and budgeted (adt.max_ops / adt.max_qu)
+            layer = adt_query.from_config(client, CONFIG_PATH)
+            cfg_queries = (policy_model.load(CONFIG_PATH).doc.get("adt") or {}).get("queries") or []
+
+            # 1) Minimal read query (LIMIT 5), then the configured queries
+            items = []
+            for i, query in enumerate(["SELECT TOP 5 T FROM digitaltwins T"] + list(cfg_queries)):
+                start = time.time()
+                try:
+                    result = layer.query(query)
+                except adt_query.BudgetExceeded as e:
+                    usage["notes"].append(f"Query skipped: {e}")
+                    continue
+                elapsed = time.time() - start
+                if i == 0:
+                    items = result["items"]
+                if result["cached"]:
+                    usage["notes"].append(f"Query returned {len(result['items'])} from cache")
+                    continue
+                usage["ops"] += 1
+                usage["query_units"] += result["query_charge"] or 1  # placeholder when the charge header is absent
+                usage["notes"].append(f"Query returned {len(result['items'])} in {elapsed:.2f}s")
+
+            # 2) Minimal tag update on zero or one twin if present (safe patch)
+            if items:
+                twin_id = items[0]["$dtId"]
+                layer.budget.acquire(ops=1)
+                client.add(twin_id, "/acm_day13_marker", True)
+                client.add(twin_id, "/acm_day13_ts", utc_now())
+                flushed = client.flush()
+                if flushed.failed:
+                    raise RuntimeError(flushed.failed[twin_id])
+                usage["ops"] += 1
+                usage["messages"] += 1
+                usage["notes"].append(f"Patched twin {twin_id} with Day13 markers.")
+            else:
+                usage["notes"].append("No twins to patch; skipped update op.")
 
     except Exception as e:
         usage["notes"].append(f"ADT call error: {e}")
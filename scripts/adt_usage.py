@@ -1,49 +1,39 @@
 #!/usr/bin/env python3
-import json, time, pathlib, threading
+import json, os, sys, pathlib
 
-_lock = threading.Lock()
-USAGE_FILE = pathlib.Path("audits/adt_usage.jsonl")
+# Ensure repo root (parent of scripts/) is on sys.path so hub/* imports resolve
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
 
-def _now():
-    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+from hub import adt_meter
+
+USAGE_FILE = pathlib.Path(adt_meter.USAGE_FILE)
 
 def log_op(kind: str, count: int = 1, note: str = ""):
     """
     kind: one of ["operation", "message", "query_unit"]
     count: integer increment
     note: optional short string
+
+    Buffered: counters update in memory; records reach USAGE_FILE on the
+    meter's background flush (call flush() to force it).
     """
-    assert kind in ("operation", "message", "query_unit"), "invalid kind"
-    rec = {
-        "ts": _now(),
-        "kind": kind,
-        "count": int(count),
-        "note": note[:80] if note else ""
-    }
-    USAGE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with _lock:
-        with USAGE_FILE.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(rec) + "\n")
+    adt_meter.default_meter().record(kind, count, note)
 
 def summarize(last_n: int = 200):
     """
-    Read the last N entries and reduce to totals.
+    Totals over the last N entries, from in-memory counters.
     Returns dict like {"operation": X, "message": Y, "query_unit": Z}
     """
-    totals = {"operation": 0, "message": 0, "query_unit": 0}
-    if not USAGE_FILE.exists():
-        return totals
-    lines = USAGE_FILE.read_text(encoding="utf-8").splitlines()[-last_n:]
-    for s in lines:
-        try:
-            obj = json.loads(s)
-            k = obj.get("kind")
-            c = int(obj.get("count", 0))
-            if k in totals:
-                totals[k] += c
-        except Exception:
-            continue
-    return totals
+    return adt_meter.default_meter().summarize(last_n)
+
+def totals():
+    """All-time running totals."""
+    return adt_meter.default_meter().totals()
+
+def flush():
+    adt_meter.default_meter().flush()
 
 if __name__ == "__main__":
     # quick manual test
@@ -1,61 +1,34 @@
 #!/usr/bin/env python3
-import json, sys, os, hashlib, time
+import json, sys, os
 
-CHAIN_FILE = "audit_chain.jsonl"
-HEAD_FILE = "artifacts/chain_head.json"
-
-def sha256_bytes(b: bytes) -> str:
-    return hashlib.sha256(b).hexdigest()
-
-def sha256_json(obj) -> str:
-    data = json.dumps(obj, sort_keys=True, separators=(",", ":")).encode("utf-8")
-    return sha256_bytes(data)
-
-def now_iso():
-    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-
-def read_head():
-    if not os.path.exists(HEAD_FILE):
-        return {"head": None}
-    with open(HEAD_FILE, "r") as f:
-        return json.load(f)
+# Ensure repo root (parent of scripts/) is on sys.path so hub/* imports resolve
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
 
-def write_head(head_hash: str):
-    os.makedirs(os.path.dirname(HEAD_FILE), exist_ok=True)
-    with open(HEAD_FILE, "w") as f:
-        json.dump({"head": head_hash, "updated_at": now_iso()}, f, indent=2)
+from hub import chain_append
 
-def append_line(line: str):
-    with open(CHAIN_FILE, "a") as f:
-        f.write(line)
-        if not line.endswith("\n"):
-            f.write("\n")
+CHAIN_FILE = "audit_chain.jsonl"
+HEAD_FILE = "artifacts/chain_head.json"
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: append_audit.py <lineage_file>")
-        sys.exit(1)
-
-    lineage_path = sys.argv[1]
-    if not os.path.exists(lineage_path):
-        print(f"Missing lineage file: {lineage_path}")
+        print("Usage: append_audit.py <lineage_file> [<lineage_file> ...]")
         sys.exit(1)
 
-    with open(lineage_path, "r") as f:
-        lineage = json.load(f)
-
-    head = read_head().get("head")
-    entry = {
-        "timestamp": now_iso(),
-        "prev_hash": head,
-        "lineage": lineage
-    }
-    entry_hash = sha256_json(entry)
-    entry["entry_hash"] = entry_hash
-
-    append_line(json.dumps(entry, separators=(",", ":")))
-    write_head(entry_hash)
-    print(entry_hash)
+    lineages = []
+    for lineage_path in sys.argv[1:]:
+        if not os.path.exists(lineage_path):
+            print(f"Missing lineage file: {lineage_path}")
+            sys.exit(1)
+        with open(lineage_path, "r") as f:
+            lineages.append(json.load(f))
+
+    # One batch: chained in memory, one write + fsync, head rewritten once,
+    # Merkle index synced afterwards
+    with chain_append.ChainAppender(chain_append.AuditChain(CHAIN_FILE, HEAD_FILE)) as appender:
+        for entry in appender.append_many(lineages):
+            print(entry["entry_hash"])
 
 if __name__ == "__main__":
     main()
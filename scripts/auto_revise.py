@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 import json, sys, time, pathlib
-from dataclasses import asdict
-from typing import Tuple
+from dataclasses import asdict, replace
+from typing import List, Tuple
 from hub.policy_revision import Policy, Plan, Verdict, check_plan
 
 
@@ -102,9 +102,110 @@ def auto_revise(policy: Policy, plan: Plan, max_attempts: int = 6) -> dict:
     }
 
 
+# --- One-shot repair ---------------------------------------------------------
+# Minimal repair: the compliant plan that changes the fewest fields (the
+# MaxSAT objective), then moves the numbers least (the distance objective).
+# Each check_plan constraint bounds a single field, so the optimum splits
+# per field: a field changes only if it breaks its own constraint, and a
+# numeric field then moves to the bound (the nearest compliant value).
+# repair() computes that directly; repair_z3() poses the same problem as
+# one z3 Optimize call and serves as the reference (it is ~100x slower).
+
+# field -> check_plan reason for violating it
+REPAIR_REASONS = {
+    "added_cost": "budget_exceeded",
+    "expected_delay_minutes": "delay_exceeds_limit",
+    "data_region": "data_egress_non_eu",
+    "pii_used": "pii_used_not_allowed",
+}
+
+
+def _repaired(plan: Plan, fixed: Plan) -> dict:
+    changes = [{"field": f, "from": getattr(plan, f), "to": getattr(fixed, f), "reason": r}
+               for f, r in REPAIR_REASONS.items() if getattr(plan, f) != getattr(fixed, f)]
+    return {
+        "final": "SAT",
+        "mode": "repair",
+        "plan": dict(vars(fixed)),  # flat dataclass; asdict's deep copy dominates the runtime
+        "changes": changes,
+        "changed_fields": len(changes),
+        "distance": {"added_cost": abs(fixed.added_cost - plan.added_cost),
+                     "expected_delay_minutes": abs(fixed.expected_delay_minutes - plan.expected_delay_minutes)},
+    }
+
+
+def _unrepairable(policy: Policy, plan: Plan) -> dict:
+    return {"final": "UNSAT", "mode": "repair", "plan": dict(vars(plan)), "changes": [], "changed_fields": 0,
+            "distance": None, "counterexample": check_plan(policy, plan).reason}
+
+
+def repair(policy: Policy, plan: Plan) -> dict:
+    """
+    Smallest compliant revision of `plan` in one pass (see above): cost
+    clamped to the cap, delay clamped to the limit, region forced to EU,
+    PII disabled, each only when that field violates policy. Like
+    check_plan, it puts no floor under cost or delay, so a negative cap or
+    limit is met by a negative value.
+    """
+    fixed = replace(
+        plan,
+        added_cost=min(plan.added_cost, policy.budget_cap),
+        expected_delay_minutes=min(plan.expected_delay_minutes, policy.max_delay_minutes),
+        data_region=plan.data_region if policy.allow_cross_region or plan.data_region == "EU" else "EU",
+        pii_used=False,
+    )
+    return _repaired(plan, fixed)
+
+
+def repair_z3(policy: Policy, plan: Plan) -> dict:
+    """
+    repair() as a single z3 Optimize call: the policies as hard constraints,
+    one soft "keep this field" constraint per field (MaxSAT), then the
+    normalized numeric distance as a second, lexicographic objective.
+    """
+    from z3 import Bool, BoolVal, Context, If, Int, IntVal, Not, Optimize, Real, RealVal, ToReal, sat
+
+    ctx = Context()
+    opt = Optimize(ctx=ctx)
+    cost, delay = Real("added_cost", ctx), Int("expected_delay_minutes", ctx)
+    eu, pii = Bool("data_region_eu", ctx), Bool("pii_used", ctx)
+    cost0, delay0 = RealVal(str(float(plan.added_cost)), ctx), IntVal(int(plan.expected_delay_minutes), ctx)
+    cap, limit = RealVal(str(float(policy.budget_cap)), ctx), IntVal(int(policy.max_delay_minutes), ctx)
+
+    opt.add(cost <= cap, delay <= limit, Not(pii))  # exactly check_plan's bounds
+    if not policy.allow_cross_region:
+        opt.add(eu)
+    keep_region = eu if plan.data_region == "EU" else Not(eu)
+    for keep in (cost == cost0, delay == delay0, keep_region, pii == BoolVal(plan.pii_used, ctx)):
+        opt.add_soft(keep, 1, "changes")
+    dist = (If(cost >= cost0, cost - cost0, cost0 - cost) / RealVal(str(max(1.0, abs(policy.budget_cap))), ctx)
+            + ToReal(If(delay >= delay0, delay - delay0, delay0 - delay)) / max(1, abs(policy.max_delay_minutes)))
+    opt.minimize(dist)
+    opt.set(priority="lex")
+    if opt.check() != sat:
+        return _unrepairable(policy, plan)
+
+    m = opt.model()
+    num = m.eval(cost, model_completion=True)
+    region = "EU" if m.eval(eu, model_completion=True) == BoolVal(True, ctx) else plan.data_region
+    fixed = replace(
+        plan,
+        added_cost=float(num.numerator_as_long()) / float(num.denominator_as_long()),
+        expected_delay_minutes=m.eval(delay, model_completion=True).as_long(),
+        data_region=region,
+        pii_used=bool(m.eval(pii, model_completion=True) == BoolVal(True, ctx)),
+    )
+    return _repaired(plan, fixed)
+
+
+def repair_many(policy: Policy, plans: List[Plan]) -> List[dict]:
+    return [repair(policy, p) for p in plans]
+
+
 def main():
     # Simple CLI usage:
     # scripts/auto_revise.py '{"policy": {...}, "plan": {...}}'
+    # "mode": "repair" computes the minimal revision in one shot instead of iterating
     if len(sys.argv) < 2:
         print('Usage: scripts/auto_revise.py \'{"policy": {...}, "plan": {...}}\'', file=sys.stderr)
         sys.exit(1)
@@ -127,7 +228,14 @@ def main():
         pii_used=bool(pln.get("pii_used", True)),
     )
 
-    result = auto_revise(policy, plan, max_attempts=int(payload.get("max_attempts", 6)))
+    mode = payload.get("mode", "iterative")
+    if mode == "repair":
+        result = repair(policy, plan)
+    elif mode == "iterative":
+        result = auto_revise(policy, plan, max_attempts=int(payload.get("max_attempts", 6)))
+    else:
+        print(f"unknown mode {mode!r}; expected 'iterative' or 'repair'", file=sys.stderr)
+        sys.exit(1)
 
     # Log a compact audit line
     audits = pathlib.Path("audits")
@@ -137,8 +245,9 @@ def main():
             "ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
             "policy": asdict(policy),
             "initial_plan": asdict(plan),
+            "mode": mode,
             "result": result.get("final", "n/a"),
-            "attempts": result.get("attempts", 0)
+            "attempts": result.get("attempts", 1 if mode == "repair" else 0)
         }) + "\n")
 
     print(json.dumps(result, indent=2))
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Twin-update throughput against the local ADT stand-in (ops/sim/adt_standin.py).
+
+Usage: PYTHONPATH=. scripts/bench_adt_client.py [n_twins] [ops_per_twin] [latency_ms]
+
+  naive      : one PATCH per operation, a new connection per request (the
+               old per-row update loop, minus the az process and sleep)
+  pooled     : one PATCH per operation over one keep-alive session
+  coalesced  : TwinUpdateClient; ops merged per twin, one PATCH per twin,
+               pooled session, 4 workers
+
+Reports operations/sec (patch ops applied, not HTTP requests) and the number
+of requests and TCP connections the stand-in saw.
+"""
+import json, os, sys, time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import httpx
+
+from hub.adt_client import API_VERSION, TwinUpdateClient
+from ops.sim.adt_standin import ADTStandIn
+
+
+def workload(n_twins, per_twin):
+    # Each twin gets `per_twin` telemetry samples on two properties
+    for i in range(per_twin):
+        for t in range(n_twins):
+            yield f"twin-{t}", [{"op": "replace", "path": "/temperature", "value": 20 + i * 0.1},
+                                {"op": "replace", "path": "/risk", "value": round(i / per_twin, 3)}]
+
+
+def naive(url, work, pooled):
+    client = httpx.Client() if pooled else None
+    for twin_id, ops in work:
+        kw = dict(params={"api-version": API_VERSION}, json=ops,
+                  headers={"Content-Type": "application/json-patch+json"})
+        if client:
+            client.patch(f"{url}/digitaltwins/{twin_id}", **kw)
+        else:
+            httpx.patch(f"{url}/digitaltwins/{twin_id}", **kw)
+    if client:
+        client.close()
+
+
+def coalesced(url, work):
+    with TwinUpdateClient(url, batch_size=1000, metered=False) as client:
+        for twin_id, ops in work:
+            client.patch(twin_id, ops)
+
+
+def run(name, fn, n_twins, per_twin, latency_ms):
+    with ADTStandIn(latency_ms=latency_ms) as adt:
+        t0 = time.perf_counter()
+        fn(adt.url, workload(n_twins, per_twin))
+        dt = time.perf_counter() - t0
+        stats = dict(adt.stats)
+    return {"ops_per_sec": round(n_twins * per_twin * 2 / dt, 1),
+            "requests": stats["requests"], "connections": stats["connections"]}
+
+
+def main():
+    n_twins = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    per_twin = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
+    out = {
+        "n_twins": n_twins,
+        "ops_per_twin": per_twin * 2,
+        "standin_latency_ms": latency,
+        "naive": run("naive", lambda u, w: naive(u, w, False), n_twins, per_twin, latency),
+        "pooled": run("pooled", lambda u, w: naive(u, w, True), n_twins, per_twin, latency),
+        "coalesced": run("coalesced", coalesced, n_twins, per_twin, latency),
+    }
+    print(json.dumps(out, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Entries/sec for appending to audit_chain.jsonl.
+
+Usage: PYTHONPATH=. scripts/bench_chain_append.py [n_entries] [batch_size]
+
+  per_entry        : the old append_audit.py loop (read head, append one line,
+                     rewrite head; no fsync), one entry per call
+  per_entry_fsync  : ChainAppender.append() with fsync=batch, one entry per call
+  group_*          : append_many() in batches of batch_size, per fsync policy
+
+Runs in a scratch directory; the Merkle index is not updated.
+"""
+import json, os, sys, tempfile, time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from hub.chain_append import AuditChain, ChainAppender
+
+
+def lineage(i):
+    return {"plan_id": f"P{i}", "verdict": "PASS", "policy_sha256": "0" * 64, "artifact": f"artifacts/a_{i}.json"}
+
+
+def old_append(fmt, item):
+    head = fmt.read_head()
+    entry, line, h = fmt.seal(item, head)
+    with open(fmt.chain_path, "a") as f:
+        f.write(line + "\n")
+    os.makedirs(os.path.dirname(fmt.head_path), exist_ok=True)
+    with open(fmt.head_path, "w") as f:
+        json.dump({"head": h}, f, indent=2)
+
+
+def run(tmp, name, fn, n):
+    fmt = AuditChain(os.path.join(tmp, name + ".jsonl"), os.path.join(tmp, name, "head.json"), merkle=False)
+    items = [lineage(i) for i in range(n)]
+    t0 = time.perf_counter()
+    fn(fmt, items)
+    return round(n / (time.perf_counter() - t0), 1)
+
+
+def grouped(policy, batch):
+    def fn(fmt, items):
+        with ChainAppender(fmt, fsync=policy) as app:
+            for i in range(0, len(items), batch):
+                app.append_many(items[i:i + batch])
+    return fn
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    small = min(n, 2000)  # per-entry paths are slow; time a sample
+    with tempfile.TemporaryDirectory(prefix="acm-chain-") as tmp:
+        out = {
+            "n_entries": n,
+            "batch_size": batch,
+            "entries_per_sec": {
+                "per_entry": run(tmp, "old", lambda fmt, items: [old_append(fmt, x) for x in items], small),
+                "per_entry_fsync": run(tmp, "single", grouped("batch", 1), small),
+                "group_fsync_batch": run(tmp, "batch", grouped("batch", batch), n),
+                "group_fsync_every_5000": run(tmp, "every", grouped("every:5000", batch), n),
+                "group_fsync_interval_1s": run(tmp, "interval", grouped("interval:1", batch), n),
+                "group_fsync_none": run(tmp, "none", grouped("none", batch), n),
+            },
+        }
+    print(json.dumps(out, indent=2))
+
+
+if __name__ == "__main__":
+    main()
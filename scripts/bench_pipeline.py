@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+End-to-end latency: subprocess-per-stage (old app.py path) vs in-process hub.pipeline.
+
+Usage: PYTHONPATH=. scripts/bench_pipeline.py [runs]
+
+Both paths run inside a scratch copy of configs/ so the repo's data/ and
+audits/ directories are left untouched.
+"""
+import json, os, shutil, statistics, subprocess, sys, tempfile, time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from hub import pipeline
+
+STAGES = ["seed_disruption.py", "generate_plans.py", "verify_policies.py", "simulate_twin.py", "write_proof.py"]
+
+
+def run_subprocess(workdir: Path):
+    for stage in STAGES:
+        subprocess.run(
+            [sys.executable, str(REPO_ROOT / "scripts" / stage)],
+            cwd=workdir, capture_output=True, text=True, check=True,
+        )
+
+
+def run_inprocess(workdir: Path):
+    pipeline.run(with_proof=True)
+
+
+def timed(fn, workdir: Path, runs: int):
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn(workdir)
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return {
+        "runs": runs,
+        "mean_ms": round(statistics.mean(samples), 2),
+        "p50_ms": round(statistics.median(samples), 2),
+        "max_ms": round(max(samples), 2),
+    }
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="acm-bench-") as tmp:
+        workdir = Path(tmp)
+        shutil.copytree(REPO_ROOT / "configs", workdir / "configs")
+        os.chdir(workdir)
+        try:
+            # Warm-up: pays the one-time z3/yaml import for the in-process path
+            run_inprocess(workdir)
+            sub = timed(run_subprocess, workdir, runs)
+            inproc = timed(run_inprocess, workdir, runs)
+        finally:
+            os.chdir(cwd)
+
+    print(json.dumps({
+        "subprocess": sub,
+        "inprocess": inproc,
+        "speedup": round(sub["mean_ms"] / max(inproc["mean_ms"], 1e-9), 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Best-plan selection on large candidate bundles.
+
+Usage: PYTHONPATH=. scripts/bench_select.py [n_plans] [n_bundles]
+
+Each bundle holds n_plans hub.scenario_gen candidates (default 10000),
+judged against configs/day13.yaml.
+
+  verify_then_sort : app.py's old path. Verify every plan with the shared
+                     BatchVerifier, keep the SAT ones, sort by (cost, -SLA).
+  optimize_lex     : hub.plan_select, one z3 Optimize with the lexicographic
+                     (cost, sla) objective
+  optimize_weighted: hub.plan_select, weighted cost + risk + delay objective
+
+Reports seconds per bundle and whether both lexicographic paths picked the
+same plan.
+"""
+import json, sys, time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from hub import plan_select, scenario_gen
+from scripts import verify_policies as vpol
+
+WEIGHTS = {"cost": 1.0, "risk": 20000.0, "delay": 50.0}
+
+
+def verify_then_sort(plans, cfg):
+    v = vpol.BatchVerifier(cfg)
+    ok = [p for p in plans if v.check(p)[0]]
+    ok.sort(key=lambda p: (float(p.get("cost_usd", 1e12)), -float(p.get("sla_expected_percent", 0.0))))
+    return ok[0] if ok else None
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    bundles = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    cfg = vpol.load_config()
+    rows = []
+    for seed in range(bundles):
+        plans = scenario_gen.plan_pool(n, scenario_gen.ScaleSpec(seed=seed))
+        old, t_old = timed(lambda: verify_then_sort(plans, cfg))
+        lex, t_lex = timed(lambda: plan_select.select(plans, cfg))
+        wtd, t_wtd = timed(lambda: plan_select.select(plans, cfg, weights=WEIGHTS))
+        rows.append({"seed": seed, "encoded_lex": lex.encoded, "encoded_weighted": wtd.encoded,
+                     "same_plan": old is lex.plan,
+                     "sec": {"verify_then_sort": round(t_old, 3), "optimize_lex": round(t_lex, 3),
+                             "optimize_weighted": round(t_wtd, 3)}})
+    mean = {k: round(sum(r["sec"][k] for r in rows) / len(rows), 3) for k in rows[0]["sec"]}
+    print(json.dumps({"n_plans": n, "bundles": rows, "mean_sec": mean,
+                      "speedup_lex": round(mean["verify_then_sort"] / mean["optimize_lex"], 1)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
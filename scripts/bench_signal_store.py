@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+hub.signal_store against the signals CSV on the same synthetic rows.
+
+Usage: PYTHONPATH=. scripts/bench_signal_store.py [n_rows] [seconds_per_query]
+
+Rows come from hub.signal_gen (seed 0, 50 warehouses x 200 routes, each route
+ticking every 5 minutes).
+
+  csv_last3       : signal_stream.last_rows (tail read of the CSV)
+  csv_range_scan  : csv.DictReader over the whole file, filter one hour
+  store_last3     : SignalStore.last(3).rows()
+  store_range     : SignalStore.range() over one hour (sparse index), decoded
+  store_range_raw : the same range, column arrays only (risk mean)
+"""
+import csv, json, os, random, shutil, sys, tempfile, time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import numpy as np
+
+from hub import signal_gen
+from hub.signal_store import FIELDS, SignalStore, ms_to_iso
+from hub.signal_stream import last_rows
+
+def columns(n):
+    blocks = list(signal_gen.generate(signal_gen.GenSpec(rows=n, warehouses=50, routes=200)))
+    return {k: np.concatenate([b[k] for b in blocks]) for k in blocks[0]}
+
+
+def rate(fn, seconds):
+    n, t0 = 0, time.perf_counter()
+    while True:
+        fn()
+        n += 1
+        dt = time.perf_counter() - t0
+        if dt >= seconds:
+            return round(n / dt, 1)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    cols = columns(n)
+    tmp = tempfile.mkdtemp(prefix="bench_signal_store_")
+    store = SignalStore(os.path.join(tmp, "store"))
+    t0 = time.perf_counter()
+    store.append_columns(**cols)
+    store_write = time.perf_counter() - t0
+
+    csv_path = os.path.join(tmp, "signals.csv")
+    t0 = time.perf_counter()
+    with open(csv_path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(FIELDS)
+        w.writerows(zip(map(ms_to_iso, cols["ts"].tolist()), cols["warehouse"].tolist(), cols["route"].tolist(),
+                        cols["risk"].tolist(), cols["delay_minutes"].tolist(), cols["cost_delta"].tolist()))
+    csv_write = time.perf_counter() - t0
+
+    rng = random.Random(1)
+
+    first, last = int(cols["ts"][0]), int(cols["ts"][-1])
+
+    def hour():
+        start = rng.randrange(first, max(first + 1, last - 3_600_000))
+        return start / 1000, (start + 3_600_000) / 1000
+
+    def csv_range():
+        lo, hi = (ms_to_iso(t * 1000) for t in hour())
+        with open(csv_path, newline="") as f:
+            return [r for r in csv.DictReader(f) if lo <= r["timestamp"] < hi]
+
+    out = {
+        "n_rows": len(store),
+        "write_seconds": {"csv": round(csv_write, 3), "store": round(store_write, 3)},
+        "bytes": {"csv": os.path.getsize(csv_path),
+                  "store": sum(os.path.getsize(os.path.join(store.path, f)) for f in os.listdir(store.path))},
+        "queries_per_sec": {
+            "csv_last3": rate(lambda: last_rows(csv_path, 3), seconds),
+            "csv_range_scan": rate(csv_range, seconds),
+            "store_last3": rate(lambda: store.last(3).rows(), seconds),
+            "store_range": rate(lambda: store.range(*hour()).rows(), seconds),
+            "store_range_raw": rate(lambda: float(store.range(*hour())["risk"].mean()), seconds),
+        },
+    }
+    shutil.rmtree(tmp, ignore_errors=True)
+    print(json.dumps(out, indent=2))
+
+
+if __name__ == "__main__":
+    main()
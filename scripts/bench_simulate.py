@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Plans/sec for twin simulation on large snapshots.
+
+Usage: PYTHONPATH=. scripts/bench_simulate.py [n_warehouses] [n_plans] [n_snapshots]
+
+Snapshots and plans are hub.scenario_gen scale fixtures (seeds 13, 14, ...).
+
+  per_plan_loop : verifiers.simulator.simulate() per plan (baseline recomputed
+                  in Python every call; timed on a 200-plan sample)
+  batch         : simulate_batch, snapshot columns + baselines built once,
+                  plans x snapshots as array ops
+  batch_dicts   : simulate_many, same as batch but returning simulate()-shaped dicts
+"""
+import json, sys, time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from hub import scenario_gen
+from verifiers import simulator
+
+
+def snapshot(n_wh, seed=13):
+    return scenario_gen.snapshot(scenario_gen.ScaleSpec(warehouses=n_wh, seed=seed))
+
+
+def plans(n, seed=13):
+    return scenario_gen.plan_pool(n, scenario_gen.ScaleSpec(warehouses=200, seed=seed))
+
+
+def rate(fn, n):
+    t0 = time.perf_counter()
+    fn()
+    return round(n / (time.perf_counter() - t0), 1)
+
+
+def main():
+    n_wh = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    m = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    snaps = [snapshot(n_wh, seed=13 + k) for k in range(m)]
+    ps = plans(n)
+    sample = ps[:200]
+
+    t0 = time.perf_counter()
+    cols = [simulator.SnapshotColumns(s) for s in snaps]
+    load_ms = (time.perf_counter() - t0) * 1000.0 / m
+
+    out = {
+        "n_warehouses": n_wh,
+        "n_plans": n,
+        "n_snapshots": m,
+        "snapshot_load_ms": round(load_ms, 2),
+        "plans_per_sec": {
+            "per_plan_loop": rate(lambda: [simulator.simulate(snaps[0], p) for p in sample], len(sample)),
+            "batch": rate(lambda: simulator.simulate_batch(cols[:1], ps), n),
+            "batch_dicts": rate(lambda: simulator.simulate_many(cols[0], ps), n),
+        },
+        "plan_snapshot_pairs_per_sec": {
+            "batch": rate(lambda: simulator.simulate_batch(cols, ps), n * m),
+        },
+    }
+    print(json.dumps(out, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the hot functions, with stored baselines.
+
+Usage: PYTHONPATH=. scripts/bench_suite.py [--save] [--compare] [--tolerance 0.25]
+                                          [--only SUBSTRING] [--repeat 7] [--min-time 0.1]
+                                          [--baseline audits/baselines/microbench.json]
+
+  (no flag)  run and print {case: {sec_per_op, ops_per_sec, ...}}
+  --save     run and write the results as the baseline
+  --compare  run and compare against the baseline; exits 1 if any case's
+             sec_per_op exceeds baseline x (1 + tolerance); a case over
+             the line gets up to two more rounds of repeats before it counts
+
+Cases (an op is one plan / call / entry; "ops_per_call" in the results):
+  verify_plan.verify            cached verdict path, plans per call 1/100/1000
+  verify_plan.verify[uncached]  compiled policy / Z3 path without the cache
+  verify_policies.verify_plan   day13 config checks, cached and uncached
+  simulator.simulate            one plan against 10/1k/10k-warehouse snapshots
+  policy_revision.check_plan    1/100/1000 plans
+  auto_revise.auto_revise       1/100/1000 plans (mixed violations)
+  auto_revise.repair            same plans, one-shot minimal repair
+  policy_hash.policy_hash       base.yaml and synthetic 100/1000-key policies
+  append_audit                  ChainAppender.append_many batches of 1/100
+  proof_server.load_records     cold ring-buffer load from 1k/10k/100k-line files
+
+Timing: a repeat calls the case until `min_time` elapses, with the garbage
+collector off. Repeats are interleaved across cases. sec_per_op is the best
+repeat, the one least disturbed by noise. Everything runs in a scratch
+working directory so caches and audit files never touch the repo.
+"""
+import argparse, gc, json, os, platform, shutil, sys, tempfile, time
+from statistics import median
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import numpy as np
+
+from hub import chain_append, policy_hash, policy_model, scenario_gen
+from hub.policy_revision import Plan, Policy, check_plan
+from scripts import auto_revise, proof_server, verify_policies
+from verifiers import simulator, verify_plan
+
+BASELINE = os.path.join("audits", "baselines", "microbench.json")
+BASE_YAML = os.path.join(REPO_ROOT, "policies", "base.yaml")
+CONFIG = os.path.join(REPO_ROOT, "configs", "day13.yaml")
+REVISION_POLICY = Policy(budget_cap=10000.0, sla_min=96.0, allow_cross_region=False, max_delay_minutes=45)
+
+
+def _plans(n):
+    return scenario_gen.plan_pool(n, scenario_gen.ScaleSpec(warehouses=200, seed=22))
+
+
+def _revision_plans(n):
+    return [Plan(p["strategy"], float(p["cost_usd"]), int(p["delay_minutes"]), p["region"], p["pii_access"])
+            for p in _plans(n)]
+
+
+# Each case: (name, param, sizes, setup(size, workdir) -> (fn, ops_per_call))
+
+def verify_cached(n, _):
+    base, plans = policy_model.load(BASE_YAML).doc, _plans(n)
+    fn = lambda: [verify_plan.verify(p, base) for p in plans]
+    fn()  # warm the cache: steady state is all hits
+    return fn, n
+
+
+def verify_uncached(n, _):
+    base, plans = policy_model.load(BASE_YAML).doc, _plans(n)
+    return (lambda: [verify_plan._verify_uncached(p, base) for p in plans]), n
+
+
+def policies_cached(n, _):
+    cfg, plans = policy_model.load(CONFIG).doc, _plans(n)
+    fn = lambda: [verify_policies.verify_plan(p, cfg) for p in plans]
+    fn()
+    return fn, n
+
+
+def policies_uncached(n, _):
+    cfg, plans = policy_model.load(CONFIG).doc, _plans(n)
+    verifier = verify_policies.BatchVerifier(cfg)  # fresh solver: no state from earlier cases
+    return (lambda: [verifier.check(p) for p in plans]), n
+
+
+def simulate(n_wh, _):
+    snap = scenario_gen.snapshot(scenario_gen.ScaleSpec(warehouses=n_wh, routes_per_warehouse=2))
+    plan = _plans(1)[0]
+    return (lambda: simulator.simulate(snap, plan)), 1
+
+
+def revision_check(n, _):
+    plans = _revision_plans(n)
+    return (lambda: [check_plan(REVISION_POLICY, p) for p in plans]), n
+
+
+def revision_auto(n, _):
+    plans = _revision_plans(n)
+    return (lambda: [auto_revise.auto_revise(REVISION_POLICY, p) for p in plans]), n
+
+
+def revision_repair(n, _):
+    plans = _revision_plans(n)
+    return (lambda: auto_revise.repair_many(REVISION_POLICY, plans)), n
+
+
+def hash_policy(keys, workdir):
+    if keys == 0:
+        return (lambda: policy_hash.policy_hash(BASE_YAML)), 1
+    doc = policy_model.load(BASE_YAML).doc
+    doc = dict(doc, constraints=dict(doc["constraints"], **{f"extra_{i}": {"limit": i, "unit": "usd"}
+                                                            for i in range(keys)}))
+    path = os.path.join(workdir, f"policy_{keys}.json")
+    with open(path, "w") as f:
+        json.dump(doc, f)
+    return (lambda: policy_hash.policy_hash(path)), 1
+
+
+def append_audit(batch, workdir):
+    # One chain for every batch size: the Merkle index follows a single file
+    chain = chain_append.AuditChain(os.path.join(workdir, "audit_chain.jsonl"),
+                                    os.path.join(workdir, "artifacts", "chain_head.json"))
+    appender = chain_append.ChainAppender(chain)
+    lineage = {"plan_id": "PlanA", "verdict": "PASS", "sim": {"cost_delta": 6400}, "policy_sha256": "0" * 64}
+    items = [dict(lineage, seq=i) for i in range(batch)]
+    return (lambda: appender.append_many(items)), batch
+
+
+def load_records(lines, workdir):
+    d = os.path.join(workdir, f"proof_{lines}")
+    os.makedirs(d, exist_ok=True)
+    with open(os.path.join(d, "audit_chain.jsonl"), "w") as f:
+        for i in range(lines):
+            f.write(json.dumps({"timestamp": "2025-01-01T00:00:00Z", "prev_hash": f"{i:064x}",
+                                "lineage": {"plan_id": f"P{i}", "verdict": "PASS"},
+                                "entry_hash": f"{i + 1:064x}"}) + "\n")
+
+    def fn():
+        cwd = os.getcwd()
+        os.chdir(d)
+        try:
+            proof_server._buffers.clear()  # cold: rebuild the ring from the file
+            return proof_server.load_records()
+        finally:
+            os.chdir(cwd)
+    return fn, 1
+
+
+CASES = [
+    ("verify_plan.verify", "plans", (1, 100, 1000), verify_cached),
+    ("verify_plan.verify[uncached]", "plans", (1, 100, 1000), verify_uncached),
+    ("verify_policies.verify_plan", "plans", (1, 100, 1000), policies_cached),
+    ("verify_policies.verify_plan[uncached]", "plans", (1, 100, 1000), policies_uncached),
+    ("simulator.simulate", "warehouses", (10, 1000, 10000), simulate),
+    ("policy_revision.check_plan", "plans", (1, 100, 1000), revision_check),
+    ("auto_revise.auto_revise", "plans", (1, 100, 1000), revision_auto),
+    ("auto_revise.repair", "plans", (1, 100, 1000), revision_repair),
+    ("policy_hash.policy_hash", "extra_keys", (0, 100, 1000), hash_policy),
+    ("append_audit", "batch", (1, 100), append_audit),
+    ("proof_server.load_records", "lines", (1000, 10000, 100000), load_records),
+]
+
+
+def case_keys(only=None):
+    return [(f"{name}[{param}={size}]", setup, size)
+            for name, param, sizes, setup in CASES for size in sizes
+            if not only or only in f"{name}[{param}={size}]"]
+
+
+def _time(fn, ops_per_call, min_time):
+    """Seconds per op over calls of fn() lasting at least min_time."""
+    calls, t0 = 0, time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        dt = time.perf_counter() - t0
+        if dt >= min_time:
+            return dt / (calls * ops_per_call)
+
+
+def _summary(per_op, ops_per_call):
+    best = min(per_op)
+    return {"sec_per_op": best, "ops_per_sec": round(1 / best, 1), "median_sec_per_op": median(per_op),
+            "ops_per_call": ops_per_call}
+
+
+def run(only=None, repeat=7, min_time=0.1, recheck=None):
+    """
+    {case key: measurement}. Repeats are interleaved round-robin across the
+    cases, so a burst of machine noise costs one repeat of many cases rather
+    than every repeat of one. With `recheck(key, result) -> bool`, flagged
+    cases get up to two more rounds before their result stands.
+    """
+    workdir = tempfile.mkdtemp(prefix="bench_suite_")
+    for d in ("policies", "configs"):  # modules that read them relative to the cwd
+        shutil.copytree(os.path.join(REPO_ROOT, d), os.path.join(workdir, d))
+    cwd = os.getcwd()
+    os.chdir(workdir)  # verdict cache, run manifest etc. resolve here
+    gc_was_enabled = gc.isenabled()
+    try:
+        cases = {key: setup(size, workdir) for key, setup, size in case_keys(only)}
+        samples = {key: [] for key in cases}
+        gc.disable()  # as timeit does: collector pauses are noise here
+
+        def rounds(keys, n):
+            for _ in range(n):
+                for key in keys:
+                    fn, ops = cases[key]
+                    samples[key].append(_time(fn, ops, min_time))
+
+        rounds(list(cases), repeat)
+        for _ in range(2 if recheck else 0):
+            flagged = [k for k in cases if recheck(k, _summary(samples[k], cases[k][1]))]
+            if not flagged:
+                break
+            rounds(flagged, repeat)
+        return {key: _summary(samples[key], cases[key][1]) for key in cases}
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def environment():
+    return {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine(),
+            "processor": platform.processor() or platform.machine(), "cpus": os.cpu_count(),
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}
+
+
+def compare(baseline, current, tolerance):
+    """
+    {"regressions", "improvements", "missing", "new", "cases"}; a case regresses
+    when current sec_per_op > baseline x (1 + tolerance).
+    """
+    report = {"tolerance": tolerance, "regressions": [], "improvements": [], "missing": [], "new": [], "cases": {}}
+    for key, base in baseline.items():
+        cur = current.get(key)
+        if cur is None:
+            report["missing"].append(key)
+            continue
+        ratio = cur["sec_per_op"] / base["sec_per_op"] if base["sec_per_op"] else float("inf")
+        report["cases"][key] = {"baseline": base["sec_per_op"], "current": cur["sec_per_op"], "ratio": round(ratio, 3)}
+        if ratio > 1 + tolerance:
+            report["regressions"].append(key)
+        elif ratio < 1 / (1 + tolerance):
+            report["improvements"].append(key)
+    report["new"] = [k for k in current if k not in baseline]
+    return report
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Micro-benchmark suite")
+    mode = ap.add_mutually_exclusive_group()
+    mode.add_argument("--save", action="store_true", help="write results as the baseline")
+    mode.add_argument("--compare", action="store_true", help="fail on regressions against the baseline")
+    ap.add_argument("--baseline", default=os.path.join(REPO_ROOT, BASELINE))
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    ap.add_argument("--only", help="run cases whose key contains this substring")
+    ap.add_argument("--repeat", type=int, default=7)
+    ap.add_argument("--min-time", type=float, default=0.1, help="seconds per repeat")
+    args = ap.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        if args.only:
+            baseline = {k: v for k, v in baseline.items() if args.only in k}
+
+    def slower(key, res):
+        base = baseline.get(key)
+        return base is not None and res["sec_per_op"] > base["sec_per_op"] * (1 + args.tolerance)
+
+    results = run(args.only, args.repeat, args.min_time, slower if args.compare else None)
+    if args.save:
+        doc = {"environment": environment(), "repeat": args.repeat, "min_time": args.min_time, "results": results}
+        if args.only and os.path.exists(args.baseline):  # partial run: update those cases only
+            with open(args.baseline) as f:
+                old = json.load(f)
+            doc["results"] = dict(old.get("results", {}), **results)
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        tmp = args.baseline + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(doc, f, indent=2, sort_keys=True)
+            f.write("\n")
+        os.replace(tmp, args.baseline)
+        print(f"Wrote {len(results)} baseline(s) to {args.baseline}")
+        return
+    if args.compare:
+        report = compare(baseline, results, args.tolerance)
+        print(json.dumps(report, indent=2))
+        sys.exit(1 if report["regressions"] else 0)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
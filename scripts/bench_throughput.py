@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Pipeline throughput (runs/sec) under concurrent sessions via hub.pipeline.PipelineEngine.
+
+Usage: PYTHONPATH=. scripts/bench_throughput.py [runs_per_level] [workers,...]
+
+Runs inside a scratch copy of configs/ so the repo's data/ and audits/
+directories are left untouched.
+"""
+import json, os, shutil, sys, tempfile, time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from hub import pipeline
+
+
+def event_for(i: int):
+    return {
+        "type": "route_outage",
+        "route_id": f"R{i % 9 + 1}",
+        "warehouse_id": f"W{i % 5 + 1}",
+        "source": "bench-throughput",
+        "severity": "high",
+        "ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    levels = [int(x) for x in sys.argv[2].split(",")] if len(sys.argv) > 2 else [1, 2, 4, 8]
+    cwd = os.getcwd()
+    out = []
+    with tempfile.TemporaryDirectory(prefix="acm-bench-") as tmp:
+        shutil.copytree(REPO_ROOT / "configs", Path(tmp) / "configs")
+        os.chdir(tmp)
+        try:
+            pipeline.run()  # warm-up (imports, manifest schema)
+            for workers in levels:
+                events = [event_for(i) for i in range(runs)]
+                with pipeline.PipelineEngine(max_workers=workers) as eng:
+                    t0 = time.perf_counter()
+                    results = eng.run_many(events)
+                    elapsed = time.perf_counter() - t0
+                assert len({r.run_id for r in results}) == runs
+                out.append({
+                    "workers": workers,
+                    "runs": runs,
+                    "elapsed_s": round(elapsed, 3),
+                    "runs_per_sec": round(runs / elapsed, 1),
+                })
+        finally:
+            os.chdir(cwd)
+    print(json.dumps(out, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Queries/sec for hub.twin_graph on a synthetic graph.
+
+Usage: PYTHONPATH=. scripts/bench_twin_graph.py [n_twins] [seconds_per_query]
+
+The graph has n_twins / 5 warehouses and 4 routes per warehouse, each route
+linked from its own warehouse and one random other (warehouse -ROUTE-> route).
+
+  scan_match     : the configs/day13.yaml MATCH done by scanning twin and
+                   relationship lists (what a flat dict store supports)
+  indexed_match  : the same MATCH through TwinGraph (warehouseId index + CSR)
+  top5           : SELECT TOP 5 T FROM digitaltwins T (scripts/adt_touch.py)
+  by_route_id    : equality on the routeId index
+  model_range    : IS_OF_MODEL + range filter, TOP 10 (index, then scan)
+  count_scan     : COUNT() over a full-scan predicate
+"""
+import json, os, random, sys, time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from hub.twin_graph import ROUTE_MODEL, TwinGraph
+
+
+def snapshot(n_twins, seed=7):
+    rng = random.Random(seed)
+    n_w = max(1, n_twins // 5)
+    warehouses = {f"W{i}": {"inventory": rng.randint(0, 200), "demand": rng.randint(50, 200)} for i in range(n_w)}
+    routes = {}
+    for i in range(n_twins - n_w):
+        routes[f"R{i}"] = {"latency_minutes": rng.randint(5, 120),
+                           "warehouses": [f"W{i // 4 % n_w}", f"W{rng.randrange(n_w)}"]}
+    return {"warehouses": warehouses, "routes": routes}
+
+
+def scan_match(snap, wid):
+    # Flat-store equivalent: find the warehouse, then every route naming it
+    w = next(({"$dtId": k, **v} for k, v in snap["warehouses"].items() if k == wid), None)
+    if w is None:
+        return []
+    out = []
+    for rid, r in snap["routes"].items():
+        if wid in r.get("warehouses", ()):
+            out.append({"w": w, "r": {"$dtId": rid, **r}})
+            if len(out) == 5:
+                break
+    return out
+
+
+def rate(fn, seconds):
+    n, t0 = 0, time.perf_counter()
+    while True:
+        fn()
+        n += 1
+        dt = time.perf_counter() - t0
+        if dt >= seconds:
+            return round(n / dt, 1)
+
+
+def main():
+    n_twins = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    snap = snapshot(n_twins)
+    t0 = time.perf_counter()
+    g = TwinGraph.from_snapshot(snap)
+    build = time.perf_counter() - t0
+    rng = random.Random(1)
+    n_w, n_r = len(snap["warehouses"]), len(snap["routes"])
+    match = "MATCH (w)-[:ROUTE]->(r) WHERE w.warehouseId = '{}' RETURN w, r LIMIT 5"
+    out = {
+        "n_twins": len(g),
+        "build_seconds": round(build, 3),
+        "queries_per_sec": {
+            "scan_match": rate(lambda: scan_match(snap, f"W{rng.randrange(n_w)}"), seconds),
+            "indexed_match": rate(lambda: g.query(match.format(f"W{rng.randrange(n_w)}")), seconds),
+            "top5": rate(lambda: g.query("SELECT TOP 5 T FROM digitaltwins T"), seconds),
+            "by_route_id": rate(lambda: g.query(f"SELECT T FROM DIGITALTWINS T WHERE T.routeId = 'R{rng.randrange(n_r)}'"),
+                                seconds),
+            "model_range": rate(lambda: g.query(f"SELECT TOP(10) T FROM DIGITALTWINS T WHERE "
+                                                f"IS_OF_MODEL(T, '{ROUTE_MODEL}') AND T.latency_minutes > 100"),
+                                seconds),
+            "count_scan": rate(lambda: g.query("SELECT COUNT() FROM DIGITALTWINS T WHERE T.latency_minutes > 60"),
+                               seconds),
+        },
+    }
+    print(json.dumps(out, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Plans/sec for policy verification on large bundles.
+
+Usage: PYTHONPATH=. scripts/bench_verify.py [n_plans]
+
+Plans come from the hub.scenario_gen scale fixture; each carries both the
+policies/base.yaml and the configs/day13.yaml fields.
+
+  per_plan_solver : new Solver + every policy constraint per plan, default
+                    Z3 context (the old path)
+  shared_solver   : BatchVerifier, constraints asserted once, plans as assumptions
+  vectorized      : verify_batch fast path, NumPy predicates over plan columns
+                    (base.yaml plans only; every field concrete)
+"""
+import json, sys, time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from z3 import main_ctx
+
+from hub import scenario_gen
+from verifiers import verify_plan as vp
+from scripts import verify_policies as vpol
+
+
+def fixture_plans(n, seed=13):
+    return scenario_gen.plan_pool(n, scenario_gen.ScaleSpec(warehouses=200, seed=seed))
+
+
+def rate(fn, n):
+    t0 = time.perf_counter()
+    fn()
+    return round(n / (time.perf_counter() - t0), 1)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    base = vp.load_yaml(vp.BASE_YAML_PATH)
+    cfg = vpol.load_config()
+    bp = cp = fixture_plans(n)
+
+    out = {
+        "n_plans": n,
+        "base_yaml": {
+            "per_plan_solver": rate(lambda: [vp.BatchVerifier(base, main_ctx()).check(p) for p in bp], n),
+            "shared_solver": rate(lambda: [v.check(p) for v in [vp.BatchVerifier(base)] for p in bp], n),
+            "vectorized": rate(lambda: vp.verify_batch(bp, base), n),
+        },
+        "day13_config": {
+            "per_plan_solver": rate(lambda: [vpol.BatchVerifier(cfg, main_ctx()).check(p) for p in cp], n),
+            "shared_solver": rate(lambda: vpol.verify_bundle({"plans": [dict(p, strategy="bench") for p in cp]}, "bench.json", cfg), n),
+        },
+    }
+    print(json.dumps(out, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Append many entries to a hash-chained log in one group commit.
+
+Usage: scripts/chain_append.py --format {audit,proof,runbook} [--chain PATH [--head PATH]]
+           [--fsync batch|none|every:N|interval:S] [FILE ...]
+
+Each FILE (or stdin when none is given) holds one JSON document, a JSON
+list of entries, or JSON lines. Prints the new hash of every entry.
+
+A --chain other than the format's usual file gets its own head file (and
+lock): --head, or <chain without extension>.head.json. The audit Merkle
+index is only updated for the usual audit_chain.jsonl.
+"""
+import argparse, json, os, sys
+
+# Ensure repo root (parent of scripts/) is on sys.path so hub/* imports resolve
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from hub import chain_append
+
+HASH_FIELD = {"audit": "entry_hash", "proof": "chain_head", "runbook": "hash"}
+
+
+def read_items(text):
+    text = text.strip()
+    if not text:
+        return []
+    try:
+        doc = json.loads(text)
+        return doc if isinstance(doc, list) else [doc]
+    except ValueError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def make_format(name, chain=None, head=None):
+    """Chain format for `name`, with head and lock paths that belong to `chain`."""
+    fmt_cls = chain_append.FORMATS[name]
+    default = fmt_cls()
+    if not chain or os.path.abspath(chain) == os.path.abspath(default.chain_path):
+        if head and default.head_path and os.path.abspath(head) != os.path.abspath(default.head_path):
+            raise ValueError(f"--head must be {default.head_path} for {default.chain_path}")
+        return default
+    if default.head_path is None:  # runbook: the head is the chain's last line
+        if head:
+            raise ValueError(f"--head does not apply to --format {name}")
+        return fmt_cls(chain)
+    return fmt_cls(chain, head or os.path.splitext(chain)[0] + ".head.json")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Group-commit append to a hash-chained log")
+    ap.add_argument("--format", choices=sorted(chain_append.FORMATS), default="audit")
+    ap.add_argument("--chain", help="chain file (default: the format's usual path)")
+    ap.add_argument("--head", help="head file for --chain (default: <chain>.head.json)")
+    ap.add_argument("--fsync", default="batch", help="batch | none | every:N | interval:SECONDS")
+    ap.add_argument("files", nargs="*")
+    args = ap.parse_args()
+
+    items = []
+    if args.files:
+        for path in args.files:
+            with open(path) as f:
+                items.extend(read_items(f.read()))
+    else:
+        items = read_items(sys.stdin.read())
+
+    try:
+        fmt = make_format(args.format, args.chain, args.head)
+        appender = chain_append.ChainAppender(fmt, fsync=args.fsync)
+    except ValueError as e:
+        ap.error(str(e))
+    with appender:
+        for entry in appender.append_many(items):
+            print(entry[HASH_FIELD[args.format]])
+
+
+if __name__ == "__main__":
+    main()
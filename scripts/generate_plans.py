@@ -1,58 +1,108 @@
-import os, json, glob, time, hashlib
+import os, sys, json, hashlib, argparse
 from datetime import datetime
 
+# Ensure repo root (parent of scripts/) is on sys.path so hub/* imports resolve
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from hub import plan_search, policy_model, run_manifest
+
 EVENTS_DIR = "data/events"
 PLANS_DIR = "data/plans"
-os.makedirs(PLANS_DIR, exist_ok=True)
+CONFIG_PATH = "configs/day13.yaml"
+POLICY_PATH = "policies/base.yaml"
+TWIN_SNAPSHOT = "twin_snapshot.json"
+TOP_K = 8
 
 def latest_event():
-    files = sorted(glob.glob(os.path.join(EVENTS_DIR, "*.json")), key=os.path.getmtime)
-    if not files:
+    rec = run_manifest.latest("event", os.path.join(EVENTS_DIR, "*.json"))
+    if not rec:
         raise SystemExit("No events found. Run seed_disruption.py first.")
-    with open(files[-1]) as f:
-        return json.load(f), files[-1]
-
-event, path = latest_event()
-
-plans = [
-    {
-        "id": "PlanA",
-        "strategy": "reroute_via_R7",
-        "assumptions": {"carrier_capacity_buffer_pct": 10},
-        "cost_usd": 4800,
-        "sla_expected_percent": 97.5,
-        "region_data_boundary": "EU",
-        "pii_access": False,
-        "kpi_expectations": {"stockout_risk_reduction_pct": 22, "delay_reduction_pct": 18},
-        "inputs": {"route_id": event["route_id"], "warehouse_id": event["warehouse_id"]},
-        "ts": datetime.now().isoformat()
-    },
-    {
-        "id": "PlanB",
-        "strategy": "reallocate_inventory_and_surge_carrier",
-        "assumptions": {"temp_staff_hours": 12},
-        "cost_usd": 6400,
-        "sla_expected_percent": 98.2,
-        "region_data_boundary": "EU",
-        "pii_access": False,
-        "kpi_expectations": {"stockout_risk_reduction_pct": 42, "delay_reduction_pct": 31},
-        "inputs": {"route_id": event["route_id"], "warehouse_id": event["warehouse_id"]},
-        "ts": datetime.now().isoformat()
+    with open(rec.path) as f:
+        return json.load(f), rec.path, rec.run_id
+
+def load_snapshot(run_id=None):
+    """
+    Twin snapshot for plan search: the run's own snapshot when one was
+    recorded, else twin_snapshot.json in the working directory, else the
+    repo's demo twin.
+    """
+    rec = run_manifest.default_manifest().get(run_id, "snapshot") if run_id else None
+    for path in (rec.path if rec else None, TWIN_SNAPSHOT, os.path.join(REPO_ROOT, TWIN_SNAPSHOT)):
+        if path and os.path.exists(path):
+            with open(path) as f:
+                return json.load(f)
+    return {"warehouses": {}, "routes": {}}
+
+def load_limits():
+    """Search limits from configs/day13.yaml and policies/base.yaml (defaults for missing files)."""
+    cfg = policy_model.load(CONFIG_PATH).doc if os.path.exists(CONFIG_PATH) else {}
+    policy = policy_model.load(POLICY_PATH).doc if os.path.exists(POLICY_PATH) else None
+    return plan_search.limits_from(cfg or {}, policy)
+
+def search_plans(event, snapshot=None, top_k=TOP_K, deadline_s=None, run_id=None):
+    """plan_search.SearchResult for the event over the twin."""
+    if snapshot is None:
+        snapshot = load_snapshot(run_id)
+    spec = plan_search.SearchSpec(top_k=top_k, deadline_s=deadline_s)
+    return plan_search.top_k(event, snapshot, load_limits(), spec)
+
+def build_plans(event, snapshot=None, top_k=TOP_K, deadline_s=None, run_id=None):
+    return search_plans(event, snapshot, top_k, deadline_s, run_id).plans
+
+def generate_bundle(event, event_path, plans_dir=PLANS_DIR, run_id=None, snapshot=None,
+                    top_k=TOP_K, deadline_s=None):
+    """
+    Search the twin for the event's top-K candidate plans and write the bundle.
+    Returns (bundle, out_path). Raises plan_search.NoFeasiblePlan, and writes
+    nothing, when no candidate fits the limits.
+    """
+    res = search_plans(event, snapshot, top_k, deadline_s, run_id)
+    if not res.plans:
+        limits = load_limits()
+        raise plan_search.NoFeasiblePlan(
+            f"no plan for {event.get('type')} on {event.get('route_id')}/{event.get('warehouse_id')} "
+            f"within budget ${limits.budget_cap_usd:g} and {limits.max_delay_minutes:g} min delay "
+            f"(explored {res.explored}, pruned {res.pruned}{'' if res.complete else ', deadline hit'})")
+    os.makedirs(plans_dir, exist_ok=True)
+    bundle = {
+        "event": event,
+        "plans": res.plans,
+        "search": {"complete": res.complete, "explored": res.explored, "pruned": res.pruned},
+        "origin_event_file": os.path.basename(event_path),
+        "generated_at": datetime.now().isoformat()
     }
-]
 
-bundle = {
-    "event": event,
-    "plans": plans,
-    "origin_event_file": os.path.basename(path),
-    "generated_at": datetime.now().isoformat()
-}
+    payload = json.dumps(bundle, sort_keys=True).encode()
+    bundle_id = hashlib.sha256(payload).hexdigest()[:16]
+    out_path = os.path.join(plans_dir, f"{bundle_id}.json")
+
+    with open(out_path, "w") as f:
+        json.dump(bundle, f, indent=2)
+    run_manifest.record(run_id or run_manifest.new_run_id(), "bundle", out_path, bundle_id)
+    return bundle, out_path
 
-payload = json.dumps(bundle, sort_keys=True).encode()
-bundle_id = hashlib.sha256(payload).hexdigest()[:16]
-out_path = os.path.join(PLANS_DIR, f"{bundle_id}.json")
+def main():
+    ap = argparse.ArgumentParser(description="Search the twin for candidate plans for the latest event")
+    ap.add_argument("--top-k", type=int, default=TOP_K, help="plans to keep (default %(default)s)")
+    ap.add_argument("--deadline", type=float, help="anytime mode: stop after this many seconds with the best so far")
+    ap.add_argument("--snapshot", help="twin snapshot JSON (default: the run's, else twin_snapshot.json)")
+    args = ap.parse_args()
 
-with open(out_path, "w") as f:
-    json.dump(bundle, f, indent=2)
+    event, path, run_id = latest_event()
+    snapshot = None
+    if args.snapshot:
+        with open(args.snapshot) as f:
+            snapshot = json.load(f)
+    try:
+        bundle, out_path = generate_bundle(event, path, run_id=run_id, snapshot=snapshot,
+                                           top_k=args.top_k, deadline_s=args.deadline)
+    except plan_search.NoFeasiblePlan as e:
+        raise SystemExit(f"No feasible plan: {e}")
+    search = bundle["search"]
+    print(f"Wrote plan bundle: {out_path} ({len(bundle['plans'])} plan(s), explored {search['explored']}, "
+          f"pruned {search['pruned']}{'' if search['complete'] else ', deadline hit'})")
 
-print(f"Wrote plan bundle: {out_path}")
+if __name__ == "__main__":
+    main()
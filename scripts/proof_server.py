@@ -1,11 +1,24 @@
 #!/usr/bin/env python3
 import json
+import os
+import sys
 from pathlib import Path
 from datetime import datetime, timezone
 from typing import List, Dict, Any
 from flask import Flask, render_template, request, Response
 
+# Ensure repo root (parent of scripts/) is on sys.path so hub/* imports resolve
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from hub import adt_rollup, audit_merkle, policy_model
+from hub.record_tail import TailBuffer
+
 AUDIT_FILES = [Path("audits/chain.log"), Path("audit_chain.jsonl")]
+CHAIN_FILE = "audit_chain.jsonl"
+CONFIG_PATH = "configs/day13.yaml"
+RING_SIZE = 1000
 
 # Flask app with template/static folders under ui/
 app = Flask(__name__, template_folder="../ui/templates", static_folder="../ui/static")
@@ -13,23 +26,21 @@ app = Flask(__name__, template_folder="../ui/templates", static_folder="../ui/st
 app.config["JSON_AS_ASCII"] = False
 
 
-def load_records() -> List[Dict[str, Any]]:
-    """Load JSONL audit records from the first available audit file."""
+_buffers: Dict[Path, TailBuffer] = {}
+
+
+def load_records(n: int = RING_SIZE) -> List[Dict[str, Any]]:
+    """
+    Last n JSONL audit records (oldest first) from the first available audit
+    file. Served from a per-file ring buffer that only reads appended bytes.
+    """
     src = next((p for p in AUDIT_FILES if p.exists()), None)
     if not src:
         return []
-    recs: List[Dict[str, Any]] = []
-    with src.open("r", encoding="utf-8") as f:
-        for line in f:
-            s = line.strip()
-            if not s:
-                continue
-            try:
-                recs.append(json.loads(s))
-            except Exception:
-                # Tolerate non-JSON lines in chain.log
-                continue
-    return recs
+    buf = _buffers.get(src)
+    if buf is None:
+        buf = _buffers.setdefault(src, TailBuffer(str(src), RING_SIZE))
+    return buf.last(n)
 
 
 def value(d: Dict[str, Any], *keys, default=None):
@@ -69,8 +80,7 @@ def api_audit():
         n = max(1, int(request.args.get("n", "20")))
     except Exception:
         n = 20
-    recs = load_records()
-    rows = [coalesce(x) for x in recs[-n:]]
+    rows = [coalesce(x) for x in load_records(n)]
     rows.reverse()  # newest first
     payload = {
         "count": len(rows),
@@ -84,6 +94,112 @@ def api_audit():
     )
 
 
+def json_response(payload: Dict[str, Any], status: int = 200) -> Response:
+    return Response(
+        json.dumps(payload, ensure_ascii=False, separators=(",", ": ")),
+        status=status,
+        mimetype="application/json; charset=utf-8",
+    )
+
+
+def merkle_tree() -> audit_merkle.AuditMerkle:
+    """The Merkle index over audit_chain.jsonl, caught up with the chain."""
+    tree = audit_merkle.default_tree()
+    tree.sync(CHAIN_FILE)
+    return tree
+
+
+@app.route("/api/merkle/root")
+def api_merkle_root():
+    tree = merkle_tree()
+    size = tree.size()
+    return json_response({"tree_size": size, "root": tree.root(size)})
+
+
+@app.route("/api/merkle/inclusion")
+def api_merkle_inclusion():
+    """Inclusion proof for ?entry_hash=... (optionally against ?tree_size=N)."""
+    entry_hash = request.args.get("entry_hash", "")
+    tree = merkle_tree()
+    index = tree.index_of(entry_hash)
+    try:
+        size = int(request.args.get("tree_size", tree.size()))
+        if index is None or index >= size:
+            return json_response({"error": "entry_hash not in tree", "entry_hash": entry_hash}, 404)
+        proof = tree.inclusion_proof(index, size)
+    except ValueError as e:
+        return json_response({"error": str(e)}, 400)
+    return json_response({
+        "entry_hash": entry_hash,
+        "leaf_index": index,
+        "tree_size": size,
+        "root": tree.root(size),
+        "proof": proof,
+    })
+
+
+@app.route("/api/merkle/consistency")
+def api_merkle_consistency():
+    """Consistency proof between two chain heads: ?old=<entry_hash>[&new=<entry_hash>]."""
+    tree = merkle_tree()
+    heads = {}
+    for name in ("old", "new"):
+        h = request.args.get(name)
+        if h is None and name == "new":
+            heads[name] = tree.size()
+            continue
+        index = tree.index_of(h or "")
+        if index is None:
+            return json_response({"error": f"{name} head not in tree", name: h}, 404)
+        heads[name] = index + 1
+    try:
+        proof = tree.consistency_proof(heads["old"], heads["new"])
+    except ValueError as e:
+        return json_response({"error": str(e)}, 400)
+    return json_response({
+        "old_size": heads["old"],
+        "new_size": heads["new"],
+        "old_root": tree.root(heads["old"]),
+        "new_root": tree.root(heads["new"]),
+        "proof": proof,
+    })
+
+
+@app.route("/api/adt/usage")
+def api_adt_usage():
+    """
+    ADT usage totals from the rollup store: the current ?window=minute|hour|day
+    (default day), or ?start=&end= epoch seconds. Includes the adt.max_ops /
+    adt.max_qu limits from configs/day13.yaml.
+    """
+    store = adt_rollup.default_store()
+    try:
+        if "start" in request.args:
+            start = int(request.args["start"])
+            end = int(request.args.get("end", datetime.now(timezone.utc).timestamp()))
+            window, usage = None, store.usage(start, end)
+        else:
+            window = request.args.get("window", "day")
+            if window not in adt_rollup.RESOLUTIONS:
+                raise ValueError(f"window must be one of {sorted(adt_rollup.RESOLUTIONS)}")
+            start = end = None
+            usage = store.window(window)
+    except ValueError as e:
+        return json_response({"error": str(e)}, 400)
+    try:
+        limits = policy_model.load(CONFIG_PATH).doc.get("adt") or {}
+    except FileNotFoundError:
+        limits = {}
+    return json_response({
+        "window": window,
+        "start": start,
+        "end": end,
+        "usage": usage,
+        "limits": {"max_ops": limits.get("max_ops"), "max_qu": limits.get("max_qu")},
+        "within_limits": adt_rollup.within_limits(usage, limits),
+    })
+
+
 @app.route("/")
 def home():
     """Render the proof viewer HTML with latest N entries."""
@@ -91,8 +207,7 @@ def home():
         n = max(1, int(request.args.get("n", "20")))
     except Exception:
         n = 20
-    recs = load_records()
-    rows = [coalesce(x) for x in recs[-n:]]
+    rows = [coalesce(x) for x in load_records(n)]
     rows.reverse()
     generated = datetime.now(timezone.utc).isoformat()
     return render_template("proof.html", rows=rows, generated=generated, count=len(rows))
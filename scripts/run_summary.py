@@ -1,9 +1,16 @@
-import os, glob, json, hashlib, time
+import os, sys, json, hashlib
 from datetime import datetime, timezone
 
-def latest(path):
-    files = sorted(glob.glob(path), key=os.path.getmtime)
-    return files[-1] if files else None
+# Ensure repo root (parent of scripts/) is on sys.path so hub/* imports resolve
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from hub import run_manifest
+
+def latest(kind, path):
+    rec = run_manifest.latest(kind, path)
+    return rec.path if rec else None
 
 def sha256_hex(path):
     with open(path, "rb") as f:
@@ -11,8 +18,8 @@ def sha256_hex(path):
         return hashlib.sha256(f.read()).hexdigest()
 
 def main():
-    bundle_path = latest("data/plans/*.json")
-    sim_path = latest("data/sim/*_sim.json")
+    bundle_path = latest("bundle", "data/plans/*.json")
+    sim_path = latest("sim", "data/sim/*_sim.json")
     proof_log = "audits/day13_proof.jsonl"
     chain_meta = "audits/chain.meta"
 
@@ -28,33 +28,18 @@ ACTION="approved_action"
 ACTION_RESULT="ok"
 echo "[ok] Approved action executed."
 
-# 4) Hash-chained audit entry (robust append)
 # 4) Hash-chained audit entry (compact, one line per entry)
+# prev_hash and hash are filled in by the chain appender under the chain lock
 CHAIN_FILE="audits/chain.log"
 TS="$(date -u +%Y-%m-%dT%H:%M:%SZ)"
-mkdir -p "$(dirname "$CHAIN_FILE")"
 
-# Read previous hash safely (only if last line is valid JSON)
-if [[ -s "$CHAIN_FILE" ]]; then
-  LAST="$(tail -n 1 "$CHAIN_FILE" || true)"
-  if echo "$LAST" | jq -e . >/dev/null 2>&1; then
-    PREV_HASH="$(echo "$LAST" | jq -r '.hash // empty')"
-  else
-    PREV_HASH=""
-  fi
-else
-  PREV_HASH=""
-fi
-
-# Build entry without hash
-ENTRY="$(jq -n \
+jq -n -c \
   --arg ts "$TS" \
   --arg policy "$POLICY_MODE" \
   --arg att "$ATT_TYPE" \
   --arg released "$RELEASED" \
   --arg action "$ACTION" \
   --arg result "$ACTION_RESULT" \
-  --arg prev "$PREV_HASH" \
   '{
     ts:$ts,
     policy_mode:$policy,
@@ -62,15 +47,6 @@ ENTRY="$(jq -n \
     released:($released=="true"),
     action:$action,
     result:$result
-  } + ( $prev|length>0 | if . then {prev_hash:$prev} else {} end )' \
-)"
-
-# Compute hash over the canonical compact JSON
-CANON="$(printf "%s" "$ENTRY" | jq -c '.')"
-HASH="$(printf "%s" "$CANON" | sha256sum | awk '{print $1}')"
-FINAL="$(echo "$CANON" | jq -c --arg h "$HASH" '. + {hash:$h}')"
-
-# Append exactly one compact JSON line with newline
-printf "%s\n" "$FINAL" >> "$CHAIN_FILE"
+  }' \
+| python3 scripts/chain_append.py --format runbook --chain "$CHAIN_FILE" >/dev/null
 echo "[ok] Audit appended to $CHAIN_FILE"
-
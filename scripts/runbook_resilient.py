@@ -7,7 +7,7 @@ import hashlib
 import time
 import pathlib
 from scripts.lib_retry import retry
-from scripts.adt_usage import summarize  # ADT usage snapshot
+from hub import adt_rollup  # ADT usage rollups (minute/hour/day)
 
 def call_gate(secret_name: str, token_path: str):
     """
@@ -84,7 +84,8 @@ def main():
         token_dig = None
 
     # Day 25: include a short ADT usage snapshot in the audit entry
-    usage_totals = summarize()  # {"operation": X, "message": Y, "query_unit": Z}
+    # (today's totals from the rollup store, no log scan)
+    usage_totals = adt_rollup.default_store().window("day")  # {"operation": X, "message": Y, "query_unit": Z}
 
     audit_entry = {
         "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
@@ -93,6 +94,7 @@ def main():
         "secret_name": secret_name,
         "token_digest": token_dig,
         "adt_usage": usage_totals,
+        "adt_usage_window": "day",
     }
 
     ap = pathlib.Path("audits/chain.log")
@@ -1,24 +1,47 @@
-import json, os, time, hashlib
+import json, os, sys, hashlib
 from datetime import datetime
 
+# Ensure repo root (parent of scripts/) is on sys.path so hub/* imports resolve
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from hub import run_manifest
+
 CONFIG = "configs/day13.yaml"
 EVENTS_DIR = "data/events"
-os.makedirs(EVENTS_DIR, exist_ok=True)
 
-event = {
-    "type": "route_outage",
-    "route_id": "R7",
-    "warehouse_id": "W3",
-    "source": "day13-seed",
-    "severity": "high",
-    "ts": datetime.utcnow().isoformat() + "Z"
-}
+def default_event():
+    return {
+        "type": "route_outage",
+        "route_id": "R7",
+        "warehouse_id": "W3",
+        "source": "day13-seed",
+        "severity": "high",
+        "ts": datetime.utcnow().isoformat() + "Z"
+    }
+
+def seed_event(event=None, events_dir=EVENTS_DIR, run_id=None):
+    """
+    Write a disruption event (the Day 13 default when none is given) and
+    open a run for it in the manifest. Returns (event, path).
+    """
+    if event is None:
+        event = default_event()
+    os.makedirs(events_dir, exist_ok=True)
+
+    payload = json.dumps(event, sort_keys=True).encode()
+    event_id = hashlib.sha256(payload).hexdigest()[:16]
+    path = os.path.join(events_dir, f"{event_id}.json")
 
-payload = json.dumps(event, sort_keys=True).encode()
-event_id = hashlib.sha256(payload).hexdigest()[:16]
-path = os.path.join(EVENTS_DIR, f"{event_id}.json")
+    with open(path, "w") as f:
+        json.dump(event, f, indent=2)
+    run_manifest.record(run_id or run_manifest.new_run_id(), "event", path, event_id)
+    return event, path
 
-with open(path, "w") as f:
-    json.dump(event, f, indent=2)
+def main():
+    _, path = seed_event()
+    print(f"Wrote disruption event: {path}")
 
-print(f"Wrote disruption event: {path}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tail the signal store and turn threshold crossings into pipeline runs.
+
+Usage: PYTHONPATH=. scripts/signal_stream.py [--follow] [--dry-run] [--window 900]
+                                            [--queue 16] [--backpressure coalesce|block]
+                                            [--signals data/signal_store | data/signals.csv]
+
+Thresholds are policies/base.yaml constraints.risk_thresholds. Without
+--follow, processes whatever was appended since the last run and exits.
+--dry-run prints events instead of running the pipeline.
+"""
+import argparse, json, os, sys, time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from hub import signal_store, signal_stream
+
+
+def print_event(event):
+    print(json.dumps(event), flush=True)
+    return event
+
+
+def pipeline_sink(event):
+    res = signal_stream.run_pipeline(event)
+    print(json.dumps({"event": event, "run_id": res.run_id, "bundle": res.bundle_path,
+                      "verdicts": [v.get("verdict") for v in res.verification.get("results", [])]}), flush=True)
+    return res
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Streaming signal ingestion")
+    ap.add_argument("--signals", default=signal_store.STORE_DIR, help="signal store directory or signals CSV")
+    ap.add_argument("--state", default=signal_stream.STATE_FILE, help="offset state file")
+    ap.add_argument("--policy", default=signal_stream.POLICY_PATH)
+    ap.add_argument("--window", type=float, default=900.0, help="rolling window, seconds of signal time")
+    ap.add_argument("--queue", type=int, default=16, help="max queued events")
+    ap.add_argument("--backpressure", choices=("coalesce", "block"), default="coalesce")
+    ap.add_argument("--workers", type=int, default=1, help="concurrent pipeline runs")
+    ap.add_argument("--follow", action="store_true", help="keep tailing until interrupted")
+    ap.add_argument("--interval", type=float, default=1.0, help="poll interval with --follow")
+    ap.add_argument("--dry-run", action="store_true", help="print events, don't run the pipeline")
+    args = ap.parse_args()
+
+    if not os.path.isfile(args.signals):
+        signal_store.open_store(args.signals)  # seeds an empty store from data/signals.csv
+    ing = signal_stream.StreamIngestor(
+        tail=(signal_stream.SignalTail if os.path.isfile(args.signals) else signal_stream.StoreTail)(
+            args.signals, args.state),
+        thresholds=signal_stream.load_thresholds(args.policy),
+        sink=print_event if args.dry_run else pipeline_sink,
+        window_s=args.window, queue_size=args.queue, backpressure=args.backpressure, workers=args.workers,
+    ).start()
+    t0 = time.perf_counter()
+    try:
+        if args.follow:
+            ing.follow(args.interval)
+        else:
+            ing.catch_up()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ing.stop()
+    summary = {"offset": ing.tail.offset, "events": ing.queue.stats, "errors": len(ing.errors),
+               "aggregates": ing.aggregates.snapshot(), "seconds": round(time.perf_counter() - t0, 3)}
+    print(json.dumps(summary), file=sys.stderr)
+    sys.exit(1 if ing.errors else 0)
+
+
+if __name__ == "__main__":
+    main()
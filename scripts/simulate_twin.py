@@ -1,49 +1,68 @@
-import os, json, glob, sys
+import os, json, sys
 from datetime import datetime
 
+# Ensure repo root (parent of scripts/) is on sys.path so hub/* imports resolve
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from hub import run_manifest
+
 PLANS_DIR = "data/plans"
 SIM_DIR = "data/sim"
-os.makedirs(SIM_DIR, exist_ok=True)
 
 def latest_bundle():
-    files = sorted(glob.glob(os.path.join(PLANS_DIR, "*.json")), key=os.path.getmtime)
-    if not files:
+    rec = run_manifest.latest("bundle", os.path.join(PLANS_DIR, "*.json"))
+    if not rec:
         print("No plan bundles found. Run generate_plans.py first.")
         sys.exit(1)
-    with open(files[-1]) as f:
-        return json.load(f), files[-1]
-
-bundle, bundle_file = latest_bundle()
-event = bundle["event"]
-
-sim_results = []
-for p in bundle["plans"]:
-    # Use plan's own expectations as the simulated result (deterministic and local)
-    kpi = p["kpi_expectations"]
-    sim_results.append({
-        "plan_id": p["id"],
-        "strategy": p["strategy"],
-        "inputs": p["inputs"],
-        "simulated": {
-            "stockout_risk_reduction_pct": kpi["stockout_risk_reduction_pct"],
-            "delay_reduction_pct": kpi["delay_reduction_pct"],
-            "cost_usd": p["cost_usd"],
-            "sla_expected_percent": p["sla_expected_percent"]
-        },
-        "ts": datetime.utcnow().isoformat() + "Z"
-    })
-
-out = {
-    "origin_bundle": os.path.basename(bundle_file),
-    "event_type": event["type"],
-    "route_id": event["route_id"],
-    "warehouse_id": event["warehouse_id"],
-    "results": sim_results,
-    "generated_at": datetime.utcnow().isoformat() + "Z"
-}
-
-out_path = os.path.join(SIM_DIR, os.path.splitext(os.path.basename(bundle_file))[0] + "_sim.json")
-with open(out_path, "w") as f:
-    json.dump(out, f, indent=2)
-
-print(f"Wrote simulation results: {out_path}")
+    with open(rec.path) as f:
+        return json.load(f), rec.path, rec.run_id
+
+def simulate_bundle(bundle, bundle_file, sim_dir=SIM_DIR, run_id=None):
+    """
+    Simulate every plan in a bundle and write <bundle_id>_sim.json.
+    Returns (sim, out_path).
+    """
+    event = bundle["event"]
+
+    sim_results = []
+    for p in bundle["plans"]:
+        # Use plan's own expectations as the simulated result (deterministic and local)
+        kpi = p["kpi_expectations"]
+        sim_results.append({
+            "plan_id": p["id"],
+            "strategy": p["strategy"],
+            "inputs": p["inputs"],
+            "simulated": {
+                "stockout_risk_reduction_pct": kpi["stockout_risk_reduction_pct"],
+                "delay_reduction_pct": kpi["delay_reduction_pct"],
+                "cost_usd": p["cost_usd"],
+                "sla_expected_percent": p["sla_expected_percent"]
+            },
+            "ts": datetime.utcnow().isoformat() + "Z"
+        })
+
+    out = {
+        "origin_bundle": os.path.basename(bundle_file),
+        "event_type": event["type"],
+        "route_id": event["route_id"],
+        "warehouse_id": event["warehouse_id"],
+        "results": sim_results,
+        "generated_at": datetime.utcnow().isoformat() + "Z"
+    }
+
+    os.makedirs(sim_dir, exist_ok=True)
+    out_path = os.path.join(sim_dir, os.path.splitext(os.path.basename(bundle_file))[0] + "_sim.json")
+    with open(out_path, "w") as f:
+        json.dump(out, f, indent=2)
+    run_manifest.record(run_id or run_manifest.new_run_id(), "sim", out_path)
+    return out, out_path
+
+def main():
+    bundle, bundle_file, run_id = latest_bundle()
+    _, out_path = simulate_bundle(bundle, bundle_file, run_id=run_id)
+    print(f"Wrote simulation results: {out_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Run ADT-style queries against a local twin snapshot (hub.twin_graph).
+
+Usage: PYTHONPATH=. scripts/twin_query.py [--snapshot twin_snapshot.json] [QUERY ...]
+
+Without a QUERY, runs adt.queries from configs/day13.yaml.
+"""
+import argparse, json, os, sys, time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from hub import policy_model
+from hub.twin_graph import QueryError, TwinGraph
+
+CONFIG_PATH = "configs/day13.yaml"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Query a twin snapshot locally")
+    ap.add_argument("--snapshot", default="twin_snapshot.json")
+    ap.add_argument("queries", nargs="*")
+    args = ap.parse_args()
+
+    with open(args.snapshot) as f:
+        graph = TwinGraph.from_snapshot(json.load(f))
+    queries = args.queries or (policy_model.load(CONFIG_PATH).doc.get("adt") or {}).get("queries") or []
+    status = 0
+    for q in queries:
+        t0 = time.perf_counter()
+        try:
+            rows = graph.query(q)
+        except QueryError as e:
+            print(json.dumps({"query": q, "error": str(e)}))
+            status = 2
+            continue
+        print(json.dumps({"query": q, "count": len(rows), "ms": round((time.perf_counter() - t0) * 1000, 3),
+                          "value": rows}))
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Verify audit_chain.jsonl integrity (entry hashes + prev_hash links).
+
+Usage: scripts/verify_chain.py [--full] [--workers N] [--chain audit_chain.jsonl] [--no-checkpoint]
+
+By default only entries appended since the last verified checkpoint are
+checked; --full re-verifies everything, hashing chunks in parallel.
+Exit codes: 0 OK, 2 entry_hash/JSON mismatch, 3 prev_hash mismatch.
+"""
+import argparse, os, sys
+
+# Ensure repo root (parent of scripts/) is on sys.path so hub/* imports resolve
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from hub import audit_chain
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Verify the audit hash chain")
+    ap.add_argument("--chain", default=audit_chain.CHAIN_FILE)
+    ap.add_argument("--checkpoint", default=audit_chain.CHECKPOINT_FILE)
+    ap.add_argument("--no-checkpoint", action="store_true", help="neither read nor write a checkpoint")
+    ap.add_argument("--full", action="store_true", help="ignore the checkpoint and re-verify every entry")
+    ap.add_argument("--workers", type=int, default=None, help="processes for chunk hashing (default: cores)")
+    args = ap.parse_args()
+
+    if not os.path.exists(args.chain):
+        print("[OK] No chain yet (file missing).")
+        sys.exit(0)
+
+    res = audit_chain.verify(args.chain, None if args.no_checkpoint else args.checkpoint,
+                             full=args.full, workers=args.workers)
+    if not res.ok:
+        print(f"[FAIL] Line {res.error.line}: {res.error.message}")
+        sys.exit(3 if res.error.code == "prev_hash" else 2)
+
+    mode = "incremental" if res.incremental else "full"
+    print(f"[OK] Chain verified ({mode}, {res.checked_lines} new of {res.lines} entries). Head: {res.head}")
+
+
+if __name__ == "__main__":
+    main()
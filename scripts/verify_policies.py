@@ -1,67 +1,125 @@
-import json, sys, glob, os
-from z3 import Real, Bool, Solver, Not, sat
+import json, sys, os, threading
+
+# Ensure repo root (parent of scripts/) is on sys.path so hub/* imports resolve
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from hub import policy_model, run_manifest, verdict_cache
+from z3 import Real, Bool, RealVal, BoolVal, Context, Implies, Solver, Not, sat
 
 PLANS_DIR = "data/plans"
 CONFIG_PATH = "configs/day13.yaml"
 
 def load_latest_bundle():
-    files = sorted(glob.glob(os.path.join(PLANS_DIR, "*.json")), key=os.path.getmtime)
-    if not files:
+    rec = run_manifest.latest("bundle", os.path.join(PLANS_DIR, "*.json"))
+    if not rec:
         print("No plan bundles found. Run generate_plans.py first.")
         sys.exit(1)
-    with open(files[-1]) as f:
-        return json.load(f), files[-1]
+    with open(rec.path) as f:
+        return json.load(f), rec.path
 
 def load_config():
-    import yaml
-    with open(CONFIG_PATH) as f:
-        return yaml.safe_load(f)
+    # Shared, stat-memoized document: re-parsed only when the file changes
+    return policy_model.load(CONFIG_PATH).doc
+
+def _policy_hash(cfg):
+    model = policy_model.load(CONFIG_PATH)
+    return model.canonical_hash if cfg is model.doc else verdict_cache.canonical_digest(cfg)
+
+class BatchVerifier:
+    """
+    Config policies asserted once on a shared solver, each guarded by a
+    tracking literal. A plan is checked by passing its bindings plus the
+    literals as assumptions; on UNSAT each literal is re-checked alone to
+    name the violated policies.
+    Not thread-safe; each instance owns its own Z3 context.
+    """
+    POLICIES = ("budget_cap", "sla_min", "region_mismatch", "pii_access")
+
+    def __init__(self, cfg, ctx=None):
+        self.cfg = cfg
+        self.key = (cfg["budget_cap_usd"], cfg["sla_min_percent"], cfg["region_data_boundary"])
+        ctx = self.ctx = ctx or Context()
+        s = self.s = Solver(ctx=ctx)
+        self.cost = Real("cost", ctx)
+        self.sla = Real("sla", ctx)
+        self.pii = Bool("pii", ctx)
+        self.region_ok = Bool("region_ok", ctx)
+
+        budget_cap = RealVal(str(float(cfg["budget_cap_usd"])), ctx)
+        sla_min = RealVal(str(float(cfg["sla_min_percent"])), ctx)
+
+        # Policies
+        self.lits = {name: Bool(f"policy_{name}", ctx) for name in self.POLICIES}
+        s.add(Implies(self.lits["budget_cap"], self.cost <= budget_cap))     # cost under cap
+        s.add(Implies(self.lits["sla_min"], self.sla >= sla_min))            # SLA above threshold
+        s.add(Implies(self.lits["region_mismatch"], self.region_ok))         # must match configured boundary
+        s.add(Implies(self.lits["pii_access"], Not(self.pii)))               # PII must not be accessed
+
+    def check(self, plan):
+        ctx = self.ctx
+        bindings = [
+            self.cost == RealVal(str(float(plan["cost_usd"])), ctx),
+            self.sla == RealVal(str(float(plan["sla_expected_percent"])), ctx),
+            self.pii == BoolVal(bool(plan.get("pii_access", False)), ctx),
+            self.region_ok == BoolVal(plan.get("region_data_boundary") == self.cfg["region_data_boundary"], ctx),
+        ]
+        if self.s.check(*bindings, *self.lits.values()) == sat:
+            return True, None
+        # UNSAT: name every policy that fails on its own for this plan
+        violated = [name for name, lit in self.lits.items() if self.s.check(*bindings, lit) != sat]
+        return False, ", ".join(violated)
+
+# Plan fields the policies read; the verdict cache keys on these only
+PLAN_FIELDS = ("cost_usd", "sla_expected_percent", "region_data_boundary", "pii_access")
+# Verdict cache scope; bump the version whenever BatchVerifier.check's logic or result shape changes
+CACHE_SCOPE = "verify_policies/v2"
+
+_verifiers = threading.local()
+
+def _verifier_for(cfg):
+    # Reuse this thread's solver while the config policies are unchanged
+    v = getattr(_verifiers, "current", None)
+    if v is None or v.key != (cfg["budget_cap_usd"], cfg["sla_min_percent"], cfg["region_data_boundary"]):
+        v = _verifiers.current = BatchVerifier(cfg)
+    return v
+
+def _cached_check(plan, cfg, policy_hash):
+    ok, cx = verdict_cache.default_cache().get_or_compute(
+        CACHE_SCOPE, policy_hash, verdict_cache.plan_digest(plan, PLAN_FIELDS),
+        lambda: _verifier_for(cfg).check(plan),
+    )
+    return ok, cx
 
 def verify_plan(plan, cfg):
-    s = Solver()
-    cost = Real("cost")
-    sla = Real("sla")
-    pii = Bool("pii")
-    region_ok = Bool("region_ok")
-
-    s.add(cost == float(plan["cost_usd"]))
-    s.add(sla == float(plan["sla_expected_percent"]))
-    s.add(pii == bool(plan.get("pii_access", False)))
-    s.add(region_ok == (plan.get("region_data_boundary") == cfg["region_data_boundary"]))
-
-    budget_cap = float(cfg["budget_cap_usd"])
-    sla_min = float(cfg["sla_min_percent"])
-
-    # Policies
-    s.add(cost <= budget_cap)    # cost under cap
-    s.add(sla >= sla_min)        # SLA above threshold
-    s.add(region_ok)             # must match configured boundary
-    s.add(Not(pii))              # PII must not be accessed
-
-    verdict = s.check()
-    counterexample = None
-    if verdict != sat:
-        counterexample = str(s.model())
-    return verdict == sat, counterexample
+    return _cached_check(plan, cfg, _policy_hash(cfg))
 
-def main():
-    cfg = load_config()
-    bundle, path = load_latest_bundle()
+def verify_bundle(bundle, path, cfg):
+    """
+    Check every plan in a bundle against the config policies.
+    Returns the same document main() prints.
+    """
+    policy_hash = _policy_hash(cfg)
     results = []
     for plan in bundle["plans"]:
-        ok, cx = verify_plan(plan, cfg)
+        ok, cx = _cached_check(plan, cfg, policy_hash)
         results.append({
             "plan_id": plan["id"],
             "strategy": plan["strategy"],
             "sat": ok,
             "counterexample": cx
         })
-    out = {
+    return {
         "bundle_file": os.path.basename(path),
         "policy_version": cfg["policy_version"],
         "results": results
     }
-    print(json.dumps(out, indent=2))
+
+def main():
+    cfg = load_config()
+    bundle, path = load_latest_bundle()
+    print(json.dumps(verify_bundle(bundle, path, cfg), indent=2))
 
 if __name__ == "__main__":
     main()
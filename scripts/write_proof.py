@@ -1,18 +1,24 @@
-import os, json, glob, hashlib, time
+import os, sys, json, hashlib
 from datetime import datetime, timezone
 
+# Ensure repo root (parent of scripts/) is on sys.path so hub/* imports resolve
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from hub import chain_append, policy_model, run_manifest
+
 CONFIG_PATH = "configs/day13.yaml"
 PLANS_DIR = "data/plans"
 SIM_DIR = "data/sim"
 AUDIT_DIR = "audits"
-os.makedirs(AUDIT_DIR, exist_ok=True)
 
-def load_latest(path_glob):
-    files = sorted(glob.glob(path_glob), key=os.path.getmtime)
-    if not files:
+def load_latest(kind, path_glob):
+    rec = run_manifest.latest(kind, path_glob)
+    if not rec:
         raise SystemExit(f"No files found for pattern: {path_glob}")
-    with open(files[-1]) as f:
-        return json.load(f), files[-1]
+    with open(rec.path) as f:
+        return json.load(f), rec.path, rec.run_id
 
 def utc_now():
     return datetime.now(timezone.utc).isoformat()
@@ -25,41 +31,31 @@ def file_sha256(path: str) -> str:
         return sha256_hex(f.read())
 
 def policy_hash_from_config():
-    import yaml
-    with open(CONFIG_PATH) as f:
-        cfg = yaml.safe_load(f)
     # Hash policy-relevant fields to create a stable policy version hash
-    mat = json.dumps({
-        "policy_version": cfg.get("policy_version"),
-        "budget_cap_usd": cfg.get("budget_cap_usd"),
-        "sla_min_percent": cfg.get("sla_min_percent"),
-        "region_data_boundary": cfg.get("region_data_boundary")
-    }, sort_keys=True).encode()
-    return sha256_hex(mat)
-
-def previous_chain_head():
-    chain_path = os.path.join(AUDIT_DIR, "chain.meta")
-    if not os.path.exists(chain_path):
-        return None
-    with open(chain_path) as f:
-        meta = json.load(f)
-    return meta.get("head_digest")
-
-def write_chain_head(new_head: str):
-    chain_path = os.path.join(AUDIT_DIR, "chain.meta")
-    with open(chain_path, "w") as f:
-        json.dump({"head_digest": new_head, "updated_at": utc_now()}, f, indent=2)
-
-def main():
-    # Inputs
-    bundle, bundle_path = load_latest(os.path.join(PLANS_DIR, "*.json"))
-    sim, sim_path = load_latest(os.path.join(SIM_DIR, "*_sim.json"))
-
+    # (precomputed once per config revision by hub.policy_model)
+    model = policy_model.load(CONFIG_PATH)
+    return model.config_hash or policy_model.config_hash_of(model.doc)
+
+def proof_chain(out_log=None):
+    return chain_append.ProofChain(out_log or os.path.join(AUDIT_DIR, "day13_proof.jsonl"),
+                                   os.path.join(AUDIT_DIR, "chain.meta"))
+
+def chain_lock():
+    """
+    Serialize read-head -> append -> write-head across threads (Streamlit
+    sessions) and processes (CLI runs) so concurrent proofs can't fork the chain.
+    """
+    return chain_append.chain_lock(proof_chain().lock_path)
+
+def write_proof(bundle, bundle_path, sim, sim_path, run_id=None):
+    """
+    Append a hash-chained decision proof for a bundle and its simulation.
+    Returns the entry as written (with entry_digest and chain_head).
+    """
     # Placeholder for attestation digest (filled in on Day 15/16)
     attestation_digest = "attest:placeholder"
 
     policy_hash = policy_hash_from_config()
-    prev_head = previous_chain_head()
 
     # Minimal solver snapshot (we re-run a quick check based on plan fields)
     solver_snapshot = {
@@ -68,7 +64,8 @@ def main():
         "result": "SAT"  # from Day 13 verify output
     }
 
-    entry = {
+    out_log = os.path.join(AUDIT_DIR, "day13_proof.jsonl")
+    item = {
         "type": "decision_proof",
         "bundle_file": os.path.basename(bundle_path),
         "bundle_sha256": file_sha256(bundle_path),
@@ -79,27 +76,41 @@ def main():
         "solver": solver_snapshot,
         "twin_deltas": sim["results"],
         "ts": utc_now(),
-        "prev_head": prev_head
     }
+    # Hash-chain: new head = H(prev_head || entry_digest), appended under chain_lock()
+    with chain_append.ChainAppender(proof_chain(out_log), fsync="none") as appender:
+        entry = appender.append(item)
+    run_manifest.record(run_id or run_manifest.new_run_id(), "proof", out_log, entry["entry_digest"])
+    return entry
+
+def load_sim(bundle_path, run_id):
+    """
+    The bundle's simulation: the one recorded for its run, or the latest
+    legacy *_sim.json for a bundle without a run id. Refuses a simulation
+    of another bundle.
+    """
+    if run_id is None:
+        sim, sim_path, _ = load_latest("sim", os.path.join(SIM_DIR, "*_sim.json"))
+    else:
+        rec = run_manifest.default_manifest().get(run_id, "sim")
+        if not rec:
+            raise SystemExit(f"No simulation recorded for run {run_id}. Run simulate_twin.py first.")
+        sim_path = rec.path
+        with open(sim_path) as f:
+            sim = json.load(f)
+    if sim.get("origin_bundle") != os.path.basename(bundle_path):
+        raise SystemExit(f"{sim_path} simulates {sim.get('origin_bundle')}, not {os.path.basename(bundle_path)}")
+    return sim, sim_path
 
-    entry_bytes = json.dumps(entry, sort_keys=True).encode()
-    entry_digest = sha256_hex(entry_bytes)
-    entry["entry_digest"] = entry_digest
-
-    # Hash-chain: new head = H(prev_head || entry_digest)
-    head_mat = ((prev_head or "") + entry_digest).encode()
-    new_head = sha256_hex(head_mat)
-    entry["chain_head"] = new_head
-
-    # Append to JSONL
-    out_log = os.path.join(AUDIT_DIR, "day13_proof.jsonl")
-    with open(out_log, "a") as f:
-        f.write(json.dumps(entry) + "\n")
+def main():
+    # Inputs
+    bundle, bundle_path, run_id = load_latest("bundle", os.path.join(PLANS_DIR, "*.json"))
+    sim, sim_path = load_sim(bundle_path, run_id)
 
-    write_chain_head(new_head)
-    print(f"Wrote proof entry with digest={entry_digest}")
-    print(f"New chain head={new_head}")
-    print(f"Log: {out_log}")
+    entry = write_proof(bundle, bundle_path, sim, sim_path, run_id=run_id)
+    print(f"Wrote proof entry with digest={entry['entry_digest']}")
+    print(f"New chain head={entry['chain_head']}")
+    print(f"Log: {os.path.join(AUDIT_DIR, 'day13_proof.jsonl')}")
 
 if __name__ == "__main__":
     main()
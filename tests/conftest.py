@@ -0,0 +1,29 @@
+import json
+
+import pytest
+
+from hub import audit_chain
+
+
+@pytest.fixture(autouse=True)
+def verdict_cache_path(tmp_path, monkeypatch):
+    # Keep hub.verdict_cache.default_cache() out of the checkout's artifacts/
+    path = tmp_path / "verdict_cache.sqlite"
+    monkeypatch.setenv("VERDICT_CACHE_PATH", str(path))
+    return path
+
+
+def _append_chain(path, n, prev=None):
+    with open(path, "a") as f:
+        for i in range(n):
+            entry = {"timestamp": "2025-01-01T00:00:00Z", "prev_hash": prev, "lineage": {"i": i}}
+            entry["entry_hash"] = audit_chain.sha256_json(entry)
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            prev = entry["entry_hash"]
+    return prev
+
+
+@pytest.fixture
+def append_chain():
+    """append_chain(path, n, prev=None): write n linked audit_chain.jsonl entries, return the head."""
+    return _append_chain
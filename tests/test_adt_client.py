@@ -0,0 +1,47 @@
+from hub.adt_client import TokenBucket, TwinUpdateClient, merge_ops
+from hub.adt_meter import UsageMeter
+from ops.sim.adt_standin import ADTStandIn
+
+
+def test_merge_ops_last_write_wins():
+    ops = merge_ops([{"op": "replace", "path": "/t", "value": 1}, {"op": "add", "path": "/m", "value": True}],
+                    [{"op": "replace", "path": "/t", "value": 2}])
+    assert ops == [{"op": "replace", "path": "/t", "value": 2}, {"op": "add", "path": "/m", "value": True}]
+
+
+def test_coalesced_updates_against_standin(tmp_path):
+    meter = UsageMeter(str(tmp_path / "usage.jsonl"), flush_interval=60)
+    with ADTStandIn() as adt:
+        with TwinUpdateClient(adt.url, batch_size=10, meter=meter) as client:
+            for i in range(5):
+                for t in range(3):
+                    client.replace(f"twin-{t}", "/temperature", 20 + i)
+            client.add("twin-0", "/marker", True)
+            result = client.flush()
+            assert (result.twins, result.ops, result.failed) == (3, 4, {})
+
+            page = client.query("SELECT TOP 2 T FROM digitaltwins T")
+        assert adt.stats["patches"] == 3
+        assert adt.stats["connections"] <= 4
+        assert adt.twins["twin-0"] == {"$dtId": "twin-0", "temperature": 24, "marker": True}
+        assert [t["$dtId"] for t in page["items"]] == ["twin-0", "twin-1"]
+    assert meter.totals() == {"operation": 4, "message": 3, "query_unit": 2}
+    meter.close()
+
+
+def test_retries_throttled_requests():
+    with ADTStandIn(max_rps=20, autocreate=False) as adt:
+        adt.twins.update({f"t{i}": {"$dtId": f"t{i}"} for i in range(30)})
+        with TwinUpdateClient(adt.url, retries=10, metered=False) as client:
+            for i in range(30):
+                client.replace(f"t{i}", "/v", i)
+            client.replace("missing", "/v", 0)
+            result = client.flush()
+        assert adt.stats["throttled"] > 0
+        assert list(result.failed) == ["missing"] and "404" in result.failed["missing"]
+        assert all(adt.twins[f"t{i}"]["v"] == i for i in range(30))
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=1000, capacity=5)
+    assert sum(bucket.try_acquire() for _ in range(10)) == 5
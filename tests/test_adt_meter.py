@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from hub.adt_meter import UsageMeter
+
+
+def test_counters_flush_and_resume(tmp_path):
+    log = tmp_path / "usage.jsonl"
+    m = UsageMeter(str(log), flush_interval=60, window=3)
+    for kind in ("operation", "message", "query_unit", "query_unit"):
+        m.record(kind, 2)
+    assert not log.exists()  # buffered until the flush thread (or flush()) runs
+    assert m.totals() == {"operation": 2, "message": 2, "query_unit": 4}
+    assert m.summarize() == {"operation": 0, "message": 2, "query_unit": 4}
+    assert m.summarize(1) == {"operation": 0, "message": 0, "query_unit": 2}
+    m.close()
+    assert len(log.read_text().splitlines()) == 4
+
+    # Another writer appends behind the snapshot; a new meter picks it up
+    with open(log, "a") as f:
+        f.write(json.dumps({"ts": "t", "kind": "operation", "count": 5, "note": ""}) + "\n")
+    m2 = UsageMeter(str(log), window=3)
+    assert m2.totals() == {"operation": 7, "message": 2, "query_unit": 4}
+    assert m2.summarize(10) == {"operation": 7, "message": 2, "query_unit": 4}
+    m2.record("message")
+    m2.close()
+    snap = json.loads((tmp_path / "usage.jsonl.totals.json").read_text())
+    assert snap["totals"] == {"operation": 7, "message": 3, "query_unit": 4}
+    assert snap["offset"] == log.stat().st_size
+
+
+def test_external_records_enter_window_once(tmp_path):
+    log = tmp_path / "usage.jsonl"
+    a = UsageMeter(str(log), flush_interval=60)
+    a.record("operation")
+    a.close()
+    with open(log, "a") as f:
+        f.write(json.dumps({"ts": "t", "kind": "operation", "count": 5, "note": ""}) + "\n")
+    b = UsageMeter(str(log), flush_interval=60)
+    b.record("message")
+    b.flush()
+    assert b.summarize() == b.totals() == {"operation": 6, "message": 1, "query_unit": 0}
+    b.close()
+
+
+def test_failed_flush_requeues_records(tmp_path, monkeypatch):
+    log = tmp_path / "usage.jsonl"
+    m = UsageMeter(str(log), flush_interval=60)
+    m.record("operation", 3)
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(m, "_catch_up", fail)
+    with pytest.raises(OSError):
+        m.flush()
+    monkeypatch.undo()
+    m.record("message")
+    m.close()
+    assert [json.loads(ln)["kind"] for ln in log.read_text().splitlines()] == ["operation", "message"]
+    assert UsageMeter(str(log)).totals() == {"operation": 3, "message": 1, "query_unit": 0}
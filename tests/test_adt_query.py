@@ -0,0 +1,57 @@
+import json
+
+import httpx
+import pytest
+
+from hub.adt_client import TwinUpdateClient
+from hub.adt_meter import UsageMeter
+from hub.adt_query import BudgetExceeded, BudgetScheduler, QueryCache, QueryLayer, normalize_query
+from ops.sim.adt_standin import ADTStandIn
+
+
+def test_normalize_query_keeps_literals():
+    assert normalize_query("select  top 5 T\n from digitaltwins T where T.name = 'a  b';") == \
+        "SELECT TOP 5 T FROM DIGITALTWINS T WHERE T.name = 'a  b'"
+
+
+def test_budget_refills_over_period(tmp_path):
+    b = BudgetScheduler(max_ops=2, max_qu=1, period=1000, path=str(tmp_path / "budget.json"))
+    b.acquire(ops=1, qu=1)
+    with pytest.raises(BudgetExceeded):
+        b.acquire(ops=1, qu=1)
+    b.acquire(ops=1)                       # ops still available
+    assert b.available()["ops"] < 0.1
+    # Shared state: a second scheduler (another run) sees the same budget
+    b2 = BudgetScheduler(max_ops=2, max_qu=1, period=0.05, path=str(tmp_path / "budget.json"))
+    b2.acquire(ops=1, qu=1, max_wait=1.0)  # queued until refill
+
+
+def test_query_layer_caches_and_meters(tmp_path):
+    meter = UsageMeter(str(tmp_path / "usage.jsonl"), flush_interval=60)
+    with ADTStandIn() as adt:
+        adt.twins.update({f"t{i}": {"$dtId": f"t{i}"} for i in range(3)})
+        with TwinUpdateClient(adt.url, meter=meter) as client:
+            layer = QueryLayer(client, QueryCache(str(tmp_path / "cache.json"), ttl=60),
+                               BudgetScheduler(5, 2, path=str(tmp_path / "budget.json")))
+            first = layer.query("SELECT TOP 2 T FROM digitaltwins T")
+            second = layer.query("select top 2 T from DIGITALTWINS T;")
+            assert not first["cached"] and second["cached"]
+            assert second["items"] == first["items"] and second["query_charge"] == 0
+            with pytest.raises(BudgetExceeded):   # 1.2 of 2 QU spent; a new query reserves 1
+                layer.query("SELECT T FROM digitaltwins T")
+        assert adt.stats["queries"] == 1
+    assert meter.totals() == {"operation": 1, "message": 0, "query_unit": 2}
+    meter.close()
+    notes = [json.loads(ln)["note"] for ln in (tmp_path / "usage.jsonl").read_text().splitlines()]
+    assert any(n.startswith("cache hit") for n in notes) and any(n.startswith("over budget") for n in notes)
+
+
+def test_failed_query_refunds_budget(tmp_path):
+    budget = BudgetScheduler(max_ops=5, max_qu=2, period=1000, path=str(tmp_path / "budget.json"))
+    with ADTStandIn() as adt:
+        with TwinUpdateClient(adt.url, metered=False) as client:
+            layer = QueryLayer(client, QueryCache(str(tmp_path / "cache.json")), budget)
+            for _ in range(3):
+                with pytest.raises(httpx.HTTPStatusError):
+                    layer.query("SELECT nonsense")
+    assert budget.available() == pytest.approx({"ops": 5, "qu": 2}, abs=0.01)
@@ -0,0 +1,40 @@
+import json
+
+from hub import adt_rollup
+from hub.adt_meter import UsageMeter
+from hub.adt_rollup import RollupStore
+
+DAY = 86400
+
+
+def test_range_queries_use_coarse_buckets(tmp_path):
+    store = RollupStore(str(tmp_path / "r"))
+    t0 = 10 * DAY
+    events = [(t0 + 30, "operation", 1), (t0 + 3 * 3600 + 90, "query_unit", 2),
+              (t0 + DAY + 5, "message", 4), (t0 + 2 * DAY + 7200 + 61, "operation", 8)]
+    for epoch, kind, n in events:
+        store.add(epoch, kind, n)
+    store.commit(store.take_pending(), 0)
+    for start, end in [(t0, t0 + 3 * DAY), (t0 + 60, t0 + 2 * DAY + 7200 + 60), (t0 + 3 * 3600, t0 + DAY + 60)]:
+        want = {k: 0 for k in adt_rollup.KINDS}
+        for epoch, kind, n in events:
+            if start // 60 * 60 <= epoch < -(-end // 60) * 60:
+                want[kind] += n
+        assert store.usage(start, end) == want
+    assert adt_rollup._segments(t0 + 60, t0 + DAY + 120) == [
+        (60, t0 + 60, t0 + 3600), (3600, t0 + 3600, t0 + DAY), (60, t0 + DAY, t0 + DAY + 120)]
+    assert [r["operation"] for r in store.series("day", t0, t0 + 3 * DAY)] == [1, 0, 8]
+
+
+def test_meter_feeds_rollups_and_folds_external_lines(tmp_path):
+    log = tmp_path / "usage.jsonl"
+    log.write_text(json.dumps({"ts": "2025-01-01T00:00:10Z", "kind": "operation", "count": 3}) + "\n")
+    store = RollupStore(str(tmp_path / "r"))
+    m = UsageMeter(str(log), flush_interval=60, rollup=store)
+    m.record("query_unit", 2)
+    assert store.window("day")["query_unit"] == 2  # visible before the flush
+    m.close()
+    assert store.window("day")["query_unit"] == 2
+    assert store.usage(1735689600, 1735689600 + 60)["operation"] == 3
+    assert store.log_offset() == log.stat().st_size
+    assert adt_rollup.within_limits(store.window("day"), {"max_ops": 5, "max_qu": 1}) is False
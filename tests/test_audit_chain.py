@@ -0,0 +1,33 @@
+from hub import audit_chain
+
+
+def test_incremental_resumes_from_checkpoint(tmp_path, append_chain):
+    chain, cp = tmp_path / "chain.jsonl", tmp_path / "cp.json"
+    head = append_chain(chain, 5)
+    res = audit_chain.verify(str(chain), str(cp))
+    assert res.ok and res.head == head and res.lines == 5 and not res.incremental
+    head = append_chain(chain, 3, head)
+    res = audit_chain.verify(str(chain), str(cp))
+    assert res.ok and res.incremental and res.checked_lines == 3 and res.head == head
+
+
+def test_parallel_full_pass_finds_broken_link(tmp_path, append_chain):
+    chain = tmp_path / "chain.jsonl"
+    head = append_chain(chain, 40)
+    res = audit_chain.verify(str(chain), None, full=True, workers=2, chunk_bytes=512)
+    assert res.ok and res.head == head and res.lines == 40
+
+    lines = chain.read_text().splitlines(keepends=True)
+    del lines[20]  # breaks the prev_hash link at line 21
+    chain.write_text("".join(lines))
+    res = audit_chain.verify(str(chain), None, workers=2, chunk_bytes=512)
+    assert not res.ok and res.error.code == "prev_hash" and res.error.line == 21
+
+
+def test_rewritten_tail_forces_full_pass(tmp_path, append_chain):
+    chain, cp = tmp_path / "chain.jsonl", tmp_path / "cp.json"
+    append_chain(chain, 4)
+    audit_chain.verify(str(chain), str(cp))
+    chain.write_text(chain.read_text().replace('"i":3', '"i":9'))
+    res = audit_chain.verify(str(chain), str(cp))
+    assert not res.ok and not res.incremental and res.error.code == "entry_hash" and res.error.line == 4
@@ -0,0 +1,55 @@
+import hashlib
+
+import pytest
+
+from hub import audit_merkle
+from hub.audit_merkle import AuditMerkle, leaf_hash, node_hash, verify_consistency, verify_inclusion
+
+
+def mth(leaves):
+    # RFC 6962 reference definition
+    if not leaves:
+        return hashlib.sha256(b"").digest()
+    if len(leaves) == 1:
+        return leaf_hash(leaves[0])
+    k = audit_merkle._split_point(len(leaves))
+    return node_hash(mth(leaves[:k]), mth(leaves[k:]))
+
+
+def test_roots_and_proofs_verify(tmp_path):
+    tree = AuditMerkle(str(tmp_path / "m.sqlite"))
+    hashes = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(33)]
+    for i, h in enumerate(hashes):
+        assert tree.append(h) == i
+    for n in range(1, 34):
+        root = tree.root(n)
+        assert root == mth(hashes[:n]).hex()
+        for i in range(n):
+            assert verify_inclusion(hashes[i], i, n, tree.inclusion_proof(i, n), root)
+        for m in range(1, n + 1):
+            assert verify_consistency(m, n, tree.root(m), root, tree.consistency_proof(m, n))
+    assert not verify_inclusion(hashes[1], 2, 33, tree.inclusion_proof(2), tree.root())
+    assert not verify_consistency(5, 33, tree.root(6), tree.root(), tree.consistency_proof(5))
+
+
+def test_sync_follows_chain(tmp_path, append_chain):
+    chain = tmp_path / "chain.jsonl"
+    tree = AuditMerkle(str(tmp_path / "m.sqlite"))
+    head = append_chain(chain, 5)
+    assert tree.sync(str(chain)) == 5
+    append_chain(chain, 2, head)
+    assert tree.sync(str(chain)) == 7
+    assert tree.index_of(head) == 4
+    chain.write_text("")
+    with pytest.raises(ValueError):
+        tree.sync(str(chain))
+
+
+def test_sync_refuses_another_chain(tmp_path, append_chain):
+    tree = AuditMerkle(str(tmp_path / "m.sqlite"))
+    append_chain(tmp_path / "chain.jsonl", 3)
+    append_chain(tmp_path / "other.jsonl", 2)
+    assert tree.sync(str(tmp_path / "chain.jsonl")) == 3
+    with pytest.raises(ValueError, match="indexes"):
+        tree.sync(str(tmp_path / "other.jsonl"))
+    assert tree.size() == 3
@@ -0,0 +1,36 @@
+import itertools
+
+from hub.policy_revision import Plan, Policy, check_plan
+from scripts import auto_revise
+
+POLICY = Policy(budget_cap=10000.0, sla_min=96.0, allow_cross_region=False, max_delay_minutes=45)
+
+
+def test_repair_is_minimal_and_matches_solver():
+    for policy in (POLICY, Policy(10000.0, 96.0, True, 45), Policy(-100.0, 96.0, False, -10)):
+        for cost, delay, region, pii in itertools.product([-250.5, -50, 0, 10000, 12000.5], [-30, -5, 45, 70],
+                                                          ["EU", "US"], [True, False]):
+            plan = Plan("R7", cost, delay, region, pii)
+            res = auto_revise.repair(policy, plan)
+            assert res == auto_revise.repair_z3(policy, plan)
+            assert res["final"] == "SAT" and check_plan(policy, Plan(**res["plan"])).sat
+            violating = {f for f, bad in [("added_cost", cost > policy.budget_cap),
+                                          ("expected_delay_minutes", delay > policy.max_delay_minutes),
+                                          ("data_region", region != "EU" and not policy.allow_cross_region),
+                                          ("pii_used", pii)] if bad}
+            assert {c["field"] for c in res["changes"]} == violating
+
+
+def test_repair_clamps_to_nearest_compliant_value():
+    res = auto_revise.repair(POLICY, Plan("R7", 12500.0, 75, "US", True))
+    assert res["plan"] == {"route": "R7", "added_cost": 10000.0, "expected_delay_minutes": 45,
+                           "data_region": "EU", "pii_used": False}
+    assert res["changed_fields"] == 4 and res["distance"] == {"added_cost": 2500.0, "expected_delay_minutes": 30}
+    assert auto_revise.repair(POLICY, Plan("R7", 900.0, 10, "EU", False))["changes"] == []
+
+
+def test_repair_negative_limits_like_check_plan():
+    policy, plan = Policy(-1.0, 96.0, False, -5), Plan("R7", 100.0, 10, "EU", False)
+    res = auto_revise.repair(policy, plan)
+    assert res["final"] == "SAT" and (res["plan"]["added_cost"], res["plan"]["expected_delay_minutes"]) == (-1.0, -5)
+    assert auto_revise.repair_z3(policy, plan) == res
@@ -0,0 +1,27 @@
+import json
+import os
+
+from scripts import bench_suite
+
+
+def test_compare_flags_regressions_and_improvements():
+    base = {"a": {"sec_per_op": 1.0}, "b": {"sec_per_op": 1.0}, "c": {"sec_per_op": 1.0}, "gone": {"sec_per_op": 1.0}}
+    cur = {"a": {"sec_per_op": 1.3}, "b": {"sec_per_op": 0.7}, "c": {"sec_per_op": 1.1}, "added": {"sec_per_op": 1.0}}
+    r = bench_suite.compare(base, cur, 0.25)
+    assert r["regressions"] == ["a"] and r["improvements"] == ["b"]
+    assert r["missing"] == ["gone"] and r["new"] == ["added"]
+    assert r["cases"]["c"]["ratio"] == 1.1
+
+
+def test_baseline_covers_every_case():
+    with open(os.path.join(bench_suite.REPO_ROOT, bench_suite.BASELINE)) as f:
+        saved = json.load(f)["results"]
+    assert sorted(saved) == sorted(k for k, _, _ in bench_suite.case_keys())
+
+
+def test_run_measures_selected_case(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    res = bench_suite.run(only="check_plan[plans=1]", repeat=1, min_time=0.001)
+    assert list(res) == ["policy_revision.check_plan[plans=1]"]
+    assert res["policy_revision.check_plan[plans=1]"]["sec_per_op"] > 0
+    assert os.getcwd() == str(tmp_path)
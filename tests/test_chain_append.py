@@ -0,0 +1,69 @@
+import hashlib
+import json
+
+import pytest
+
+from hub import audit_chain
+from hub.chain_append import AuditChain, ChainAppender, ProofChain, RunbookChain, parse_fsync
+from scripts import chain_append as chain_append_cli
+
+
+def test_audit_batch_verifies_and_continues_head(tmp_path):
+    fmt = AuditChain(str(tmp_path / "chain.jsonl"), str(tmp_path / "head.json"), merkle=False)
+    with ChainAppender(fmt, fsync="every:3") as app:
+        first = app.append_many([{"i": i} for i in range(5)])
+        second = app.append({"i": 5})
+    assert second["prev_hash"] == first[-1]["entry_hash"]
+    assert fmt.read_head() == second["entry_hash"]
+    res = audit_chain.verify(fmt.chain_path, None)
+    assert res.ok and res.lines == 6 and res.head == second["entry_hash"]
+
+
+def test_proof_chain_heads(tmp_path):
+    fmt = ProofChain(str(tmp_path / "proof.jsonl"), str(tmp_path / "chain.meta"))
+    with ChainAppender(fmt, fsync="interval:0.05") as app:
+        a, b = app.append_many([{"type": "decision_proof", "n": 1}, {"type": "decision_proof", "n": 2}])
+    digest = hashlib.sha256(json.dumps({"type": "decision_proof", "n": 2, "prev_head": a["chain_head"]},
+                                       sort_keys=True).encode()).hexdigest()
+    assert b["entry_digest"] == digest
+    assert b["chain_head"] == hashlib.sha256((a["chain_head"] + digest).encode()).hexdigest()
+    assert fmt.read_head() == b["chain_head"]
+
+
+def test_runbook_chain_matches_jq_hashing(tmp_path):
+    fmt = RunbookChain(str(tmp_path / "chain.log"))
+    with ChainAppender(fmt, fsync="none") as app:
+        a = app.append({"ts": "t0", "released": True})
+        b = app.append({"ts": "t1", "released": False})
+    assert "prev_hash" not in a
+    canon = '{"ts":"t1","released":false,"prev_hash":"%s"}' % a["hash"]
+    assert b["hash"] == hashlib.sha256(canon.encode()).hexdigest()
+    assert fmt.read_head() == b["hash"]
+
+
+def test_parse_fsync_rejects_unknown():
+    assert parse_fsync("every:10") == ("every", 10)
+    with pytest.raises(ValueError):
+        parse_fsync("sometimes")
+
+
+def test_other_chain_gets_own_head_and_no_merkle(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert AuditChain().merkle and not AuditChain("other.jsonl").merkle
+    fmt = chain_append_cli.make_format("audit", "/tmp/x/other.jsonl")
+    assert fmt.head_path == "/tmp/x/other.head.json" and fmt.lock_path.startswith("/tmp/x/")
+    assert chain_append_cli.make_format("audit", "audit_chain.jsonl").head_path == "artifacts/chain_head.json"
+    assert chain_append_cli.make_format("proof", "p.jsonl", "p.meta").head_path == "p.meta"
+    assert chain_append_cli.make_format("runbook", "r.log").chain_path == "r.log"
+    with pytest.raises(ValueError):
+        chain_append_cli.make_format("audit", "audit_chain.jsonl", "elsewhere.json")
+
+
+def test_merkle_failure_does_not_fail_commit(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "artifacts").mkdir()
+    (tmp_path / "artifacts" / "audit_merkle.sqlite").write_text("not a database")
+    with ChainAppender(AuditChain()) as app:
+        entry = app.append({"i": 0})
+    assert AuditChain().read_head() == entry["entry_hash"]
+    assert "Merkle index not updated" in capsys.readouterr().err
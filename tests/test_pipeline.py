@@ -0,0 +1,87 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from hub import pipeline, plan_search, run_manifest
+from scripts import write_proof
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_run_inprocess(tmp_path, monkeypatch):
+    shutil.copytree(REPO_ROOT / "configs", tmp_path / "configs")
+    monkeypatch.chdir(tmp_path)
+
+    res = pipeline.run(with_proof=True)
+    assert Path(res.bundle_path).exists() and Path(res.sim_path).exists()
+    assert [r["plan_id"] for r in res.verification["results"]] == [p["id"] for p in res.bundle["plans"]]
+    assert res.bundle["plans"] and res.bundle["search"]["complete"]
+    assert all(r["sat"] for r in res.verification["results"])
+    assert res.sim["origin_bundle"] == Path(res.bundle_path).name
+    assert res.proof["bundle_file"] == Path(res.bundle_path).name
+
+
+def test_manifest_records_run(tmp_path, monkeypatch):
+    shutil.copytree(REPO_ROOT / "configs", tmp_path / "configs")
+    monkeypatch.chdir(tmp_path)
+
+    res = pipeline.run(with_proof=True)
+    recs = run_manifest.default_manifest().run(res.run_id)
+    assert set(recs) == {"event", "bundle", "sim", "proof"}
+    assert recs["bundle"].path == res.bundle_path
+    assert run_manifest.latest("sim").path == res.sim_path
+
+
+def test_run_without_feasible_plan_writes_no_proof(tmp_path, monkeypatch):
+    shutil.copytree(REPO_ROOT / "configs", tmp_path / "configs")
+    monkeypatch.chdir(tmp_path)
+    snapshot = {"warehouses": {"W1": {"inventory": 0, "demand": 500}}, "routes": {"R1": {"latency_minutes": 90}}}
+    event = {"type": "route_outage", "route_id": "R1", "warehouse_id": "W1", "severity": "critical"}
+
+    with pytest.raises(plan_search.NoFeasiblePlan):
+        pipeline.run(event, snapshot=snapshot, run_id="r-empty")
+    assert set(run_manifest.default_manifest().run("r-empty")) == {"snapshot", "event"}
+    assert not Path("audits/day13_proof.jsonl").exists()
+
+
+def test_write_proof_cli_uses_the_bundles_own_sim(tmp_path, monkeypatch):
+    shutil.copytree(REPO_ROOT / "configs", tmp_path / "configs")
+    monkeypatch.chdir(tmp_path)
+
+    other = pipeline.run(with_proof=False)
+    event, event_path = pipeline.seed_event(None, "r-cli")
+    bundle, bundle_path = pipeline.gen_plans(event, event_path, "r-cli")
+    # The latest sim belongs to another run's bundle
+    with pytest.raises(SystemExit, match="No simulation recorded for run r-cli"):
+        write_proof.main()
+    run_manifest.record("r-cli", "sim", other.sim_path)
+    with pytest.raises(SystemExit, match="simulates"):
+        write_proof.main()
+
+    sim, sim_path = pipeline.simulate(bundle, bundle_path, "r-cli")
+    write_proof.main()
+    entry = json.loads(Path("audits/day13_proof.jsonl").read_text().splitlines()[-1])
+    assert (entry["bundle_file"], entry["sim_file"]) == (Path(bundle_path).name, Path(sim_path).name)
+
+
+def test_concurrent_runs_are_isolated(tmp_path, monkeypatch):
+    shutil.copytree(REPO_ROOT / "configs", tmp_path / "configs")
+    monkeypatch.chdir(tmp_path)
+
+    with pipeline.PipelineEngine(max_workers=4) as eng:
+        results = eng.run_many([None] * 8)
+
+    assert len({r.run_id for r in results}) == 8
+    for r in results:
+        assert r.bundle_path.startswith(pipeline.run_dir(r.run_id))
+        assert r.sim["origin_bundle"] == Path(r.bundle_path).name
+
+    # Proof chain must stay linear even with concurrent writers
+    entries = [json.loads(l) for l in Path("audits/day13_proof.jsonl").read_text().splitlines()]
+    assert len(entries) == 8
+    prev = None
+    for e in entries:
+        assert e["prev_head"] == prev
+        prev = e["chain_head"]
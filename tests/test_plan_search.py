@@ -0,0 +1,56 @@
+import pytest
+
+from hub import plan_search as ps
+from scripts import generate_plans
+
+EVENT = {"type": "route_outage", "route_id": "R0", "warehouse_id": "W0", "severity": "high"}
+
+
+def _twin(donors=8):
+    snap = {"warehouses": {"W0": {"inventory": 40, "demand": 300}, "W99": {"inventory": 100, "demand": 100}},
+            "routes": {"R0": {"latency_minutes": 30, "warehouses": ["W0", "W99"]}}}
+    for i in range(1, donors + 1):
+        snap["warehouses"][f"W{i}"] = {"inventory": 200 + 7 * i, "demand": 150}
+        snap["routes"][f"R{i}"] = {"latency_minutes": 5 + 3 * i, "warehouses": ["W0", f"W{i}"]}
+        snap["routes"][f"S{i}"] = {"latency_minutes": 6 + 2 * i, "warehouses": [f"W{i}", "W99"]}
+    return snap
+
+
+def test_top_k_matches_exhaustive_and_respects_limits():
+    snap, spec = _twin(), ps.SearchSpec(top_k=6, max_donors=8)
+    for limits in (ps.Limits(), ps.Limits(budget_cap_usd=4000, max_delay_minutes=30)):
+        best = ps.top_k(EVENT, snap, limits, spec)
+        every = ps.top_k(EVENT, snap, limits, spec._replace(top_k=10 ** 9))
+        assert best.complete and best.pruned > 0
+        assert [p["id"] for p in best.plans] == [p["id"] for p in every.plans[:6]]
+        assert all(p["cost_usd"] <= limits.budget_cap_usd and p["delay_minutes"] <= limits.max_delay_minutes
+                   for p in every.plans)
+        assert all(a["route_ids"][0] != "R0" for p in every.plans for a in p["actions"] if a["type"] == "reroute")
+
+
+def test_stream_and_deadline():
+    snap, spec = _twin(), ps.SearchSpec(top_k=5, max_donors=8, levels=(1.0, 0.5, 0.25))
+    final = {p["id"] for p in ps.top_k(EVENT, snap, spec=spec).plans}
+    assert final <= {p["id"] for p in ps.search(EVENT, snap, spec=spec)}
+    cut = ps.top_k(EVENT, snap, spec=spec._replace(deadline_s=0.0))
+    assert not cut.complete and cut.explored == ps.CHECK_EVERY and cut.plans
+
+
+def test_bundle_from_run_snapshot(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    event = dict(EVENT, ts="2025-01-01T00:00:00Z")
+    bundle, _ = generate_plans.generate_bundle(event, "evt.json", str(tmp_path / "plans"), snapshot=_twin(3))
+    assert bundle["plans"] and all(p["inputs"] == {"route_id": "R0", "warehouse_id": "W0"} for p in bundle["plans"])
+    # no twin recorded for the run: falls back to the repo's demo twin
+    demo = generate_plans.build_plans({"type": "route_outage", "route_id": "R7", "warehouse_id": "W3"})
+    assert [p["strategy"] for p in demo] == ["reroute_via_R2", "reroute_via_R1"]
+
+
+def test_no_feasible_plan_writes_no_bundle(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "configs").mkdir()
+    (tmp_path / "configs" / "day13.yaml").write_text("budget_cap_usd: 1\nsla_min_percent: 96\nregion_data_boundary: EU\n")
+    event = dict(EVENT, ts="2025-01-01T00:00:00Z")
+    with pytest.raises(ps.NoFeasiblePlan, match="within budget \\$1 "):
+        generate_plans.generate_bundle(event, "evt.json", str(tmp_path / "plans"), snapshot=_twin(3))
+    assert not (tmp_path / "plans").exists()
@@ -0,0 +1,34 @@
+import pytest
+
+from hub import plan_select, scenario_gen
+from scripts import verify_policies
+
+CFG = {"budget_cap_usd": 10000, "sla_min_percent": 96, "region_data_boundary": "EU", "policy_version": "t"}
+
+
+def _reference(plans, key):
+    v = verify_policies.BatchVerifier(CFG)
+    ok = [(i, p) for i, p in enumerate(plans) if v.check(p)[0]]
+    return min(ok, key=lambda ip: (key(ip[1]), ip[0]))[1] if ok else None
+
+
+@pytest.mark.parametrize("kwargs,key", [
+    ({}, lambda p: (p["cost_usd"], -p["sla_expected_percent"])),
+    ({"order": ("risk", "cost")}, lambda p: (p["stockout_risk"], p["cost_usd"])),
+    ({"order": ("delay", "sla")}, lambda p: (p["delay_minutes"], -p["sla_expected_percent"])),
+    ({"weights": {"cost": 1, "risk": 20000, "delay": 0}}, lambda p: p["cost_usd"] + 20000 * p["stockout_risk"]),
+])
+def test_matches_verify_then_sort(kwargs, key):
+    plans = scenario_gen.plan_pool(600, scenario_gen.ScaleSpec(warehouses=200, seed=3))
+    sel = plan_select.select(plans, CFG, **kwargs)
+    assert sel.plan is _reference(plans, key)
+    assert sel.encoded < sel.candidates
+
+
+def test_ties_and_no_compliant_plan():
+    base = {"cost_usd": 500, "sla_expected_percent": 97.0, "region_data_boundary": "EU", "pii_access": False}
+    plans = [dict(base, id="pii", pii_access=True, cost_usd=100), dict(base, id="a"), dict(base, id="b")]
+    assert plan_select.select(plans, CFG).plan["id"] == "a"
+    assert plan_select.select(plans[:1], CFG).plan is None
+    with pytest.raises(ValueError):
+        plan_select.select(plans, CFG, order=("speed",))
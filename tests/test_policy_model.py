@@ -0,0 +1,22 @@
+from hub import policy_model
+from hub.policy_hash import policy_hash
+from scripts import write_proof
+
+
+def test_hashes_match_original_helpers():
+    m = policy_model.load("policies/base.yaml")
+    assert m.canonical_hash == policy_hash("policies/base.yaml")
+    assert policy_model.load("policies/base.yaml") is m  # memoized
+    cfg = policy_model.load("configs/day13.yaml")
+    assert cfg.config_hash == write_proof.policy_hash_from_config()
+
+
+def test_hot_reload_on_change(tmp_path):
+    p = tmp_path / "policy.yaml"
+    p.write_text("hash_include: [a]\na: 1\n")
+    m1 = policy_model.load(str(p))
+    p.write_text("hash_include: [a]\na: 22\n")  # size changes even within one mtime tick
+    m2 = policy_model.load(str(p))
+    assert m2 is not m1
+    assert m2.doc["a"] == 22
+    assert m2.include_hash != m1.include_hash
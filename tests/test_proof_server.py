@@ -0,0 +1,40 @@
+from hub.audit_merkle import verify_consistency, verify_inclusion
+from scripts import proof_server
+
+
+def test_merkle_endpoints(tmp_path, monkeypatch, append_chain):
+    monkeypatch.chdir(tmp_path)
+    old = append_chain("audit_chain.jsonl", 3)
+    new = append_chain("audit_chain.jsonl", 4, old)
+    http = proof_server.app.test_client()
+
+    root = http.get("/api/merkle/root").get_json()
+    assert root["tree_size"] == 7
+
+    inc = http.get("/api/merkle/inclusion", query_string={"entry_hash": old}).get_json()
+    assert (inc["leaf_index"], inc["tree_size"], inc["root"]) == (2, 7, root["root"])
+    assert verify_inclusion(old, inc["leaf_index"], inc["tree_size"], inc["proof"], inc["root"])
+
+    cons = http.get("/api/merkle/consistency", query_string={"old": old, "new": new}).get_json()
+    assert (cons["old_size"], cons["new_size"], cons["new_root"]) == (3, 7, root["root"])
+    assert verify_consistency(3, 7, cons["old_root"], cons["new_root"], cons["proof"])
+    assert http.get("/api/merkle/consistency", query_string={"old": old}).get_json()["new_size"] == 7
+
+
+def test_merkle_endpoint_errors(tmp_path, monkeypatch, append_chain):
+    monkeypatch.chdir(tmp_path)
+    old = append_chain("audit_chain.jsonl", 3)
+    new = append_chain("audit_chain.jsonl", 2, old)
+    http = proof_server.app.test_client()
+
+    assert http.get("/api/merkle/inclusion", query_string={"entry_hash": "f" * 64}).status_code == 404
+    # the entry is leaf 4, outside a tree of 3 leaves
+    assert http.get("/api/merkle/inclusion", query_string={"entry_hash": new, "tree_size": 3}).status_code == 404
+    resp = http.get("/api/merkle/inclusion", query_string={"entry_hash": old, "tree_size": "x"})
+    assert resp.status_code == 400 and "error" in resp.get_json()
+    assert http.get("/api/merkle/inclusion", query_string={"entry_hash": old, "tree_size": 99}).status_code == 400
+
+    assert http.get("/api/merkle/consistency", query_string={"old": "f" * 64}).status_code == 404
+    assert http.get("/api/merkle/consistency").status_code == 404
+    resp = http.get("/api/merkle/consistency", query_string={"old": new, "new": old})
+    assert resp.status_code == 400 and "error" in resp.get_json()
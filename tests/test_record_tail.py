@@ -0,0 +1,41 @@
+import json
+import os
+
+from hub.record_tail import TailBuffer, tail_lines
+
+
+def write(path, start, stop, mode="a"):
+    with open(path, mode) as f:
+        for i in range(start, stop):
+            f.write(json.dumps({"i": i}) + "\n")
+
+
+def test_tail_lines_small_blocks(tmp_path):
+    p = tmp_path / "log.jsonl"
+    write(p, 0, 500)
+    assert [json.loads(x)["i"] for x in tail_lines(str(p), 7, block=16)] == list(range(493, 500))
+    assert len(tail_lines(str(p), 1000)) == 500
+
+
+def test_buffer_appends_truncation_and_rotation(tmp_path):
+    p = tmp_path / "log.jsonl"
+    write(p, 0, 50)
+    buf = TailBuffer(str(p), capacity=10)
+    assert [r["i"] for r in buf.last(3)] == [47, 48, 49]
+
+    write(p, 50, 53)
+    with open(p, "a") as f:
+        f.write('{"i": 5')  # partial line: not visible until completed
+    assert [r["i"] for r in buf.last(4)] == [49, 50, 51, 52]
+    with open(p, "a") as f:
+        f.write('3}\n')
+    assert buf.last(1) == [{"i": 53}]
+    assert [r["i"] for r in buf.last(12)] == list(range(42, 54))  # beyond capacity
+
+    write(p, 100, 102, mode="w")  # truncated in place
+    assert [r["i"] for r in buf.last(5)] == [100, 101]
+
+    rotated = tmp_path / "new.jsonl"
+    write(rotated, 200, 203)
+    os.replace(rotated, p)
+    assert [r["i"] for r in buf.last(5)] == [200, 201, 202]
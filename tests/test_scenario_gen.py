@@ -0,0 +1,55 @@
+import json
+
+from hub import scenario_gen as sg
+from hub.twin_graph import TwinGraph
+from scripts import simulate_twin, verify_policies
+from verifiers import simulator
+from verifiers.verify_plan import load_yaml, verify_batch
+
+SPEC = sg.ScaleSpec(warehouses=120, events=3, plans_per_event=6, seed=5)
+
+
+def test_deterministic_and_prefix_stable():
+    a, b = sg.build(SPEC), sg.build(SPEC)
+    assert json.dumps(a, sort_keys=True) == json.dumps(b, sort_keys=True)
+    more = sg.build(SPEC._replace(events=5))
+    assert more.events[:3] == a.events and more.bundles[:3] == a.bundles
+    assert sg.build(SPEC._replace(seed=6)).snapshot != a.snapshot
+
+
+def test_topology_connects_every_warehouse():
+    f = sg.build(SPEC)
+    snap = f.snapshot
+    assert len(snap["warehouses"]) == 120
+    touched = {w for r in snap["routes"].values() for w in r["warehouses"]}
+    assert touched == set(snap["warehouses"])
+    assert any(w["hub"] for w in snap["warehouses"].values())
+    g = TwinGraph.from_snapshot(snap)
+    wid = f.events[0]["warehouse_id"]
+    rows = g.query(f"MATCH (w)-[:ROUTE]->(r) WHERE w.warehouseId = '{wid}' RETURN w, r")
+    assert rows and all(wid in row["r"]["warehouses"] for row in rows)
+
+
+def test_bundles_feed_verifiers_and_simulator(tmp_path, monkeypatch):
+    f = sg.build(SPEC)
+    for e, b in zip(f.events, f.bundles):
+        assert b["event"] is e and all(p["inputs"]["route_id"] == e["route_id"] for p in b["plans"])
+    verdicts = verify_batch(f.plans, load_yaml("policies/base.yaml"))
+    assert {v["status"] for v in verdicts} == {"PASS", "FAIL"}
+    res = verify_policies.verify_bundle(f.bundles[0], "b.json", verify_policies.load_config())
+    assert len(res["results"]) == SPEC.plans_per_event
+    assert len(simulator.simulate_many(f.snapshot, f.plans)) == len(f.plans)
+    monkeypatch.chdir(tmp_path)  # run manifest
+    sim, _ = simulate_twin.simulate_bundle(f.bundles[0], "b.json", "sim", run_id="t")
+    assert len(sim["results"]) == SPEC.plans_per_event
+
+
+def test_neighbourhood_and_write(tmp_path):
+    f = sg.build(SPEC)
+    e = f.events[0]
+    sub = sg.neighbourhood(f.snapshot, e["warehouse_id"], e["route_id"], max_routes=3)
+    assert list(sub["routes"])[0] == e["route_id"] or e["warehouse_id"] not in f.snapshot["routes"][e["route_id"]]["warehouses"]
+    assert e["warehouse_id"] in sub["warehouses"] and len(sub["routes"]) <= 3
+    manifest = sg.write(f, str(tmp_path / "out"))
+    assert manifest["plans"] == 18 and len(manifest["files"]) == 2 + 2 * 3
+    assert json.loads((tmp_path / "out" / "plans.json").read_text()) == f.plans
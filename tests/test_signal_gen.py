@@ -0,0 +1,34 @@
+import numpy as np
+
+from hub.signal_gen import GenSpec, digest, generate, write_csv, write_store
+from hub.signal_store import SignalStore
+from hub.signal_stream import last_rows
+
+SPEC = GenSpec(rows=3001, warehouses=7, routes=40, slab_ticks=16, chunk_streams=8, burst_rate=0.05)
+
+
+def test_output_independent_of_workers_and_chunking():
+    assert digest(SPEC, workers=1) == digest(SPEC, workers=2) == digest(SPEC._replace(chunk_streams=40))
+    assert digest(SPEC) != digest(SPEC._replace(seed=1))
+
+
+def test_rows_sorted_and_routed(tmp_path):
+    blocks = list(generate(SPEC))
+    ts = np.concatenate([b["ts"] for b in blocks])
+    assert len(ts) == SPEC.rows and (np.diff(ts) >= 0).all()
+    routes = np.concatenate([b["route"] for b in blocks])
+    assert len(set(routes.tolist())) == SPEC.routes
+    wh = np.concatenate([b["warehouse"] for b in blocks])
+    assert all(w == f"W{int(r[1:]) % SPEC.warehouses}" for w, r in zip(wh[:50].tolist(), routes[:50].tolist()))
+    risk = np.concatenate([b["risk"] for b in blocks])
+    assert risk.min() >= 0 and risk.max() <= 1
+
+
+def test_store_and_csv_agree(tmp_path):
+    store = SignalStore(str(tmp_path / "store"))
+    assert write_store(SPEC, store.path) == SPEC.rows and store.meta()["sorted"]
+    csv_path = str(tmp_path / "signals.csv")
+    assert write_csv(SPEC, csv_path) == SPEC.rows
+    tail = last_rows(csv_path, 2)
+    assert [r["route"] for r in tail] == [r["route"] for r in store.last(2).rows()]
+    assert [float(r["risk"]) for r in tail] == [r["risk"] for r in store.last(2).rows()]
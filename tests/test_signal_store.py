@@ -0,0 +1,59 @@
+import numpy as np
+
+from hub.signal_store import SignalStore, open_store, to_ms
+from hub.signal_stream import StoreTail
+
+
+def _rows(start_min, n, wh="W1", route="R1"):
+    return [{"timestamp": f"2025-01-01T00:{start_min + i:02d}:00+00:00", "warehouse": wh, "route": route,
+             "risk": 0.5 + i / 100, "delay_minutes": i, "cost_delta": 100 * i} for i in range(n)]
+
+
+def test_append_last_and_range(tmp_path):
+    store = SignalStore(str(tmp_path / "s"), block=4)
+    store.append(_rows(0, 10))
+    store.append(_rows(10, 10, wh="W2", route="R9"))
+    assert len(store) == 20 and store.meta()["sorted"]
+    last = store.last(2).rows()
+    assert [r["timestamp"] for r in last] == ["2025-01-01T00:18:00+00:00", "2025-01-01T00:19:00+00:00"]
+    assert last[-1]["warehouse"] == "W2" and last[-1]["cost_delta"] == 900
+    got = store.range("2025-01-01T00:03:00+00:00", "2025-01-01T00:13:00+00:00")
+    assert len(got) == 10 and got.rows()[0]["delay_minutes"] == 3
+    assert store.range(to_ms("2025-01-01T00:00:00+00:00") / 1000, "2025-01-01T00:00:30Z")["ts"].tolist() == \
+        [to_ms("2025-01-01T00:00:00+00:00")]
+
+
+def test_unsorted_range_matches_scan(tmp_path):
+    store = SignalStore(str(tmp_path / "s"), block=8)
+    store.append(_rows(30, 20))
+    store.append(_rows(0, 25))
+    assert not store.meta()["sorted"]
+    lo, hi = to_ms("2025-01-01T00:10:00Z"), to_ms("2025-01-01T00:40:00Z")
+    ts = store.slice()["ts"]
+    got = store.range("2025-01-01T00:10:00Z", "2025-01-01T00:40:00Z")["ts"]
+    assert sorted(got.tolist()) == sorted(ts[(ts >= lo) & (ts < hi)].tolist())
+
+
+def test_uncommitted_bytes_are_dropped(tmp_path):
+    store = SignalStore(str(tmp_path / "s"))
+    store.append(_rows(0, 3))
+    with open(store._file("risk"), "ab") as f:  # crashed append: column bytes, no meta
+        f.write(np.zeros(5).tobytes())
+    store.append(_rows(3, 1))
+    assert store.slice()["risk"].tolist() == [0.5, 0.51, 0.52, 0.5]
+
+
+def test_csv_seed_and_store_tail(tmp_path):
+    csv_path = tmp_path / "signals.csv"
+    csv_path.write_text("timestamp,warehouse,route,risk,delay_minutes,cost_delta\n"
+                        "2025-01-01T00:00:00+00:00,W3,R7,0.6,12,6000\n")
+    store = open_store(str(tmp_path / "s"), str(csv_path))
+    assert store.last(1).rows()[0]["route"] == "R7"
+    state = str(tmp_path / "state.json")
+    tail = StoreTail(store.path, state)
+    assert [r["risk"] for r in tail.poll()] == [0.6]
+    tail.commit()
+    store.append(_rows(1, 2))
+    resumed = StoreTail(store.path, state)
+    assert [r["delay_minutes"] for r in resumed.poll()] == [0, 1]
+    assert [r["warehouse"] for r in resumed.history(5)] == ["W3", "W1", "W1"]
@@ -0,0 +1,68 @@
+import random
+
+import httpx
+import pytest
+
+from hub.twin_graph import ROUTE_MODEL, QueryError, TwinGraph
+from ops.sim.adt_standin import ADTStandIn
+
+SNAPSHOT = {
+    "warehouses": {"W1": {"inventory": 50, "demand": 100}, "W3": {"inventory": 80, "demand": 120}},
+    "routes": {"R1": {"latency_minutes": 40, "warehouse_id": "W1"},
+               "R7": {"latency_minutes": 30, "warehouses": ["W3", "W1"]}},
+}
+
+
+def test_day13_match_and_select():
+    g = TwinGraph.from_snapshot(SNAPSHOT)
+    rows = g.query("MATCH (w)-[:ROUTE]->(r) WHERE w.warehouseId = 'W3' RETURN w, r LIMIT 5")
+    assert [(x["w"]["$dtId"], x["r"]["$dtId"]) for x in rows] == [("W3", "R7")]
+    assert [t["$dtId"] for t in g.query("SELECT TOP 5 T FROM digitaltwins T")] == ["W1", "W3", "R1", "R7"]
+    assert g.query("SELECT r.routeId AS id FROM DIGITALTWINS MATCH (w)-[:ROUTE]->(r) "
+                   "WHERE w.inventory < 60 AND r.latency_minutes > 35") == [{"id": "R1"}]
+    assert g.query(f"SELECT COUNT() FROM DIGITALTWINS T WHERE IS_OF_MODEL(T, '{ROUTE_MODEL}')") == [{"COUNT": 2}]
+    assert g.query("MATCH (a)-[:ROUTE]->(r)<-[:ROUTE]-(b) WHERE a.$dtId = 'W3' RETURN b.$dtId") == [{"$dtId": "W1"}]
+    assert g.query(r"""SELECT T FROM DIGITALTWINS T WHERE T.$dtId = "W\"1" OR T.$dtId = 'W\'3'""") == []
+    assert [t["$dtId"] for t in g.query("SELECT T FROM DIGITALTWINS T WHERE T.$dtId = 'W\\u0031'")] == ["W1"]
+    for bad in ("SELECT X FROM DIGITALTWINS T", "DELETE T", "SELECT T FROM DIGITALTWINS T WHERE T.a = ",
+                "SELECT T FROM DIGITALTWINS T WHERE STARTSWITH(T.x)",
+                "SELECT T FROM DIGITALTWINS T WHERE IS_DEFINED()",
+                "SELECT T FROM DIGITALTWINS T WHERE T.a = 'x\\qy'"):
+        with pytest.raises(QueryError):
+            g.query(bad)
+
+
+def test_indexed_plans_match_brute_force():
+    rng = random.Random(3)
+    twins = [{"$dtId": f"t{i}", "$metadata": {"$model": "m"}, "warehouseId": f"W{rng.randrange(5)}",
+              "v": rng.randrange(10)} for i in range(200)]
+    rels = [{"$sourceId": f"t{rng.randrange(200)}", "$targetId": f"t{rng.randrange(200)}",
+             "$relationshipName": rng.choice(["A", "B"])} for _ in range(600)]
+    g = TwinGraph.from_twins(twins, rels)
+    got = g.query("MATCH (x)-[:A]->(y) WHERE x.warehouseId = 'W2' AND y.v IN [1, 2, 3] RETURN x.$dtId AS x, y.$dtId AS y")
+    by_id = {t["$dtId"]: t for t in twins}
+    want = {(r["$sourceId"], r["$targetId"]) for r in rels
+            if r["$relationshipName"] == "A" and r["$sourceId"] != r["$targetId"]
+            and by_id[r["$sourceId"]]["warehouseId"] == "W2" and by_id[r["$targetId"]]["v"] in (1, 2, 3)}
+    assert sorted((row["x"], row["y"]) for row in got) == sorted(want)
+
+
+def test_standin_serves_graph_queries():
+    with ADTStandIn(page_size=1) as adt:
+        adt.load_snapshot(SNAPSHOT)
+        with httpx.Client(base_url=adt.url) as http:
+            http.put("/digitaltwins/R9", json={"$metadata": {"$model": ROUTE_MODEL}, "routeId": "R9"})
+            r = http.put("/digitaltwins/W3/relationships/extra",
+                         json={"$targetId": "R9", "$relationshipName": "ROUTE"})
+            assert r.status_code == 200
+            body = {"query": "MATCH (w)-[:ROUTE]->(r) WHERE w.warehouseId = 'W3' RETURN r.$dtId LIMIT 5"}
+            ids = []
+            while True:
+                page = http.post("/query", json=body).json()
+                ids += [row["$dtId"] for row in page["value"]]
+                if not page["continuationToken"]:
+                    break
+                body = {"continuationToken": page["continuationToken"]}
+            assert ids == ["R7", "R9"]
+            assert http.post("/query", json={"query": "SELECT nonsense"}).status_code == 400
+            assert http.post("/query", json={"query": "SELECT T FROM DIGITALTWINS T WHERE IS_DEFINED()"}).status_code == 400
@@ -0,0 +1,130 @@
+import json
+
+from verifiers.verify_plan import load_yaml, verify, verify_batch
+from verifiers import simulator
+from scripts import verify_policies
+
+BASE = load_yaml("policies/base.yaml")
+
+
+def load_plan(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def test_verify_pass_and_fail():
+    assert verify(load_plan("plan_pass.json"), BASE) == {"status": "PASS"}
+    res = verify(load_plan("plan_fail.json"), BASE)
+    assert res["status"] == "FAIL"
+    assert [v["code"] for v in res["violations"]] == [
+        "budget_cap_usd", "min_sla_percent", "max_latency_ms", "non_eu_egress_not_allowed",
+        "endpoint_not_permitted", "max_stockout_risk", "max_delay_minutes",
+    ]
+
+
+def test_verify_batch_matches_single():
+    plans = [load_plan("plan_pass.json"), load_plan("plan_fail.json")] * 3
+    plans.append(dict(plans[0], region="APAC"))
+    assert verify_batch(plans, BASE) == [verify(p, BASE) for p in plans]
+
+
+def test_verify_policies_counterexample():
+    cfg = verify_policies.load_config()
+    ok, cx = verify_policies.verify_plan({"cost_usd": 4800, "sla_expected_percent": 97.5,
+                                          "region_data_boundary": "EU"}, cfg)
+    assert ok and cx is None
+    ok, cx = verify_policies.verify_plan({"cost_usd": 12000, "sla_expected_percent": 97.5,
+                                          "region_data_boundary": "EU", "pii_access": True}, cfg)
+    assert not ok and cx == "budget_cap, pii_access"
+
+
+def test_fast_path_matches_solver():
+    from verifiers.verify_plan import BatchVerifier, CompiledPolicy
+    plans = [load_plan("plan_pass.json"), load_plan("plan_fail.json"),
+             dict(load_plan("plan_pass.json"), region="APAC"),
+             dict(load_plan("plan_pass.json"), cost_usd=10000.5, delay_minutes=45.5)]
+    solver = BatchVerifier(BASE)
+    assert CompiledPolicy(BASE).verify(plans) == [solver.check(p) for p in plans]
+
+
+def test_partial_plan_uses_solver():
+    res = verify({"plan_id": "partial", "cost_usd": 12000}, BASE)
+    assert [v["code"] for v in res["violations"]] == ["budget_cap_usd"]
+    assert verify({"plan_id": "partial", "delay_minutes": 10}, BASE) == {"status": "PASS"}
+
+
+def test_verdict_cache_hits_and_invalidates(tmp_path):
+    from hub.verdict_cache import VerdictCache, canonical_digest, plan_digest
+    cache = VerdictCache(str(tmp_path / "verdicts.sqlite"))
+    plan = load_plan("plan_fail.json")
+    digest = plan_digest(plan, ["cost_usd", "sla_pct"])
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"status": "FAIL"}
+
+    h = canonical_digest(BASE)
+    assert cache.get_or_compute("t", h, digest, compute) == {"status": "FAIL"}
+    assert cache.get_or_compute("t", h, digest, compute) == {"status": "FAIL"}
+    assert len(calls) == 1 and cache.stats()["memory_hits"] == 1
+
+    # Persistent tier survives a new process-level cache
+    again = VerdictCache(str(tmp_path / "verdicts.sqlite"))
+    assert again.get("t", h, digest) == {"status": "FAIL"} and again.stats()["disk_hits"] == 1
+
+    # A policy edit changes the hash, so the old verdict is not reused
+    edited = dict(BASE, constraints=dict(BASE["constraints"], budget_cap_usd=20000))
+    cache.get_or_compute("t", canonical_digest(edited), digest, compute)
+    assert len(calls) == 2
+
+
+def test_verdict_cache_disk_tier_is_bounded(tmp_path, monkeypatch):
+    from hub import verdict_cache
+    cache = verdict_cache.VerdictCache(str(tmp_path / "verdicts.sqlite"), capacity=1, max_rows=3, max_age_s=60)
+    clock = [1000.0]
+    monkeypatch.setattr(verdict_cache.time, "time", lambda: clock[0])
+    for i in range(5):
+        clock[0] += 1
+        cache.put("t", "h", str(i), i)
+    assert cache.prune() == 2
+    assert [cache.get("t", "h", str(i)) for i in range(5)] == [None, None, 2, 3, 4]
+    clock[0] += 61
+    fresh = verdict_cache.VerdictCache(cache.path, max_rows=3, max_age_s=60)
+    assert fresh.get("t", "h", "4") is None  # too old to serve from disk, even before a prune
+    assert fresh.prune() == 3
+
+
+def test_default_cache_path_from_env(tmp_path, monkeypatch, verdict_cache_path):
+    from hub import verdict_cache
+    assert verdict_cache.default_cache().path == str(verdict_cache_path)
+    monkeypatch.setenv(verdict_cache.CACHE_PATH_ENV, "")
+    assert verdict_cache.default_cache().path is None
+
+
+def test_verify_ignores_verdicts_from_older_scope(tmp_path, monkeypatch):
+    from hub import verdict_cache
+    from verifiers import verify_plan
+    plan = load_plan("plan_fail.json")
+    monkeypatch.chdir(tmp_path)
+    h, digest = verdict_cache.canonical_digest(BASE), verdict_cache.plan_digest(plan, verify_plan.PLAN_FIELDS)
+    # A verdict cached by an earlier, unversioned verifier
+    verdict_cache.default_cache().put("verify_plan", h, digest, {"status": "PASS"})
+    assert verify_plan.verify(plan, BASE)["status"] == "FAIL"
+    assert verdict_cache.default_cache().get(verify_plan.CACHE_SCOPE, h, digest)["status"] == "FAIL"
+
+def test_simulate_batch_matches_simulate():
+    snap = {
+        "warehouses": {"W1": {"inventory": 40, "demand": 100}, "W2": {"inventory": 90, "demand": 0},
+                       "W3": {"demand": 25}},
+        "routes": {"R1": {"latency_minutes": 30}, "R2": {"latency_minutes": 55}},
+    }
+    plans = [
+        {"plan_id": "A", "cost_usd": 5000.9, "stockout_risk": 0.2, "delay_minutes": 20},
+        {"plan_id": "B", "cost_usd": 7000},  # after KPIs fall back to baseline
+        {},
+    ]
+    assert simulator.simulate_many(snap, plans) == [simulator.simulate(snap, p) for p in plans]
+    out = simulator.simulate_batch([snap, {}], plans)
+    assert out["risk_delta"].shape == (2, 3)
+    assert out["delay_delta"][1, 0] == -20.0
@@ -1,4 +1,5 @@
 import json, sys
+import numpy as np
 
 def simulate(snapshot, plan):
     """
@@ -55,6 +56,94 @@ def simulate(snapshot, plan):
     return result
 
 
+# --- Batch path --------------------------------------------------------------
+# A snapshot is loaded into columns once and its baseline KPIs computed a
+# single time; N plans are then evaluated against M snapshots as array ops.
+
+class SnapshotColumns:
+    """
+    Columnar view of a twin snapshot with its baseline KPIs precomputed.
+    Baselines follow simulate(): demand 0/missing counts as 1, missing
+    inventory/latency as 0, empty sections give 0.0.
+    """
+
+    def __init__(self, snapshot):
+        warehouses = list(snapshot.get("warehouses", {}).values())
+        routes = list(snapshot.get("routes", {}).values())
+        self.inventory = np.fromiter((float(w.get("inventory", 0)) for w in warehouses), float, len(warehouses))
+        self.demand = np.fromiter((float(w.get("demand", 1)) or 1.0 for w in warehouses), float, len(warehouses))
+        self.latency = np.fromiter((float(r.get("latency_minutes", 0)) for r in routes), float, len(routes))
+        self.base_risk = float((np.maximum(0.0, self.demand - self.inventory) / self.demand).mean()) if warehouses else 0.0
+        self.base_delay = float(self.latency.mean()) if routes else 0.0
+
+
+def plan_columns(plans):
+    """
+    Plan fields as arrays; a missing stockout_risk/delay_minutes is NaN
+    (falls back to the snapshot baseline, as in simulate()).
+    """
+    n = len(plans)
+    def col(key, default):
+        return np.fromiter((float(p.get(key, default)) for p in plans), float, n)
+    return {
+        "plan_id": [p.get("plan_id", "unknown") for p in plans],
+        "cost_usd": np.trunc(col("cost_usd", 0)).astype(np.int64),
+        "stockout_risk": col("stockout_risk", np.nan),
+        "delay_minutes": col("delay_minutes", np.nan),
+    }
+
+
+def simulate_batch(snapshots, plans):
+    """
+    Evaluate every plan against every snapshot.
+
+    `snapshots` may hold raw snapshot dicts or SnapshotColumns (reuse those
+    when the snapshot hasn't changed). Returns unrounded arrays:
+    - cost_delta:  (N,)   plan cost_usd
+    - risk_delta:  (M, N) baseline_risk - after_risk
+    - delay_delta: (M, N) baseline_delay - after_delay
+    - baseline_risk / baseline_delay: (M,)
+    - after_risk / after_delay: (M, N)
+    """
+    snaps = [s if isinstance(s, SnapshotColumns) else SnapshotColumns(s) for s in snapshots]
+    cols = plan_columns(plans)
+    base_risk = np.array([s.base_risk for s in snaps], dtype=float)[:, None]
+    base_delay = np.array([s.base_delay for s in snaps], dtype=float)[:, None]
+    risk, delay = cols["stockout_risk"][None, :], cols["delay_minutes"][None, :]
+    after_risk = np.where(np.isnan(risk), base_risk, risk)
+    after_delay = np.where(np.isnan(delay), base_delay, delay)
+    return {
+        "plan_id": cols["plan_id"],
+        "cost_delta": cols["cost_usd"],
+        "risk_delta": base_risk - after_risk,
+        "delay_delta": base_delay - after_delay,
+        "baseline_risk": base_risk[:, 0],
+        "baseline_delay": base_delay[:, 0],
+        "after_risk": after_risk,
+        "after_delay": after_delay,
+    }
+
+
+def simulate_many(snapshot, plans):
+    """
+    simulate() for many plans against one snapshot; same result dicts.
+    """
+    out = simulate_batch([snapshot], plans)
+    br, bd = float(out["baseline_risk"][0]), float(out["baseline_delay"][0])
+    results = []
+    for i, pid in enumerate(out["plan_id"]):
+        ar, ad = float(out["after_risk"][0, i]), float(out["after_delay"][0, i])
+        results.append({
+            "plan_id": pid,
+            "cost_delta": int(out["cost_delta"][i]),
+            "risk_delta": round(br - ar, 3),
+            "delay_delta": round(bd - ad, 2),
+            "baseline": {"risk": round(br, 3), "delay": round(bd, 2)},
+            "after": {"risk": round(ar, 3), "delay": round(ad, 2)}
+        })
+    return results
+
+
 if __name__ == "__main__":
     if len(sys.argv) < 3:
         print("Usage: python verifiers/simulator.py twin_snapshot.json plan.json")
@@ -63,7 +152,11 @@ if __name__ == "__main__":
     with open(sys.argv[1], "r") as f:
         snapshot = json.load(f)
     with open(sys.argv[2], "r") as f:
-        plan = json.load(f)
+        plan = json.load(f)  # a single plan, or a list of plans for batch mode
+
+    if isinstance(plan, list):
+        print(json.dumps(simulate_many(snapshot, plan), indent=2))
+        sys.exit(0)
 
     result = simulate(snapshot, plan)
     print(json.dumps(result, indent=2))
@@ -1,141 +1,302 @@
-import json, sys, yaml, hashlib
-from z3 import Int, Real, Bool, Solver, sat
+import os, json, sys, threading
+import numpy as np
+from z3 import Int, Real, Bool, BoolVal, RealVal, Or, Context, Solver, sat
+
+# Ensure repo root (parent of verifiers/) is on sys.path so hub/* imports resolve
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from hub import policy_model, verdict_cache
 
 BASE_YAML_PATH = "policies/base.yaml"
 LOCK_PATH = "policies/policy.lock"
 
 def load_yaml(path):
-    with open(path, "r") as f:
-        return yaml.safe_load(f)
+    return policy_model.load(path).doc
 
 def load_lock(path):
-    with open(path, "r") as f:
-        doc = f.read().strip()
-    key, val = doc.split(":", 1)
-    return {key.strip(): val.strip()}
+    return policy_model.load_lock(path)
 
 def compute_policy_hash(base):
-    include = base.get("hash_include", [])
-    def get_by_path(obj, path):
-        cur = obj
-        for p in path.split("."):
-            cur = cur[p]
-        return cur
-    material = [f"{p}={get_by_path(base, p)}" for p in include]
-    text = "\n".join(material).encode("utf-8")
-    return hashlib.sha256(text).hexdigest()
+    return policy_model.include_hash_of(base)
 
-def verify(plan, base):
-    c = base["constraints"]
-    s = Solver()
-
-    # Z3 variables
-    cost_usd = Int("cost_usd")
-    sla_pct = Int("sla_pct")
-    latency_ms = Int("latency_ms")
-    is_eu = Bool("is_eu")
-    endpoint_private = Bool("endpoint_private")
-    stockout_risk = Real("stockout_risk")
-    delay_minutes = Int("delay_minutes")
-
-    # Bind plan inputs
-    s.add(cost_usd == int(plan["cost_usd"]))
-    s.add(sla_pct == int(plan["sla_pct"]))
-    s.add(latency_ms == int(plan["latency_ms"]))
-    s.add(is_eu == (plan["region"] == "EU"))
-    s.add(endpoint_private == (plan["endpoint"] == "private"))
-    s.add(stockout_risk == float(plan["stockout_risk"]))
-    s.add(delay_minutes == int(plan["delay_minutes"]))
-
-    # Constraints from policy
-    s.add(cost_usd <= int(c["budget_cap_usd"]))
-    s.add(sla_pct >= int(c["min_sla_percent"]))
-    s.add(latency_ms <= int(c["max_latency_ms"]))
-
-    # Jurisdiction: region must be in allowed_jurisdictions
-    allowed = set(c["allowed_jurisdictions"])
-    # Note: we model this with a post-check for clarity and keep Z3 for the other constraints
+def _policy_key(c):
+    return json.dumps(c, sort_keys=True, separators=(",", ":"))
 
-    # Data egress rules
-    non_eu_allowed = bool(c["data_egress_rules"]["non_eu_egress_allowed"])
-    s.add((is_eu == True) | (non_eu_allowed == True))
+class BatchVerifier:
+    """
+    One Z3 solver per policy: the constraints block is asserted once and each
+    plan is checked by passing its field bindings as assumptions, so nothing
+    is rebuilt or re-asserted between plans. Not thread-safe; use one
+    instance per thread (each owns its own Z3 context).
+    """
 
-    s.add(endpoint_private == ("private" in c["data_egress_rules"]["permitted_endpoints"]))
+    def __init__(self, base, ctx=None):
+        c = base["constraints"]
+        self.c = c
+        self.key = _policy_key(c)
+        ctx = self.ctx = ctx or Context()
+        s = self.s = Solver(ctx=ctx)
 
-    # Risk thresholds
-    s.add(stockout_risk <= float(c["risk_thresholds"]["max_stockout_risk"]))
-    s.add(delay_minutes <= int(c["risk_thresholds"]["max_delay_minutes"]))
+        # Z3 variables
+        self.cost_usd = Int("cost_usd", ctx)
+        self.sla_pct = Int("sla_pct", ctx)
+        self.latency_ms = Int("latency_ms", ctx)
+        self.is_eu = Bool("is_eu", ctx)
+        self.endpoint_private = Bool("endpoint_private", ctx)
+        self.stockout_risk = Real("stockout_risk", ctx)
+        self.delay_minutes = Int("delay_minutes", ctx)
 
-    # Evaluate
-    if s.check() == sat:
+        # Constraints from policy (asserted once)
+        s.add(self.cost_usd <= int(c["budget_cap_usd"]))
+        s.add(self.sla_pct >= int(c["min_sla_percent"]))
+        s.add(self.latency_ms <= int(c["max_latency_ms"]))
+
+        # Jurisdiction is validated after the solver call (see _verdict)
+
+        # Data egress rules
+        non_eu_allowed = bool(c["data_egress_rules"]["non_eu_egress_allowed"])
+        s.add(Or(self.is_eu, BoolVal(non_eu_allowed, ctx)))
+        s.add(self.endpoint_private == BoolVal("private" in c["data_egress_rules"]["permitted_endpoints"], ctx))
+
+        # Risk thresholds
+        s.add(self.stockout_risk <= RealVal(str(float(c["risk_thresholds"]["max_stockout_risk"])), ctx))
+        s.add(self.delay_minutes <= int(c["risk_thresholds"]["max_delay_minutes"]))
+
+    def bindings(self, plan):
+        """
+        Equalities for every concrete field; unspecified (missing/None)
+        fields stay symbolic, so SAT means "some completion is compliant".
+        """
+        ctx = self.ctx
+        binders = {
+            "cost_usd": lambda v: self.cost_usd == int(v),
+            "sla_pct": lambda v: self.sla_pct == int(v),
+            "latency_ms": lambda v: self.latency_ms == int(v),
+            "region": lambda v: self.is_eu == BoolVal(v == "EU", ctx),
+            "endpoint": lambda v: self.endpoint_private == BoolVal(v == "private", ctx),
+            "stockout_risk": lambda v: self.stockout_risk == RealVal(str(float(v)), ctx),
+            "delay_minutes": lambda v: self.delay_minutes == int(v),
+        }
+        return [bind(plan[f]) for f, bind in binders.items() if plan.get(f) is not None]
+
+    def check(self, plan):
+        return _verdict(plan, self.c, self.s.check(*self.bindings(plan)) == sat)
+
+def _verdict(plan, c, satisfied):
+    allowed = set(c["allowed_jurisdictions"])
+    non_eu_allowed = bool(c["data_egress_rules"]["non_eu_egress_allowed"])
+    has = lambda f: plan.get(f) is not None
+
+    if satisfied:
         # Still validate jurisdiction list explicitly
-        if plan["region"] not in allowed:
-            violation_map = {
-                "jurisdiction_not_allowed": {
-                    "policy_path": "constraints.allowed_jurisdictions",
-                    "message": f"Region {plan['region']} not in {c['allowed_jurisdictions']}"
-                }
-            }
-            return {"status": "FAIL", "violations": [ {"code": "jurisdiction_not_allowed", **violation_map["jurisdiction_not_allowed"]} ]}
+        if has("region") and plan["region"] not in allowed:
+            return {"status": "FAIL", "violations": _details(plan, c, ["jurisdiction_not_allowed"])}
         return {"status": "PASS"}
-    else:
-        # Build violation list from simple checks for clear messages
-        violations = []
-
-        if plan["cost_usd"] > c["budget_cap_usd"]:
-            violations.append("budget_cap_usd")
-        if plan["sla_pct"] < c["min_sla_percent"]:
-            violations.append("min_sla_percent")
-        if plan["latency_ms"] > c["max_latency_ms"]:
-            violations.append("max_latency_ms")
-        if plan["region"] not in allowed:
-            violations.append("jurisdiction_not_allowed")
-        if plan["region"] != "EU" and not non_eu_allowed:
-            violations.append("non_eu_egress_not_allowed")
-        if plan["endpoint"] != "private":
-            violations.append("endpoint_not_permitted")
-        if float(plan["stockout_risk"]) > float(c["risk_thresholds"]["max_stockout_risk"]):
-            violations.append("max_stockout_risk")
-        if int(plan["delay_minutes"]) > int(c["risk_thresholds"]["max_delay_minutes"]):
-            violations.append("max_delay_minutes")
-
-        violation_map = {
-            "budget_cap_usd": {
-                "policy_path": "constraints.budget_cap_usd",
-                "message": f"Cost {plan['cost_usd']} exceeds cap {c['budget_cap_usd']}"
-            },
-            "min_sla_percent": {
-                "policy_path": "constraints.min_sla_percent",
-                "message": f"SLA {plan['sla_pct']}% below minimum {c['min_sla_percent']}%"
-            },
-            "max_latency_ms": {
-                "policy_path": "constraints.max_latency_ms",
-                "message": f"Latency {plan['latency_ms']}ms exceeds max {c['max_latency_ms']}ms"
-            },
-            "jurisdiction_not_allowed": {
-                "policy_path": "constraints.allowed_jurisdictions",
-                "message": f"Region {plan['region']} not in {c['allowed_jurisdictions']}"
-            },
-            "non_eu_egress_not_allowed": {
-                "policy_path": "constraints.data_egress_rules.non_eu_egress_allowed",
-                "message": "Non‑EU egress not allowed while region is non‑EU"
-            },
-            "endpoint_not_permitted": {
-                "policy_path": "constraints.data_egress_rules.permitted_endpoints",
-                "message": f"Endpoint {plan['endpoint']} not permitted; require 'private'"
-            },
-            "max_stockout_risk": {
-                "policy_path": "constraints.risk_thresholds.max_stockout_risk",
-                "message": f"Stockout risk {plan['stockout_risk']} exceeds max {c['risk_thresholds']['max_stockout_risk']}"
-            },
-            "max_delay_minutes": {
-                "policy_path": "constraints.risk_thresholds.max_delay_minutes",
-                "message": f"Delay {plan['delay_minutes']}min exceeds max {c['risk_thresholds']['max_delay_minutes']}min"
-            },
+
+    # Build violation list from simple checks for clear messages
+    violations = []
+
+    if has("cost_usd") and plan["cost_usd"] > c["budget_cap_usd"]:
+        violations.append("budget_cap_usd")
+    if has("sla_pct") and plan["sla_pct"] < c["min_sla_percent"]:
+        violations.append("min_sla_percent")
+    if has("latency_ms") and plan["latency_ms"] > c["max_latency_ms"]:
+        violations.append("max_latency_ms")
+    if has("region") and plan["region"] not in allowed:
+        violations.append("jurisdiction_not_allowed")
+    if has("region") and plan["region"] != "EU" and not non_eu_allowed:
+        violations.append("non_eu_egress_not_allowed")
+    if has("endpoint") and plan["endpoint"] != "private":
+        violations.append("endpoint_not_permitted")
+    if has("stockout_risk") and float(plan["stockout_risk"]) > float(c["risk_thresholds"]["max_stockout_risk"]):
+        violations.append("max_stockout_risk")
+    if has("delay_minutes") and int(plan["delay_minutes"]) > int(c["risk_thresholds"]["max_delay_minutes"]):
+        violations.append("max_delay_minutes")
+
+    return {"status": "FAIL", "violations": _details(plan, c, violations)}
+
+def _details(plan, c, violations):
+    messages = {
+        "budget_cap_usd": lambda: {
+            "policy_path": "constraints.budget_cap_usd",
+            "message": f"Cost {plan['cost_usd']} exceeds cap {c['budget_cap_usd']}"
+        },
+        "min_sla_percent": lambda: {
+            "policy_path": "constraints.min_sla_percent",
+            "message": f"SLA {plan['sla_pct']}% below minimum {c['min_sla_percent']}%"
+        },
+        "max_latency_ms": lambda: {
+            "policy_path": "constraints.max_latency_ms",
+            "message": f"Latency {plan['latency_ms']}ms exceeds max {c['max_latency_ms']}ms"
+        },
+        "jurisdiction_not_allowed": lambda: {
+            "policy_path": "constraints.allowed_jurisdictions",
+            "message": f"Region {plan['region']} not in {c['allowed_jurisdictions']}"
+        },
+        "non_eu_egress_not_allowed": lambda: {
+            "policy_path": "constraints.data_egress_rules.non_eu_egress_allowed",
+            "message": "Non‑EU egress not allowed while region is non‑EU"
+        },
+        "endpoint_not_permitted": lambda: {
+            "policy_path": "constraints.data_egress_rules.permitted_endpoints",
+            "message": f"Endpoint {plan['endpoint']} not permitted; require 'private'"
+        },
+        "max_stockout_risk": lambda: {
+            "policy_path": "constraints.risk_thresholds.max_stockout_risk",
+            "message": f"Stockout risk {plan['stockout_risk']} exceeds max {c['risk_thresholds']['max_stockout_risk']}"
+        },
+        "max_delay_minutes": lambda: {
+            "policy_path": "constraints.risk_thresholds.max_delay_minutes",
+            "message": f"Delay {plan['delay_minutes']}min exceeds max {c['risk_thresholds']['max_delay_minutes']}min"
+        },
+    }
+    return [ { "code": v, **(messages[v]() if v in messages else {"policy_path": "unknown", "message": v}) } for v in violations ]
+
+# -----------------------
+# Vectorized fast path
+# -----------------------
+# With every field concrete the solver call is a bounds check, so the
+# constraints block is compiled into NumPy predicates over plan columns.
+# Z3 is only consulted for plans with unspecified (symbolic) fields.
+
+PLAN_FIELDS = ("cost_usd", "sla_pct", "latency_ms", "region", "endpoint", "stockout_risk", "delay_minutes")
+
+# Verdict cache scope; bump the version whenever _verdict's logic or result shape changes
+CACHE_SCOPE = "verify_plan/v2"
+
+# Order matches the violation list built by _verdict
+VIOLATION_ORDER = (
+    "budget_cap_usd", "min_sla_percent", "max_latency_ms", "jurisdiction_not_allowed",
+    "non_eu_egress_not_allowed", "endpoint_not_permitted", "max_stockout_risk", "max_delay_minutes",
+)
+
+def is_concrete(plan):
+    return all(plan.get(f) is not None for f in PLAN_FIELDS)
+
+def to_columns(plans):
+    """
+    Columnar view of concrete plans: float64 for numeric fields, object arrays for strings.
+    """
+    n = len(plans)
+    cols = {f: np.fromiter((p[f] for p in plans), dtype=np.float64, count=n)
+            for f in ("cost_usd", "sla_pct", "latency_ms", "stockout_risk", "delay_minutes")}
+    cols["region"] = np.array([p["region"] for p in plans], dtype=object)
+    cols["endpoint"] = np.array([p["endpoint"] for p in plans], dtype=object)
+    return cols
+
+class CompiledPolicy:
+    """
+    The constraints block as vectorized predicates. `solver_sat` mirrors the
+    Z3 model (int-truncated bindings), `violations` mirrors _verdict's
+    per-field checks, so verdicts are identical to the Z3 path.
+    """
+
+    def __init__(self, base):
+        c = base["constraints"]
+        self.c = c
+        self.key = _policy_key(c)
+        self.allowed = list(c["allowed_jurisdictions"])
+        self.non_eu_allowed = bool(c["data_egress_rules"]["non_eu_egress_allowed"])
+        self.private_permitted = "private" in c["data_egress_rules"]["permitted_endpoints"]
+        self.max_risk = float(c["risk_thresholds"]["max_stockout_risk"])
+        self.max_delay = int(c["risk_thresholds"]["max_delay_minutes"])
+
+    def solver_sat(self, cols):
+        c = self.c
+        is_eu = cols["region"] == "EU"
+        return (
+            (np.trunc(cols["cost_usd"]) <= int(c["budget_cap_usd"]))
+            & (np.trunc(cols["sla_pct"]) >= int(c["min_sla_percent"]))
+            & (np.trunc(cols["latency_ms"]) <= int(c["max_latency_ms"]))
+            & (is_eu | self.non_eu_allowed)
+            & ((cols["endpoint"] == "private") == self.private_permitted)
+            & (cols["stockout_risk"] <= self.max_risk)
+            & (np.trunc(cols["delay_minutes"]) <= self.max_delay)
+        )
+
+    def violations(self, cols):
+        c = self.c
+        not_eu = cols["region"] != "EU"
+        return {
+            "budget_cap_usd": cols["cost_usd"] > c["budget_cap_usd"],
+            "min_sla_percent": cols["sla_pct"] < c["min_sla_percent"],
+            "max_latency_ms": cols["latency_ms"] > c["max_latency_ms"],
+            "jurisdiction_not_allowed": ~np.isin(cols["region"], self.allowed),
+            "non_eu_egress_not_allowed": not_eu & (not self.non_eu_allowed),
+            "endpoint_not_permitted": cols["endpoint"] != "private",
+            "max_stockout_risk": cols["stockout_risk"] > self.max_risk,
+            "max_delay_minutes": np.trunc(cols["delay_minutes"]) > self.max_delay,
         }
 
-        details = [ { "code": v, **violation_map.get(v, {"policy_path": "unknown", "message": v}) } for v in violations ]
-        return {"status": "FAIL", "violations": details}
+    def verify(self, plans):
+        if not plans:
+            return []
+        cols = to_columns(plans)
+        ok = self.solver_sat(cols).tolist()
+        masks = self.violations(cols)
+        juris = masks["jurisdiction_not_allowed"].tolist()
+        hits = np.column_stack([masks[code] for code in VIOLATION_ORDER]).tolist()
+        out = []
+        for plan, sat_i, juris_i, hit_i in zip(plans, ok, juris, hits):
+            if sat_i:
+                # Still validate jurisdiction list explicitly
+                if juris_i:
+                    out.append({"status": "FAIL", "violations": _details(plan, self.c, ["jurisdiction_not_allowed"])})
+                else:
+                    out.append({"status": "PASS"})
+                continue
+            codes = [code for code, h in zip(VIOLATION_ORDER, hit_i) if h]
+            out.append({"status": "FAIL", "violations": _details(plan, self.c, codes)})
+        return out
+
+_verifiers = threading.local()
+
+def _verifier_for(base):
+    # Reuse this thread's solver while the policy constraints are unchanged
+    v = getattr(_verifiers, "current", None)
+    if v is None or v.key != _policy_key(base["constraints"]):
+        v = _verifiers.current = BatchVerifier(base)
+    return v
+
+def _compiled_for(base):
+    p = getattr(_verifiers, "compiled", None)
+    if p is None or p.key != _policy_key(base["constraints"]):
+        p = _verifiers.compiled = CompiledPolicy(base)
+    return p
+
+def _verify_uncached(plan, base):
+    if is_concrete(plan):
+        return _compiled_for(base).verify([plan])[0]
+    return _verifier_for(base).check(plan)
+
+def verify(plan, base):
+    """
+    Verdict for one plan, memoized in the verdict cache under the canonical
+    policy hash and the digest of the plan fields the verifier reads.
+    """
+    return verdict_cache.default_cache().get_or_compute(
+        CACHE_SCOPE, verdict_cache.canonical_digest(base),
+        verdict_cache.plan_digest(plan, PLAN_FIELDS),
+        lambda: _verify_uncached(plan, base),
+    )
+
+def verify_batch(plans, base):
+    """
+    Verify many plans against one policy: concrete plans in one vectorized
+    pass, the rest (symbolic/partial fields) on a single shared solver.
+    """
+    out = [None] * len(plans)
+    concrete = [i for i, p in enumerate(plans) if is_concrete(p)]
+    for i, v in zip(concrete, CompiledPolicy(base).verify([plans[i] for i in concrete])):
+        out[i] = v
+    if len(concrete) < len(plans):
+        solver = BatchVerifier(base)
+        for i, p in enumerate(plans):
+            if out[i] is None:
+                out[i] = solver.check(p)
+    return out
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
@@ -143,11 +304,12 @@ if __name__ == "__main__":
         sys.exit(1)
 
     with open(sys.argv[1], "r") as f:
-        plan = json.load(f)
+        plan = json.load(f)  # a single plan, or a list of plans for batch mode
 
-    base = load_yaml(BASE_YAML_PATH)
+    model = policy_model.load(BASE_YAML_PATH)
+    base = model.doc
     lock = load_lock(LOCK_PATH)
-    recomputed = compute_policy_hash(base)
+    recomputed = model.include_hash
     locked = lock.get("policy_sha256")
 
     if locked and recomputed != locked:
@@ -159,6 +321,13 @@ if __name__ == "__main__":
         }, indent=2))
         sys.exit(2)
 
+    if isinstance(plan, list):
+        verdicts = verify_batch(plan, base)
+        for v in verdicts:
+            v["policy_sha256"] = locked or recomputed
+        print(json.dumps(verdicts, indent=2))
+        sys.exit(0)
+
     verdict = verify(plan, base)
     verdict["policy_sha256"] = locked or recomputed
     print(json.dumps(verdict, indent=2))